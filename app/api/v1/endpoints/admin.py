@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.core.admin import require_admin
+from app.core.export import export_table, EXPORT_FORMATS
+from app.crud.repository import EXPORT_TABLES
+from datetime import datetime
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/export/{table}")
+async def export_data(
+    table: str,
+    format: str = Query("ndjson", description="내보내기 형식 (ndjson, csv)")
+):
+    """places / menus / reviews 전체 내보내기 (서버 측 커서로 스트리밍)"""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"내보낼 수 있는 테이블은 {', '.join(EXPORT_TABLES)} 입니다."
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"형식은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다."
+        )
+
+    logger.info(f"데이터 내보내기 시작: {table} ({format})")
+    filename = f"{table}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        export_table(table, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.core.batch import run_batch, BATCH_MAX_REQUESTS
+from app.schemas.batch import BatchRequest
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("")
+async def batch(request: Request, batch_request: BatchRequest):
+    """조회 API 여러 개를 한 번에 호출 (서버 안에서 동시에 실행, 요청별 상태 코드와 본문 반환)"""
+    items = batch_request.requests
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {BATCH_MAX_REQUESTS}개까지 요청할 수 있습니다."
+        )
+    try:
+        logger.info(f"배치 요청 시작: {len(items)}개")
+        body = await run_batch(request.scope, items)
+        logger.info(f"배치 요청 완료: {len(items)}개")
+        return Response(content=body, media_type="application/json")
+
+    except Exception as e:
+        logger.error(f"배치 요청 실패: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"배치 요청 처리 중 오류가 발생했습니다: {str(e)}"
+        )
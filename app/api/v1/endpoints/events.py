@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.core.config import read_engine
+from app.core.catalog import catalog
+from app.core.events import event_hub, place_topic, category_topic, rating_event, encode_event, SubscriberLimitError, Subscription
+from app.crud import repository
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 프록시(nginx 등)가 스트림을 모아 보내지 않도록
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class _EventStreamResponse(StreamingResponse):
+    """구독 하나의 SSE 응답 - 본문을 다 보냈든, 클라이언트가 끊었든, 보내기 전에 실패했든 끝나면 구독 해제"""
+
+    def __init__(self, subscription: Subscription, initial: bytes):
+        super().__init__(
+            event_hub.stream(subscription, initial), media_type="text/event-stream", headers=_SSE_HEADERS
+        )
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            event_hub.unsubscribe(self.subscription)
+
+
+def _subscribe(topics, initial: bytes = b"") -> StreamingResponse:
+    # 구독자 수 확인과 등록을 한 번에 - 동시에 들어온 연결이 함께 한도를 넘지 않도록 응답 전에 등록
+    try:
+        subscription = event_hub.subscribe(topics)
+    except SubscriberLimitError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="구독자가 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"}
+        )
+    return _EventStreamResponse(subscription, initial)
+
+
+@router.get("/places/{place_id}")
+async def place_events(place_id: int):
+    """가게 실시간 이벤트 (SSE) - 리뷰 작성/수정/삭제(review), 다른 워커에서 바뀐 평점(rating)
+
+    연결 직후 현재 평점 집계를 rating 이벤트로 보내고, 놓친 이벤트가 있으면 resync 이벤트를 보낸다.
+    """
+    try:
+        # 가게 존재 확인 (카탈로그에 있으면 생략)
+        if not catalog.has_place(place_id):
+            async with read_engine.connect() as conn:
+                exists = await repository.place_exists(conn, place_id)
+            if not exists:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="가게를 찾을 수 없습니다."
+                )
+        logger.info(f"가게 이벤트 구독 (ID: {place_id}, 구독자: {event_hub.subscribers + 1})")
+        return _subscribe([place_topic(place_id)], encode_event("rating", rating_event(place_id)))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"가게 이벤트 구독 실패 (ID: {place_id}): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"이벤트 구독 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+@router.get("/categories/{category}")
+async def category_events(category: str):
+    """카테고리 실시간 이벤트 (SSE) - 카테고리에 속한 가게들의 review / rating 이벤트"""
+    logger.info(f"카테고리 이벤트 구독 ({category}, 구독자: {event_hub.subscribers + 1})")
+    return _subscribe([category_topic(category)])
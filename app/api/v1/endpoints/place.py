@@ -1,338 +1,366 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy import text
-from app.core.config import get_database
-from app.crud.place import get_places, get_place, get_places_by_category
-from app.crud.menu import get_menus_by_place
-from app.crud.review import get_reviews_by_place
-from app.schemas.place import PlaceOut, PlaceDetailOut
+from fastapi import APIRouter, Query, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from app.core.config import read_engine
+from app.core.catalog import catalog, SORT_KEYS, RANKING_PRIOR_WEIGHT, RANKING_TOP_K
+from app.core.response_cache import response_cache
+from app.core.fieldsets import (
+    PLACE_FIELDS, MENU_FIELDS, REVIEW_FIELDS, TOP_REVIEW_FIELDS, TOP_REVIEWS_PER_PLACE, TOP_REVIEWS_MAX_PLACES,
+    parse_fields, parse_include, pick, dump_json
+)
+from app.crud import repository
+from app.schemas.place import PlaceOut, PlaceDetailOut, RankedPlaceOut
 from app.schemas.menu import MenuOut
 from app.schemas.review import ReviewOut
-from typing import List, Optional
+from app.schemas.changes import CatalogChangesOut
+from typing import List, Optional, Tuple
 import logging
 import os
-from dotenv import load_dotenv
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 카탈로그 응답 직렬화 (응답 캐시에 JSON 바이트로 보관)
+_place_list_json = TypeAdapter(List[PlaceOut])
+
+# 증분 동기화 한 번에 돌려줄 최대 변경 수 - 넘으면 전체 목록을 다시 받는 편이 싸므로 410
+CHANGES_MAX_ENTRIES = int(os.getenv("CHANGES_MAX_ENTRIES", "5000"))
+
+_FIELDS_DESCRIPTION = "응답에 넣을 필드 (쉼표로 구분, id는 항상 포함)"
+_INCLUDE_DESCRIPTION = "함께 넣을 항목 (menus, top_reviews)"
+
+
+def _json_response(data) -> Response:
+    return Response(content=dump_json(data), media_type="application/json")
+
+
+async def _embed_top_reviews(places: List[dict]):
+    """include=top_reviews - 가게마다 상위 리뷰 (리뷰 내용은 카탈로그에 없으므로 DB에서, 응답 캐시 없이)"""
+    if len(places) > TOP_REVIEWS_MAX_PLACES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"top_reviews는 가게 {TOP_REVIEWS_MAX_PLACES}개 이하의 목록에서만 사용할 수 있습니다. 카테고리로 좁혀주세요."
+        )
+    async with read_engine.connect() as conn:
+        reviews = await repository.list_top_reviews(
+            conn, [place["id"] for place in places], TOP_REVIEWS_PER_PLACE, TOP_REVIEW_FIELDS
+        )
+    for place in places:
+        place["top_reviews"] = reviews[place["id"]]
+
+
+async def _sparse_places(
+    request: Request, category: Optional[str], sort: Optional[str], fields: Tuple[str, ...], includes: Tuple[str, ...]
+) -> Response:
+    """fields= / include= 가게 목록 - 요청한 필드만 조회하고 직렬화"""
+    with_menus = "menus" in includes
+    if catalog.loaded:
+        if "top_reviews" not in includes:
+            entry = await response_cache.get(
+                ("places", category, sort, fields, includes),
+                lambda: dump_json(catalog.sparse_places(category, sort, fields, with_menus))
+            )
+            return response_cache.respond(request, entry)
+        places = catalog.sparse_places(category, sort, fields, with_menus)
+    else:
+        # 정렬 기준 필드는 요청하지 않았어도 조회해서 정렬한 뒤 뺀다
+        query_fields = fields if not sort or sort in fields else tuple(f for f in PLACE_FIELDS if f in fields or f == sort)
+        async with read_engine.connect() as conn:
+            places = await repository.list_places_sparse(conn, query_fields, category)
+            if with_menus:
+                menus = await repository.list_menus_by_places(conn, [place["id"] for place in places])
+                for place in places:
+                    place["menus"] = menus[place["id"]]
+        if sort:
+            # 카탈로그(Catalog.sort_rows)와 같은 순서 - 값 내림차순, 같으면 id 오름차순
+            places.sort(key=lambda place: (-(place[sort] or 0), place["id"]))
+            if sort not in fields:
+                for place in places:
+                    del place[sort]
+    if "top_reviews" in includes:
+        await _embed_top_reviews(places)
+    return _json_response(places)
+
+
+async def _sparse_place_detail(
+    request: Request, place_id: int, fields: Optional[Tuple[str, ...]], includes: Tuple[str, ...]
+) -> Response:
+    """fields= / include= 가게 상세 - fields를 지정하면 메뉴는 include=menus일 때만"""
+    with_menus = fields is None or "menus" in includes
+    fields = fields or PLACE_FIELDS
+    if catalog.has_place(place_id):
+        if "top_reviews" not in includes:
+            entry = await response_cache.get(
+                ("place", place_id, fields, with_menus),
+                lambda: dump_json(catalog.sparse_place(place_id, fields, with_menus))
+            )
+            return response_cache.respond(request, entry)
+        place = catalog.sparse_place(place_id, fields, with_menus)
+    else:
+        async with read_engine.connect() as conn:
+            place = await repository.get_place_sparse(conn, place_id, fields)
+            if place and with_menus:
+                place["menus"] = await repository.list_rows_sparse(
+                    conn, "menus_by_place", MENU_FIELDS, {"place_id": place_id}
+                )
+        if not place:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="가게를 찾을 수 없습니다."
+            )
+    if "top_reviews" in includes:
+        await _embed_top_reviews([place])
+    return _json_response(place)
+
 @router.get("/", response_model=List[PlaceOut])
 async def get_all_places(
-    category: Optional[str] = Query(None, description="카테고리별 필터링")
+    request: Request,
+    category: Optional[str] = Query(None, description="카테고리별 필터링"),
+    sort: Optional[str] = Query(None, description="정렬 기준 (rating, review_count, budget_range)"),
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=_INCLUDE_DESCRIPTION)
 ):
-    """가게 조회 (카테고리별 필터링 가능) - 직접 연결 방식"""
+    """가게 조회 (카테고리별 필터링, 정렬 가능, fields=로 필드 선택, include=로 메뉴/상위 리뷰 포함)"""
     try:
-        logger.info("직접 연결 방식으로 가게 조회 시작...")
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
+        logger.info("가게 조회 시작...")
+        if sort and sort not in SORT_KEYS:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="데이터베이스 URL이 설정되지 않았습니다."
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다."
             )
-        
-        # debug_db.py와 동일한 엔진 설정
-        engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_size=1,
-            max_overflow=0,
-            pool_timeout=10
-        )
-        
-        async with engine.begin() as conn:
-            # places 테이블 데이터 직접 조회
-            if category:
-                result = await conn.execute(
-                    text("SELECT * FROM places WHERE category = :category"),
-                    {"category": category}
-                )
-            else:
-                result = await conn.execute(text("SELECT * FROM places"))
-            
-            places_data = result.fetchall()
-            
-            # PlaceOut 형태로 변환
-            places = []
-            for row in places_data:
-                place_id = row[0]
-                
-                # 해당 가게의 평균 평점과 리뷰 수 계산
-                rating_result = await conn.execute(
-                    text("SELECT AVG(rating), COUNT(*) FROM reviews WHERE place_id = :place_id"),
-                    {"place_id": place_id}
-                )
-                rating_data = rating_result.fetchone()
-                avg_rating = rating_data[0]
-                review_count = rating_data[1]
-                
-                # 평점이 없으면 0.0, 있으면 소수점 1자리로 반올림
-                rating = round(float(avg_rating), 1) if avg_rating else 0.0
-                
-                place = PlaceOut(
-                    id=place_id,
-                    name=row[1],
-                    category=row[2],
-                    distance_note=row[3],
-                    address=row[4],
-                    hero_image_url=row[5],
-                    budget_range=row[6],  # budget_range 필드 추가
-                    rating=rating,  # 계산된 평균 평점
-                    review_count=review_count  # 리뷰 개수
-                )
-                places.append(place)
-            
-            await engine.dispose()
-            logger.info(f"가게 조회 성공: {len(places)}개")
-            return places
-            
+        place_fields = parse_fields(fields, PLACE_FIELDS)
+        includes = parse_include(include)
+        if place_fields is not None or includes:
+            response = await _sparse_places(request, category, sort, place_fields or PLACE_FIELDS, includes)
+            logger.info("가게 조회 성공 (필드 선택)")
+            return response
+        # 워밍업으로 적재된 카탈로그가 있으면 DB 조회 없이 응답 (같은 카탈로그 버전이면 직렬화/압축 결과 재사용)
+        if catalog.loaded:
+            entry = await response_cache.get(
+                ("places", category, sort),
+                lambda: _place_list_json.dump_json(catalog.list_places(category, sort))
+            )
+            logger.info("가게 조회 성공 (카탈로그)")
+            return response_cache.respond(request, entry)
+
+        async with read_engine.connect() as conn:
+            places = await repository.list_places(conn, category)
+        if sort:
+            # 카탈로그(Catalog.sort_rows)와 같은 순서 - 값 내림차순, 같으면 id 오름차순
+            places.sort(key=lambda place: (-(getattr(place, sort) or 0), place.id))
+
+        logger.info(f"가게 조회 성공: {len(places)}개")
+        return places
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"가게 조회 실패: {str(e)}")
-        if 'engine' in locals():
-            await engine.dispose()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"가게 조회 중 오류가 발생했습니다: {str(e)}"
         )
 
-@router.get("/{place_id}", response_model=PlaceDetailOut)
-async def get_place_detail(place_id: int):
-    """가게 상세 조회 - 직접 연결 방식"""
+@router.get("/top", response_model=List[RankedPlaceOut])
+async def get_top_places(
+    category: Optional[str] = Query(None, description="카테고리 (생략하면 전체)"),
+    n: int = Query(10, description="조회 개수", ge=1, le=RANKING_TOP_K)
+):
+    """베이지안 평균(카테고리 평균을 사전 평균으로 사용) 상위 가게 조회"""
     try:
-        logger.info(f"직접 연결 방식으로 가게 상세 조회 시작 (ID: {place_id})...")
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="데이터베이스 URL이 설정되지 않았습니다."
-            )
-        
-        engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_size=1,
-            max_overflow=0,
-            pool_timeout=10
+        logger.info(f"상위 가게 조회 시작 (카테고리: {category}, 개수: {n})...")
+        # 카탈로그의 카테고리별 상위 목록은 리뷰 변경 때마다 갱신되어 있음
+        if catalog.loaded:
+            places = catalog.top_places(category, n)
+            logger.info(f"상위 가게 조회 성공 (카탈로그): {len(places)}개")
+            return places
+
+        async with read_engine.connect() as conn:
+            places = await repository.list_top_places(conn, category, n, RANKING_PRIOR_WEIGHT)
+
+        logger.info(f"상위 가게 조회 성공: {len(places)}개")
+        return places
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"상위 가게 조회 실패: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"상위 가게 조회 중 오류가 발생했습니다: {str(e)}"
         )
-        
-        async with engine.begin() as conn:
-            # 가게 존재 확인 및 데이터 조회
-            result = await conn.execute(
-                text("SELECT * FROM places WHERE id = :place_id"),
-                {"place_id": place_id}
-            )
-            place_data = result.fetchone()
-            
-            if not place_data:
-                await engine.dispose()
+
+@router.get("/changes", response_model=CatalogChangesOut)
+async def get_catalog_changes(
+    since: Optional[str] = Query(None, description="이전 동기화에서 받은 토큰 (생략하면 토큰만 발급)")
+):
+    """증분 동기화 - since 이후 추가/수정된 가게·메뉴·평점과 삭제된 id
+
+    처음에는 since 없이 토큰을 받은 뒤 전체 목록(GET /places/)을 받고, 이후로는 받은 토큰으로 변경분만 조회한다.
+    카탈로그가 적재되어 있으면 처음 토큰은 카탈로그를 적재한 시점의 토큰이라 이미 목록에 있는 변경이 다시 올 수 있다.
+    410이면 토큰이 너무 오래되었거나 변경이 많으니 전체 목록을 다시 받는다.
+    """
+    if since is not None and not since.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since는 동기화 토큰이어야 합니다."
+        )
+    try:
+        logger.info(f"증분 동기화 시작 (since: {since})...")
+        async with read_engine.connect() as conn:
+            # 토큰을 먼저 발급 - 이후 커밋된 변경은 이번 응답과 다음 응답에 중복될 수 있지만 빠지지는 않는다
+            token, horizon = await repository.get_change_token(conn)
+            if since is None:
+                if catalog.loaded:
+                    # 전체 목록은 카탈로그에서 나가므로 카탈로그를 적재한 스냅숏의 토큰을 준다
+                    # - DB의 지금 토큰을 주면 카탈로그가 아직 반영하지 못한 변경을 다음 동기화에서 건너뛴다
+                    if catalog.change_token is not None and (horizon is None or catalog.change_token >= horizon):
+                        token = catalog.change_token
+                    else:
+                        logger.warning("카탈로그 동기화 토큰이 없거나 만료되어 DB 토큰을 발급합니다.")
+                return CatalogChangesOut(token=str(token))
+            if horizon is not None and int(since) < horizon:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="가게를 찾을 수 없습니다."
+                    status_code=status.HTTP_410_GONE,
+                    detail="동기화 토큰이 만료되었습니다. 전체 목록을 다시 받아주세요."
                 )
-            
-            # 해당 가게의 평균 평점과 리뷰 수 계산
-            rating_result = await conn.execute(
-                text("SELECT AVG(rating), COUNT(*) FROM reviews WHERE place_id = :place_id"),
-                {"place_id": place_id}
-            )
-            rating_data = rating_result.fetchone()
-            avg_rating = rating_data[0]
-            review_count = rating_data[1]
-            
-            # 평점이 없으면 0.0, 있으면 소수점 1자리로 반올림
-            rating = round(float(avg_rating), 1) if avg_rating else 0.0
-            
-            # 해당 가게의 메뉴 조회
-            menu_result = await conn.execute(
-                text("SELECT * FROM menus WHERE place_id = :place_id"),
-                {"place_id": place_id}
-            )
-            menus_data = menu_result.fetchall()
-            
-            # MenuOut 형태로 변환
-            menus = []
-            for menu_row in menus_data:
-                menu = MenuOut(
-                    id=menu_row[0],
-                    place_id=menu_row[1],
-                    name=menu_row[2],
-                    price=menu_row[3]
+            changes = await repository.list_changes_since(conn, int(since))
+            if len(changes) > CHANGES_MAX_ENTRIES:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="변경이 너무 많습니다. 전체 목록을 다시 받아주세요."
                 )
-                menus.append(menu)
-            
-            # PlaceDetailOut 형태로 변환 (메뉴 포함)
-            place = PlaceDetailOut(
-                id=place_data[0],
-                name=place_data[1],
-                category=place_data[2],
-                distance_note=place_data[3],
-                address=place_data[4],
-                hero_image_url=place_data[5],
-                budget_range=place_data[6],  # budget_range 필드 추가
-                rating=rating,  # 계산된 평균 평점
-                review_count=review_count,  # 리뷰 개수
-                menus=menus  # 메뉴 목록
+            result = await repository.list_catalog_changes(conn, changes, token)
+
+        logger.info(f"증분 동기화 성공: 변경 {len(changes)}건")
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"증분 동기화 실패 (since: {since}): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"증분 동기화 중 오류가 발생했습니다: {str(e)}"
+        )
+
+@router.get("/{place_id}", response_model=PlaceDetailOut)
+async def get_place_detail(
+    request: Request,
+    place_id: int,
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION + " - 지정하면 메뉴는 include=menus일 때만"),
+    include: Optional[str] = Query(None, description=_INCLUDE_DESCRIPTION)
+):
+    """가게 상세 조회"""
+    try:
+        logger.info(f"가게 상세 조회 시작 (ID: {place_id})...")
+        place_fields = parse_fields(fields, PLACE_FIELDS)
+        includes = parse_include(include)
+        if place_fields is not None or includes:
+            response = await _sparse_place_detail(request, place_id, place_fields, includes)
+            logger.info(f"가게 상세 조회 성공 (필드 선택): {place_id}")
+            return response
+        # 카탈로그에 없는 가게만 DB에서 조회
+        if catalog.has_place(place_id):
+            entry = await response_cache.get(
+                ("place", place_id),
+                lambda: catalog.place_detail(place_id).model_dump_json().encode()
+            )
+            logger.info(f"가게 상세 조회 성공 (카탈로그): {place_id}")
+            return response_cache.respond(request, entry)
+
+        async with read_engine.connect() as conn:
+            place = await repository.get_place_detail(conn, place_id)
+
+        if not place:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="가게를 찾을 수 없습니다."
             )
-            
-            await engine.dispose()
-            logger.info(f"가게 상세 조회 성공: {place.name}")
-            return place
-            
+
+        logger.info(f"가게 상세 조회 성공: {place.name}")
+        return place
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"가게 상세 조회 실패 (ID: {place_id}): {str(e)}")
-        if 'engine' in locals():
-            await engine.dispose()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"가게 상세 조회 중 오류가 발생했습니다: {str(e)}"
         )
 
 @router.get("/{place_id}/reviews", response_model=List[ReviewOut])
-async def get_place_reviews(place_id: int):
-    """가게 리뷰 조회 - 직접 연결 방식"""
+async def get_place_reviews(
+    place_id: int,
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION)
+):
+    """가게 리뷰 조회"""
     try:
-        logger.info(f"직접 연결 방식으로 가게 리뷰 조회 시작 (ID: {place_id})...")
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="데이터베이스 URL이 설정되지 않았습니다."
-            )
-        
-        engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_size=1,
-            max_overflow=0,
-            pool_timeout=10
-        )
-        
-        async with engine.begin() as conn:
-            # 가게 존재 확인
-            place_result = await conn.execute(
-                text("SELECT id FROM places WHERE id = :place_id"),
-                {"place_id": place_id}
-            )
-            if not place_result.fetchone():
-                await engine.dispose()
+        logger.info(f"가게 리뷰 조회 시작 (ID: {place_id})...")
+        review_fields = parse_fields(fields, REVIEW_FIELDS)
+        async with read_engine.connect() as conn:
+            # 가게 존재 확인 (카탈로그에 있으면 생략)
+            if not catalog.has_place(place_id) and not await repository.place_exists(conn, place_id):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="가게를 찾을 수 없습니다."
                 )
-            
-            # 리뷰 조회
-            result = await conn.execute(
-                text("SELECT * FROM reviews WHERE place_id = :place_id"),
-                {"place_id": place_id}
-            )
-            reviews_data = result.fetchall()
-            
-            # ReviewOut 형태로 변환
-            reviews = []
-            for row in reviews_data:
-                review = ReviewOut(
-                    id=row[0],
-                    place_id=row[1],
-                    phone_number=row[2],
-                    rating=row[3],
-                    content=row[4],
-                    photo_urls=row[5],
-                    created_at=row[6]
-                )
-                reviews.append(review)
-            
-            await engine.dispose()
-            logger.info(f"가게 리뷰 조회 성공: {len(reviews)}개")
-            return reviews
-            
+
+            if review_fields is not None:
+                reviews = await repository.list_rows_sparse(conn, "reviews_by_place", review_fields, {"place_id": place_id})
+            else:
+                reviews = await repository.list_reviews(conn, place_id)
+
+        logger.info(f"가게 리뷰 조회 성공: {len(reviews)}개")
+        return _json_response(reviews) if review_fields is not None else reviews
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"가게 리뷰 조회 실패 (ID: {place_id}): {str(e)}")
-        if 'engine' in locals():
-            await engine.dispose()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"리뷰 조회 중 오류가 발생했습니다: {str(e)}"
         )
 
 @router.get("/{place_id}/menus", response_model=List[MenuOut])
-async def get_place_menus(place_id: int):
-    """가게 메뉴 조회 - 직접 연결 방식"""
+async def get_place_menus(
+    place_id: int,
+    fields: Optional[str] = Query(None, description=_FIELDS_DESCRIPTION)
+):
+    """가게 메뉴 조회"""
     try:
-        logger.info(f"직접 연결 방식으로 가게 메뉴 조회 시작 (ID: {place_id})...")
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="데이터베이스 URL이 설정되지 않았습니다."
-            )
-        
-        engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_size=1,
-            max_overflow=0,
-            pool_timeout=10
-        )
-        
-        async with engine.begin() as conn:
+        logger.info(f"가게 메뉴 조회 시작 (ID: {place_id})...")
+        menu_fields = parse_fields(fields, MENU_FIELDS)
+        if catalog.has_place(place_id):
+            menus = catalog.menus_of(place_id)
+            logger.info(f"가게 메뉴 조회 성공 (카탈로그): {len(menus)}개")
+            if menu_fields is not None:
+                return _json_response([pick(menu.model_dump(), menu_fields) for menu in menus])
+            return menus
+
+        async with read_engine.connect() as conn:
             # 가게 존재 확인
-            place_result = await conn.execute(
-                text("SELECT id FROM places WHERE id = :place_id"),
-                {"place_id": place_id}
-            )
-            if not place_result.fetchone():
-                await engine.dispose()
+            if not await repository.place_exists(conn, place_id):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="가게를 찾을 수 없습니다."
                 )
-            
-            # 메뉴 조회
-            result = await conn.execute(
-                text("SELECT * FROM menus WHERE place_id = :place_id"),
-                {"place_id": place_id}
-            )
-            menus_data = result.fetchall()
-            
-            # MenuOut 형태로 변환
-            menus = []
-            for row in menus_data:
-                menu = MenuOut(
-                    id=row[0],
-                    place_id=row[1],
-                    name=row[2],
-                    price=row[3]
-                )
-                menus.append(menu)
-            
-            await engine.dispose()
-            logger.info(f"가게 메뉴 조회 성공: {len(menus)}개")
-            return menus
-            
+
+            if menu_fields is not None:
+                menus = await repository.list_rows_sparse(conn, "menus_by_place", menu_fields, {"place_id": place_id})
+            else:
+                menus = await repository.list_menus(conn, place_id)
+
+        logger.info(f"가게 메뉴 조회 성공: {len(menus)}개")
+        return _json_response(menus) if menu_fields is not None else menus
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"가게 메뉴 조회 실패 (ID: {place_id}): {str(e)}")
-        if 'engine' in locals():
-            await engine.dispose()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"메뉴 조회 중 오류가 발생했습니다: {str(e)}"
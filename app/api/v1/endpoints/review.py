@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy import text
-from app.core.config import get_database
-from app.crud.review import create_review, get_review, update_review, delete_review, get_reviews_by_phone
-from app.crud.place import get_place
-from app.models.review import Review
-from app.schemas.review import ReviewCreate, ReviewOut, ReviewUpdate
-from typing import List, Optional
-import os
-import time
-import boto3
-from botocore.exceptions import ClientError
-from dotenv import load_dotenv
+from fastapi import APIRouter, HTTPException, Header, Query, Response, status, Form, File, UploadFile
+from app.core.config import engine, read_engine, autocommit_engine
+from app.core.batching import review_batcher, REVIEW_BATCH_ENABLED
+from app.core.catalog import catalog
+from app.core import storage
+from app.core.images import image_processor, Photo
+from app.core.events import publish_review_change
+from app.core.fieldsets import REVIEW_FIELDS, parse_fields, dump_json
+from app.core.idempotency import idempotency_store, request_fingerprint
+from app.crud import repository
+from app.schemas.review import ReviewOut, ReviewUpdate
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -24,19 +28,17 @@ async def create_place_review(
     files: Optional[List[UploadFile]] = File(None),
     file: Optional[UploadFile] = File(None),
     image: Optional[UploadFile] = File(None),
-    photos: Optional[List[UploadFile]] = File(None)
+    photos: Optional[List[UploadFile]] = File(None),
+    idempotency_key: Optional[str] = Header(None, description="재시도해도 리뷰가 한 번만 작성되도록 클라이언트가 만든 고유 키 (UUID 등)")
 ):
-    """가게 리뷰 작성 (multipart/form-data 지원) - 직접 연결 방식"""
+    """가게 리뷰 작성 (multipart/form-data 지원)
+
+    Idempotency-Key가 있으면 같은 키의 재시도에는 업로드/저장 없이 처음 응답을 돌려주고,
+    처음 요청이 아직 처리 중이면 끝날 때까지 기다린다.
+    """
+    # 선점한 멱등성 키 - 응답을 기록하기 전에 실패하면 해제
+    pending_key = None
     try:
-        print(f"DEBUG: place_id = {place_id}")
-        print(f"DEBUG: phone_number = {phone_number}")
-        print(f"DEBUG: rating = {rating}")
-        print(f"DEBUG: content = {content}")
-        print(f"DEBUG: files = {files}")
-        print(f"DEBUG: file = {file}")
-        print(f"DEBUG: image = {image}")
-        print(f"DEBUG: photos = {photos}")
-        
         # 모든 파일 필드 확인
         all_files = []
         if files:
@@ -48,161 +50,136 @@ async def create_place_review(
         if photos:
             all_files.extend(photos)
             
-        print(f"DEBUG: 총 파일 개수 = {len(all_files)}")
+        logger.info(f"리뷰 작성 시작 (가게 ID: {place_id}, 평점: {rating}, 파일: {len(all_files)}개)")
         
-        load_dotenv()
-        database_url = os.getenv("DATABASE_URL")
-        
-        if not database_url:
+        # 리뷰 데이터 검증
+        if rating < 1 or rating > 5:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="데이터베이스 URL이 설정되지 않았습니다."
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="평점은 1-5 사이의 값이어야 합니다."
             )
         
-        # 직접 연결 방식
-        engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_size=1,
-            max_overflow=0,
-            pool_timeout=10
-        )
-        
-        async with engine.begin() as conn:
-            # 가게 존재 확인
-            place_result = await conn.execute(
-                text("SELECT id FROM places WHERE id = :place_id"),
-                {"place_id": place_id}
-            )
-            if not place_result.fetchone():
-                await engine.dispose()
+        # 가게 존재 확인 (카탈로그에 있으면 생략) - 업로드 동안 연결을 잡고 있지 않도록 먼저 확인
+        if not catalog.has_place(place_id):
+            async with read_engine.connect() as conn:
+                exists = await repository.place_exists(conn, place_id)
+            if not exists:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="가게를 찾을 수 없습니다."
                 )
-            
-            # 리뷰 데이터 검증
-            if rating < 1 or rating > 5:
-                await engine.dispose()
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="평점은 1-5 사이의 값이어야 합니다."
-                )
-            
-            # 파일 저장 및 URL 생성
-            photo_urls = None
-            if all_files:
-                print(f"DEBUG: 파일 개수 = {len(all_files)}")
-                file_urls = []
-                for i, file in enumerate(all_files):
-                    print(f"DEBUG: 파일 {i} = {file.filename}, 크기 = {file.size if hasattr(file, 'size') else 'unknown'}")
-                    if file.filename:
-                        try:
-                            # 파일 저장
-                            file_content = await file.read()
-                            print(f"DEBUG: 파일 내용 크기 = {len(file_content)} bytes")
-                            
-                            file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-                            unique_filename = f"review_{place_id}_{int(time.time())}_{i}.{file_extension}"
-                            
-                            # S3 업로드
-                            s3_client = boto3.client(
-                                's3',
-                                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                                region_name=os.getenv('AWS_REGION', 'ap-northeast-2')
-                            )
-                            
-                            bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
-                            s3_key = f"reviews/{unique_filename}"
-                            
-                            print(f"DEBUG: S3 업로드 시작 - 버킷: {bucket_name}, 키: {s3_key}")
-                            
-                            # S3에 파일 업로드
-                            s3_client.put_object(
-                                Bucket=bucket_name,
-                                Key=s3_key,
-                                Body=file_content,
-                                ContentType=file.content_type or 'image/jpeg'
-                            )
-                            
-                            print(f"DEBUG: S3 업로드 완료")
-                            
-                            # S3 URL 생성
-                            file_url = f"https://{bucket_name}.s3.{os.getenv('AWS_REGION', 'ap-northeast-2')}.amazonaws.com/{s3_key}"
-                            file_urls.append(file_url)
-                            print(f"DEBUG: 생성된 S3 URL = {file_url}")
-                            
-                        except Exception as e:
-                            print(f"ERROR: 파일 저장 실패 = {str(e)}")
-                            continue
-                
-                photo_urls = str(file_urls) if file_urls else None
-                print(f"DEBUG: 최종 photo_urls = {photo_urls}")
-            else:
-                print("DEBUG: 모든 파일 필드가 None이거나 비어있음")
-            
-            # 리뷰 생성 (직접 SQL)
-            result = await conn.execute(
-                text("""
-                    INSERT INTO reviews (place_id, phone_number, rating, content, photo_urls, created_at)
-                    VALUES (:place_id, :phone_number, :rating, :content, :photo_urls, NOW())
-                    RETURNING id, place_id, phone_number, rating, content, photo_urls, created_at
-                """),
-                {
-                    "place_id": place_id,
-                    "phone_number": phone_number,
-                    "rating": rating,
-                    "content": content,
-                    "photo_urls": photo_urls
-                }
-            )
-            
-            review_data = result.fetchone()
-            
-            await engine.dispose()
-            
-            # ReviewOut 형태로 변환
-            review = ReviewOut(
-                id=review_data[0],
-                place_id=review_data[1],
-                phone_number=review_data[2],
-                rating=review_data[3],
-                content=review_data[4],
-                photo_urls=review_data[5],
-                created_at=review_data[6]
+        
+        # 사진은 먼저 읽고 해시 - 멱등성 요청 해시에도 업로드 키에도 쓴다
+        files_read = await _read_photos([file for file in all_files if file.filename])
+
+        if idempotency_key is not None:
+            fingerprint = request_fingerprint(
+                place_id, phone_number, rating, content, [digest for _, _, digest in files_read]
             )
-            
-            print(f"DEBUG: 리뷰 생성 성공: {review.id}")
-            return review
+            replay = await idempotency_store.begin(idempotency_key, fingerprint)
+            if replay is not None:
+                logger.info(f"리뷰 생성 재시도 - 저장된 응답 반환 (가게 ID: {place_id})")
+                return replay
+            pending_key = idempotency_key
+        
+        # 파일 저장 및 URL 생성
+        photo_urls, photos = None, []
+        if files_read:
+            photo_urls, photos = await _upload_photos(files_read)
+        
+        review_values = {
+            "place_id": place_id,
+            "phone_number": phone_number,
+            "rating": rating,
+            "content": content,
+            "photo_urls": photo_urls
+        }
+        if pending_key is not None:
+            # 리뷰 INSERT와 응답 기록을 한 트랜잭션으로 - 리뷰가 저장됐으면 재시도는 반드시 저장된 응답을 받는다
+            async with engine.begin() as conn:
+                review = await repository.insert_review(conn, review_values)
+                await idempotency_store.complete(conn, pending_key, review.model_dump_json())
+            pending_key = None
+        elif REVIEW_BATCH_ENABLED:
+            # 몰리는 시간대에는 다른 요청과 묶어 multi-row INSERT 한 번으로 저장 (커밋 후 반환)
+            review = await review_batcher.submit(review_values)
+        else:
+            # INSERT ... RETURNING 한 문장 (autocommit)
+            async with autocommit_engine.connect() as conn:
+                review = await repository.insert_review(conn, review_values)
+        
+        # 커밋 후 카탈로그 평점 반영
+        await _refresh_catalog_rating(place_id)
+        publish_review_change("created", review)
+        # 썸네일은 응답 후 백그라운드에서 생성 (완료되면 리뷰 조회에 thumbnail_urls가 채워짐)
+        image_processor.submit(review.id, photos)
+        
+        logger.info(f"리뷰 생성 성공: {review.id}")
+        return review
             
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR: 리뷰 생성 실패: {str(e)}")
-        if 'engine' in locals():
-            await engine.dispose()
+        logger.error(f"리뷰 생성 실패: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"리뷰 생성 중 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        if pending_key is not None:
+            await idempotency_store.release(pending_key)
+
+async def _refresh_catalog_rating(place_id: int):
+    """커밋된 리뷰 변경을 카탈로그 평점에 반영 - 변화량 대신 DB 집계로 (변경 알림이 먼저 반영했어도 두 번 더하지 않음)
+
+    실패해도 리뷰는 저장됐으므로 로그만 - 변경 알림이 다시 반영한다.
+    """
+    if not catalog.has_place(place_id):
+        return
+    try:
+        async with read_engine.connect() as conn:
+            await catalog.refresh_rating(conn, place_id)
+    except Exception as e:
+        logger.warning(f"카탈로그 평점 반영 실패 (가게 ID: {place_id}): {str(e)}")
+
+async def _read_photos(files: List[UploadFile]) -> List[Tuple[UploadFile, bytes, str]]:
+    """사진 내용과 SHA-256 해시 (파일, 내용, 해시) - 해시는 스레드에서 동시에 계산"""
+    contents = [await file.read() for file in files]
+    digests = await asyncio.gather(*(storage.content_hash(content) for content in contents))
+    return list(zip(files, contents, digests))
+
+async def _upload_photos(files_read: List[Tuple[UploadFile, bytes, str]]) -> Tuple[Optional[str], List[Photo]]:
+    """사진을 내용 해시 키로 저장 - 같은 사진(재시도, 중복 첨부)은 한 번만 올린다
+
+    서로 다른 사진의 업로드는 동시에 진행한다.
+    (photo_urls, 저장된 사진의 (해시, 내용) 목록 - photo_urls와 같은 순서, 썸네일 생성용)
+    """
+    # 같은 요청 안의 중복 첨부는 키 하나로
+    uploads = {}
+    for file, content, digest in files_read:
+        file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
+        key = storage.content_key("reviews", digest, file_extension)
+        uploads.setdefault(key, (file, content, digest))
+
+    results = await asyncio.gather(
+        *(storage.upload_if_absent(key, content, file.content_type) for key, (file, content, _) in uploads.items()),
+        return_exceptions=True
+    )
+    file_urls, photos = [], []
+    for (file, content, digest), result in zip(uploads.values(), results):
+        if isinstance(result, Exception):
+            logger.error(f"파일 저장 실패 ({file.filename}): {str(result)}")
+            continue
+        file_urls.append(result)
+        photos.append((digest, content))
+    return (json.dumps(file_urls) if file_urls else None), photos
 
 @router.put("/reviews/{review_id}", response_model=ReviewOut)
 async def update_place_review(
     review_id: int,
-    review_data: ReviewUpdate,
-    db: AsyncSession = Depends(get_database)
+    review_data: ReviewUpdate
 ):
-    """리뷰 수정"""
-    # 리뷰 조회
-    review = await get_review(db, review_id)
-    if not review:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="리뷰를 찾을 수 없습니다."
-        )
-    
+    """리뷰 수정 - UPDATE ... RETURNING 한 번으로 수정, 결과가 없으면 404"""
     # 평점 검증
     if review_data.rating is not None and (review_data.rating < 1 or review_data.rating > 5):
         raise HTTPException(
@@ -213,31 +190,46 @@ async def update_place_review(
     # 업데이트할 데이터 준비
     update_data = review_data.dict(exclude_unset=True)
     
-    updated_review = await update_review(db, review_id, update_data)
+    async with autocommit_engine.connect() as conn:
+        result = await repository.update_review(conn, review_id, update_data)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="리뷰를 찾을 수 없습니다."
+        )
+    
+    updated_review, old_rating = result
+    await _refresh_catalog_rating(updated_review.place_id)
+    publish_review_change("updated", updated_review)
     return updated_review
 
 @router.delete("/reviews/{review_id}")
-async def delete_place_review(
-    review_id: int,
-    db: AsyncSession = Depends(get_database)
-):
-    """리뷰 삭제"""
-    # 리뷰 조회
-    review = await get_review(db, review_id)
+async def delete_place_review(review_id: int):
+    """리뷰 삭제 - DELETE ... RETURNING 한 번으로 삭제, 결과가 없으면 404"""
+    async with autocommit_engine.connect() as conn:
+        review = await repository.delete_row(conn, "reviews", review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="리뷰를 찾을 수 없습니다."
         )
     
-    await delete_review(db, review_id)
+    await _refresh_catalog_rating(review.place_id)
+    publish_review_change("deleted", review)
     return {"message": "리뷰가 삭제되었습니다."}
 
 @router.get("/reviews/phone/{phone_number}", response_model=List[ReviewOut])
 async def get_reviews_by_phone_number(
     phone_number: str,
-    db: AsyncSession = Depends(get_database)
+    fields: Optional[str] = Query(None, description="응답에 넣을 필드 (쉼표로 구분, id는 항상 포함)")
 ):
     """전화번호로 리뷰 조회"""
-    reviews = await get_reviews_by_phone(db, phone_number)
+    review_fields = parse_fields(fields, REVIEW_FIELDS)
+    async with read_engine.connect() as conn:
+        if review_fields is not None:
+            reviews = await repository.list_rows_sparse(
+                conn, "reviews_by_phone", review_fields, {"phone_number": phone_number}
+            )
+            return Response(content=dump_json(reviews), media_type="application/json")
+        reviews = await repository.list_reviews_by_phone(conn, phone_number)
     return reviews
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import place, review, recommendation
+from app.api.v1.endpoints import place, review, recommendation, batch, events, admin
 
 api_router = APIRouter()
 
@@ -23,3 +23,24 @@ api_router.include_router(
     prefix="/recommendations",
     tags=["추천"]
 )
+
+# 배치 라우터 (조회 API 여러 개를 한 번에)
+api_router.include_router(
+    batch.router,
+    prefix="/batch",
+    tags=["배치"]
+)
+
+# 실시간 이벤트 라우터 (SSE)
+api_router.include_router(
+    events.router,
+    prefix="/events",
+    tags=["이벤트"]
+)
+
+# 관리자 라우터 (X-Admin-Token 필요)
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["관리자"]
+)
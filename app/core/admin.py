@@ -0,0 +1,21 @@
+from fastapi import Header, HTTPException, status
+from typing import Optional
+import os
+import secrets
+
+# 관리자 API 토큰 - 설정하지 않으면 관리자 API는 모두 거부
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN and token) and secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """X-Admin-Token 헤더 확인 (관리자 엔드포인트 의존성)"""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 권한이 필요합니다."
+        )
@@ -0,0 +1,119 @@
+from app.core.config import API_V1_STR, DB_POOL_SIZE
+from app.schemas.batch import BatchItem
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode
+import asyncio
+import json
+import logging
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 배치 API 설정 (환경 변수)
+# 한 번에 받을 하위 요청 수
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+# 동시에 실행할 하위 요청 수 - 배치 하나가 연결 풀을 혼자 다 쓰지 않도록 풀 크기 이하
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(DB_POOL_SIZE)))
+# 배치로 호출할 수 없는 경로 (배치 자신, SSE 스트림, 관리자 API)
+BATCH_EXCLUDED_PREFIXES = (f"{API_V1_STR}/batch", f"{API_V1_STR}/events", f"{API_V1_STR}/admin")
+# 하위 요청에 넘기지 않는 헤더 - 본문은 압축/조건부 응답 없이 그대로 받아 한 응답에 담는다
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"if-none-match", b"if-modified-since"}
+
+
+class BatchItemError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _target(item: BatchItem) -> Tuple[str, bytes]:
+    """하위 요청의 (경로, 쿼리 문자열) - 조회 라우트만 허용"""
+    if item.method.upper() != "GET":
+        raise BatchItemError(405, "배치에서는 GET 요청만 사용할 수 있습니다.")
+    path, _, query = item.path.partition("?")
+    if not path.startswith(f"{API_V1_STR}/") or path.startswith(BATCH_EXCLUDED_PREFIXES):
+        raise BatchItemError(400, f"배치로 호출할 수 없는 경로입니다: {path}")
+    if item.params:
+        extra = urlencode(
+            {key: [str(v) for v in value] if isinstance(value, list) else str(value) for key, value in item.params.items()},
+            doseq=True
+        )
+        query = f"{query}&{extra}" if query else extra
+    return path, query.encode()
+
+
+def _error_body(detail: str) -> bytes:
+    return json.dumps({"detail": detail}, ensure_ascii=False).encode()
+
+
+async def _dispatch(scope: dict, item: BatchItem) -> Tuple[int, Optional[bytes], bool]:
+    """하위 요청 하나를 라우터로 직접 전달 (미들웨어, HTTP 왕복 없이) → (상태, 본문, JSON 여부)"""
+    try:
+        path, query_string = _target(item)
+    except BatchItemError as e:
+        return e.status_code, _error_body(e.detail), True
+
+    sub_scope = {
+        key: value for key, value in scope.items()
+        if key not in ("endpoint", "route", "path_params", "router")
+    }
+    sub_scope.update({
+        "method": "GET",
+        "path": scope.get("root_path", "") + path,
+        "raw_path": path.encode(),
+        "query_string": query_string,
+        "headers": [(name, value) for name, value in scope["headers"] if name not in _DROPPED_HEADERS],
+    })
+
+    status_code = 500
+    content_type = b""
+    chunks: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await scope["app"].router(sub_scope, receive, send)
+    except StarletteHTTPException as e:
+        # 일치하는 라우트가 없을 때 등 라우트 밖에서 나는 오류
+        return e.status_code, _error_body(e.detail), True
+    except Exception as e:
+        logger.error(f"배치 하위 요청 실패 ({path}): {str(e)}")
+        return 500, _error_body(f"요청 처리 중 오류가 발생했습니다: {str(e)}"), True
+
+    body = b"".join(chunks)
+    return status_code, body or None, content_type.startswith(b"application/json")
+
+
+async def run_batch(scope: dict, items: List[BatchItem]) -> bytes:
+    """하위 요청을 동시에 실행하고 순서대로 하나의 JSON 응답 본문으로 합침
+
+    하위 응답은 이미 JSON으로 직렬화되어 있으므로 다시 파싱하지 않고 그대로 이어 붙인다.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(item: BatchItem):
+        async with semaphore:
+            return await _dispatch(scope, item)
+
+    results = await asyncio.gather(*(run(item) for item in items))
+
+    parts = []
+    for item, (status_code, body, is_json) in zip(items, results):
+        if body is None:
+            body = b"null"
+        elif not is_json:
+            body = json.dumps(body.decode("utf-8", "replace"), ensure_ascii=False).encode()
+        head = json.dumps({"id": item.id, "path": item.path, "status": status_code}, ensure_ascii=False)
+        parts.append(head[:-1].encode() + b', "body": ' + body + b"}")
+    return b'{"responses": [' + b", ".join(parts) + b"]}"
@@ -0,0 +1,89 @@
+from app.core.config import autocommit_engine
+from app.crud import repository
+from app.schemas.review import ReviewOut
+from typing import List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 리뷰 INSERT 일괄 처리 설정
+REVIEW_BATCH_ENABLED = os.getenv("REVIEW_BATCH_ENABLED", "false").lower() == "true"
+# 첫 요청이 들어온 뒤 모으는 시간 (ms)
+REVIEW_BATCH_WINDOW_MS = float(os.getenv("REVIEW_BATCH_WINDOW_MS", "5"))
+# 이만큼 모이면 시간과 관계없이 바로 flush
+REVIEW_BATCH_MAX_SIZE = int(os.getenv("REVIEW_BATCH_MAX_SIZE", "100"))
+
+
+class ReviewWriteBatcher:
+    """짧은 시간 동안 들어온 리뷰 INSERT를 모아 multi-row INSERT ... RETURNING 한 번으로 저장
+
+    호출자는 자신의 행을 future로 받는다. INSERT는 autocommit 한 문장이므로
+    future가 완료된 시점에는 이미 커밋되어 있다.
+    """
+
+    def __init__(self, window_ms: float, max_size: int):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, review: dict) -> ReviewOut:
+        """review: place_id, phone_number, rating, content, photo_urls"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((review, future))
+        if len(self._pending) >= self.max_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            async with autocommit_engine.connect() as conn:
+                reviews = await repository.insert_reviews(conn, [review for review, _ in batch])
+            for (_, future), review in zip(batch, reviews):
+                if not future.done():
+                    future.set_result(review)
+            logger.debug("리뷰 일괄 저장: %d건", len(batch))
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # 한 건의 오류(존재하지 않는 가게 등)가 묶음 전체를 실패시키지 않도록 개별 저장으로 재시도
+            logger.warning(f"리뷰 일괄 저장 실패, 개별 저장으로 재시도 ({len(batch)}건): {str(e)}")
+            for review, future in batch:
+                try:
+                    async with autocommit_engine.connect() as conn:
+                        result = await repository.insert_review(conn, review)
+                    if not future.done():
+                        future.set_result(result)
+                except Exception as single_error:
+                    if not future.done():
+                        future.set_exception(single_error)
+
+    async def close(self):
+        """남은 요청을 모두 저장 (종료 시)"""
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+# 워커 프로세스당 하나의 배처 (REVIEW_BATCH_ENABLED일 때만 사용)
+review_batcher = ReviewWriteBatcher(REVIEW_BATCH_WINDOW_MS, REVIEW_BATCH_MAX_SIZE)
@@ -0,0 +1,742 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import count, islice
+from app.core.shared_cache import shared_cache, L2_CACHE_ENABLED
+from app.crud import repository
+from app.crud.repository import Connection, average_rating
+from app.schemas.place import PlaceOut, PlaceDetailOut, RankedPlaceOut
+from app.schemas.menu import MenuOut
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import hashlib
+import heapq
+import json
+import logging
+import os
+import random
+import sys
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# NULL 예산/가격을 나타내는 값 (정수 배열에는 None을 넣을 수 없음)
+NO_VALUE = -1
+# 가격순 정렬 배열에서 가격 없는 메뉴 자리 - 어떤 예산에도 맞지 않도록 가장 뒤로
+_UNPRICED = 2 ** 31 - 1
+
+# list_places 정렬 기준
+SORT_KEYS = ("rating", "review_count", "budget_range")
+
+# 베이지안 평균 = (C * 카테고리 평균 + 평점 합) / (C + 리뷰 수) 의 C (리뷰 몇 개만큼 사전 평균을 믿을지)
+RANKING_PRIOR_WEIGHT = float(os.getenv("RANKING_PRIOR_WEIGHT", "10"))
+# 카테고리마다 유지하는 상위 가게 수 (/places/top의 n 최댓값)
+RANKING_TOP_K = int(os.getenv("RANKING_TOP_K", "50"))
+# 카테고리 평균(사전 평균)은 이만큼 평점이 바뀌면 다시 계산
+RANKING_REBUILD_CHANGES = int(os.getenv("RANKING_REBUILD_CHANGES", "1000"))
+
+# 내용 지문은 가게별 해시의 합 (2^64 나머지) - 적용 순서와 관계없이 같은 내용이면 같은 값
+_FINGERPRINT_MASK = 2 ** 64 - 1
+
+# 필드 선택 응답에서 배열을 그대로 읽는 필드 -> 배열 이름
+_FIELD_COLUMNS = {
+    "id": "ids", "name": "names", "distance_note": "distance_notes",
+    "address": "addresses", "hero_image_url": "hero_image_urls",
+}
+
+# 스냅숏에 넣지 않는 필드 - 상위 K개 캐시는 처음 조회할 때 다시 만들고, 평점 조회 순번은 워커마다 다르다
+_SNAPSHOT_SKIPPED = ("_top", "_top_prior", "_top_changes", "_top_dirty", "_rating_read_seq")
+
+# 평점 집계 조회 순번 (워커 전체, 전체 교체와 관계없이 증가)
+_rating_reads = count(1)
+_SNAPSHOT_FORMAT = 1
+
+
+class Catalog:
+    """가게/메뉴/평점 집계를 메모리에 보관하는 카탈로그
+
+    가게마다 객체를 만들지 않고 컬럼별 배열에 저장한다. 행 번호(row)가 배열 인덱스이며,
+    카테고리는 1바이트 코드, 메뉴는 전역 메뉴 배열 안의 가게별 연속 구간(offset, 개수)이다.
+    삭제된 가게는 alive만 0으로 두고 다음 전체 적재 때 정리한다.
+    응답용 pydantic 객체는 요청에 필요한 행만 그때그때 만든다.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # 전체 적재 중이면 True, 전체 교체(적재/스냅숏)마다 증가하는 세대
+        # - 변경 알림 리스너가 교체로 덮어써질 반영을 미뤘다가 교체 뒤에 다시 하도록 (invalidation.py)
+        self.loading = False
+        self.load_generation = 0
+        # 내용이 바뀔 때마다 증가 - 응답 캐시(ETag) 키로 사용
+        self.version = 0
+        # 내용 지문 - 워커 간 공유 캐시(L2) 키로 사용 (L2를 켰을 때만 계산)
+        self.fingerprint = 0
+        self.place_digests = array("Q")
+        # 적재한 스냅숏의 증분 동기화 토큰 (sql/004) - 이 카탈로그로 내보낸 목록 다음에 받을 변경의 시작점
+        self.change_token: Optional[int] = None
+
+        # 가게 컬럼 (row 단위)
+        self.ids = array("q")
+        self.category_codes = array("B")
+        self.budgets = array("i")
+        self.rating_sums = array("q")
+        self.rating_counts = array("i")
+        self.alive = bytearray()
+        self.names: List[str] = []
+        self.distance_notes: List[Optional[str]] = []
+        self.addresses: List[Optional[str]] = []
+        self.hero_image_urls: List[Optional[str]] = []
+
+        # 가게별 메뉴 구간 (row 단위) 과 메뉴 컬럼
+        self.menu_offsets = array("i")
+        self.menu_lengths = array("i")
+        self.menu_ids = array("q")
+        self.menu_prices = array("i")
+        self.menu_names: List[str] = []
+        # 같은 구간을 가격순으로 정렬한 사본 (가격, 원래 메뉴 위치) - 예산 안의 메뉴를 bisect로 찾는다
+        self.menu_sorted_prices = array("i")
+        self.menu_price_order = array("i")
+
+        # 가게 가격(가장 싼 메뉴, 메뉴 가격이 없으면 budget_range)과 카테고리별 가격순 인덱스
+        self.place_prices = array("i")
+        self._price_index_prices: Dict[int, array] = {}
+        self._price_index_rows: Dict[int, array] = {}
+
+        # 카테고리 코드표와 카테고리별 row 목록
+        self.categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self.by_category: Dict[int, array] = {}
+
+        # 전체 적재분(ids[:_indexed])은 id 오름차순이라 이진 탐색, 그 뒤에 추가된 가게는 dict로 찾는다
+        self._indexed = 0
+        self._appended_rows: Dict[int, int] = {}
+
+        # 카테고리별 상위 K개 [(점수, -id, row)] 점수 내림차순 - 처음 조회할 때 만들고 이후 평점 변경마다 갱신
+        self._top: Dict[int, List[Tuple[float, int, int]]] = {}
+        self._top_prior: Dict[int, float] = {}
+        self._top_changes: Dict[int, int] = {}
+        self._top_dirty: Set[int] = set()
+
+        # 가게별로 마지막에 반영한 평점 집계 조회의 순번 - 먼저 시작한 조회가 늦게 끝나도 새 값을 덮어쓰지 않도록
+        self._rating_read_seq: Dict[int, int] = {}
+
+    async def load(self, conn: Connection):
+        """가게, 메뉴, 평점 집계를 새 배열에 적재한 뒤 한 번에 교체
+
+        conn은 세 조회가 같은 스냅숏을 보도록 REPEATABLE READ 트랜잭션 (snapshot_engine.begin())
+        """
+        self.load_generation += 1
+        self.loading = True
+        try:
+            await self._load(conn)
+        finally:
+            self.loading = False
+
+    async def _load(self, conn: Connection):
+        place_rows, menu_rows, rating_rows = await repository.load_catalog_rows(conn)
+        fresh = Catalog()
+        for row in place_rows:
+            fresh._append_place(row._mapping)
+        fresh._indexed = len(fresh.ids)
+        fresh._load_menus(menu_rows)
+        fresh._build_price_index()
+        for row in rating_rows:
+            place_row = fresh._row(row.place_id)
+            if place_row is not None:
+                fresh.rating_sums[place_row] = int(row.rating_sum)
+                fresh.rating_counts[place_row] = row.review_count
+        if L2_CACHE_ENABLED:
+            for place_row in range(len(fresh.ids)):
+                fresh._update_digest(place_row)
+        fresh.change_token = await self._load_change_token(conn)
+        fresh.loaded = True
+        fresh.version = self.version + 1
+        fresh.load_generation = self.load_generation
+
+        # 적재 중에는 기존 데이터로 응답하고, 다 만든 뒤 교체
+        self.__dict__.update(fresh.__dict__)
+        logger.info(f"카탈로그 적재 완료: 가게 {len(self.ids)}개, 메뉴 {len(self.menu_ids)}개")
+
+    async def _load_change_token(self, conn: Connection) -> Optional[int]:
+        """적재 트랜잭션과 같은 스냅숏에서 동기화 토큰 발급 - 실패해도(sql/004 미적용 등) 세이브포인트라 적재는 계속"""
+        try:
+            async with conn.begin_nested():
+                token, _ = await repository.get_change_token(conn)
+            return token
+        except Exception as e:
+            logger.warning(f"카탈로그 동기화 토큰 발급 실패: {str(e)}")
+            return None
+
+    # 적재/갱신
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(sys.intern(category))
+            self._category_codes[category] = code
+            self.by_category[code] = array("i")
+        return code
+
+    def _append_place(self, place) -> int:
+        row = len(self.ids)
+        if self.loaded:
+            self._appended_rows[place["id"]] = row
+        self.ids.append(place["id"])
+        self.alive.append(1)
+        self.rating_sums.append(0)
+        self.rating_counts.append(0)
+        self.menu_offsets.append(len(self.menu_ids))
+        self.menu_lengths.append(0)
+        self.place_prices.append(NO_VALUE)
+        self.place_digests.append(0)
+        self.category_codes.append(0)
+        self.budgets.append(NO_VALUE)
+        self.names.append("")
+        self.distance_notes.append(None)
+        self.addresses.append(None)
+        self.hero_image_urls.append(None)
+        self._set_place(row, place, is_new=True)
+        return row
+
+    def _set_place(self, row: int, place, is_new: bool = False):
+        code = self._category_code(place["category"])
+        if is_new:
+            self.by_category[code].append(row)
+        elif code != self.category_codes[row]:
+            self._remove_from_category(row)
+            self.by_category[code].append(row)
+        self.category_codes[row] = code
+        budget = place["budget_range"]
+        self.budgets[row] = NO_VALUE if budget is None else budget
+        self.names[row] = place["name"]
+        self.distance_notes[row] = place["distance_note"]
+        self.addresses[row] = place["address"]
+        self.hero_image_urls[row] = place["hero_image_url"]
+
+    def _remove_from_category(self, row: int):
+        rows = self.by_category[self.category_codes[row]]
+        if row in rows:
+            rows.remove(row)
+
+    def _load_menus(self, menu_rows: Iterable):
+        """place_id·id순으로 정렬된 메뉴를 가게별 연속 구간으로 적재"""
+        current_row = None
+        for menu in menu_rows:
+            place_row = self._row(menu.place_id)
+            if place_row is None:
+                continue
+            if place_row != current_row:
+                current_row = place_row
+                self.menu_offsets[place_row] = len(self.menu_ids)
+            self._append_menu(menu)
+            self.menu_lengths[place_row] += 1
+        for row in range(len(self.ids)):
+            self._sort_menu_block(row)
+
+    def _append_menu(self, menu):
+        self.menu_ids.append(menu.id)
+        self.menu_prices.append(NO_VALUE if menu.price is None else menu.price)
+        self.menu_names.append(menu.name)
+        self.menu_sorted_prices.append(_UNPRICED)
+        self.menu_price_order.append(0)
+
+    def _sort_menu_block(self, row: int):
+        """가게의 메뉴 구간을 가격순으로 정렬해 menu_sorted_prices/menu_price_order에 기록"""
+        start = self.menu_offsets[row]
+        end = start + self.menu_lengths[row]
+        prices = self.menu_prices
+        order = sorted(range(start, end), key=lambda i: _UNPRICED if prices[i] == NO_VALUE else prices[i])
+        for position, i in enumerate(order, start):
+            self.menu_sorted_prices[position] = _UNPRICED if prices[i] == NO_VALUE else prices[i]
+            self.menu_price_order[position] = i
+
+    def _place_price(self, row: int) -> int:
+        if self.menu_lengths[row] and self.menu_sorted_prices[self.menu_offsets[row]] != _UNPRICED:
+            return self.menu_sorted_prices[self.menu_offsets[row]]
+        return self.budgets[row]
+
+    def _build_price_index(self):
+        """카테고리별로 가게를 가격순 정렬 (전체 적재 시)"""
+        for code, rows in self.by_category.items():
+            entries = []
+            for row in rows:
+                price = self.place_prices[row] = self._place_price(row)
+                if price != NO_VALUE:
+                    entries.append((price, row))
+            entries.sort()
+            self._price_index_prices[code] = array("i", (price for price, _ in entries))
+            self._price_index_rows[code] = array("i", (row for _, row in entries))
+
+    def _index_price(self, row: int):
+        price = self.place_prices[row] = self._place_price(row)
+        if price == NO_VALUE:
+            return
+        code = self.category_codes[row]
+        prices = self._price_index_prices.setdefault(code, array("i"))
+        rows = self._price_index_rows.setdefault(code, array("i"))
+        position = bisect_right(prices, price)
+        prices.insert(position, price)
+        rows.insert(position, row)
+
+    def _unindex_price(self, row: int):
+        price = self.place_prices[row]
+        if price == NO_VALUE:
+            return
+        code = self.category_codes[row]
+        prices, rows = self._price_index_prices[code], self._price_index_rows[code]
+        # 같은 가격 구간 안에서만 row를 찾는다
+        for position in range(bisect_left(prices, price), bisect_right(prices, price)):
+            if rows[position] == row:
+                del prices[position]
+                del rows[position]
+                break
+        self.place_prices[row] = NO_VALUE
+
+    async def reload_place(self, conn: Connection, place_id: int):
+        """가게 정보와 메뉴를 DB에서 다시 읽음 (삭제된 가게는 제거)"""
+        if not self.loaded:
+            return
+        place = await repository.get_place_row(conn, place_id)
+        row = self._row(place_id)
+        if place is None:
+            if row is not None:
+                self._unindex_price(row)
+                self._remove_from_category(row)
+                self.alive[row] = 0
+                self._top_dirty.add(self.category_codes[row])
+                self._changed(row)
+            return
+        if row is None:
+            row = self._append_place(place)
+        else:
+            self._top_dirty.add(self.category_codes[row])
+            self._unindex_price(row)
+            self._set_place(row, place)
+        self._top_dirty.add(self.category_codes[row])
+
+        # 새 메뉴 구간을 끝에 추가 (이전 구간은 다음 전체 적재 때 정리)
+        menus = await repository.list_menus(conn, place_id)
+        self.menu_offsets[row] = len(self.menu_ids)
+        self.menu_lengths[row] = len(menus)
+        for menu in menus:
+            self._append_menu(menu)
+        self._sort_menu_block(row)
+        self._index_price(row)
+        self._changed(row)
+
+    async def refresh_rating(self, conn: Connection, place_id: int) -> bool:
+        """커밋된 리뷰 변경 후 해당 가게의 평점 집계를 DB 값(절댓값)으로 갱신 - 값이 바뀌었으면 True
+
+        이 워커의 쓰기(리뷰 작성/수정/삭제)와 변경 알림이 모두 이것으로 반영하므로 어느 쪽이 먼저 와도
+        같은 변경을 두 번 더하지 않는다. 이미 같은 값이면(다른 쪽이 먼저 반영) False.
+        """
+        row = self._row(place_id) if self.loaded else None
+        if row is None:
+            return False
+        seq = next(_rating_reads)
+        generation = self.load_generation
+        rating = await repository.get_place_rating(conn, place_id)
+        if generation != self.load_generation or seq < self._rating_read_seq.get(place_id, 0):
+            # 조회하는 동안 전체 교체됐거나 나중에 시작한 조회가 이미 반영됨 (전체 교체는 리스너가 다시 반영)
+            return False
+        self._rating_read_seq[place_id] = seq
+        row = self._row(place_id)
+        if row is None or rating == (self.rating_sums[row], self.rating_counts[row]):
+            return False
+        self.rating_sums[row], self.rating_counts[row] = rating
+        self._update_top(row)
+        self._changed(row)
+        return True
+
+    def apply_rating_change(self, place_id: int, rating_delta: int, count_delta: int):
+        """평점 집계에 변화량을 더한다 - 변경 알림과 겹칠 수 있는 쓰기 경로에서는 refresh_rating을 쓴다"""
+        row = self._row(place_id) if self.loaded else None
+        if row is None:
+            return
+        self.rating_sums[row] += rating_delta
+        self.rating_counts[row] += count_delta
+        self._update_top(row)
+        self._changed(row)
+
+    def _changed(self, row: int):
+        """가게 하나가 바뀐 뒤 - 버전 증가, 지문 갱신, 다른 워커가 지난 스냅숏을 쓰지 않도록 기록"""
+        self.version += 1
+        if L2_CACHE_ENABLED:
+            self._update_digest(row)
+            shared_cache.note_change()
+
+    # 워커 간 공유 (L2)
+
+    def _place_digest(self, row: int) -> int:
+        """응답에 나가는 가게 내용(메뉴, 평점 집계 포함)의 64비트 해시 - 삭제된 가게는 0"""
+        if not self.alive[row]:
+            return 0
+        start = self.menu_offsets[row]
+        parts = [
+            self.ids[row], self.names[row], self.categories[self.category_codes[row]],
+            self.distance_notes[row], self.addresses[row], self.hero_image_urls[row],
+            self.budgets[row], self.rating_sums[row], self.rating_counts[row],
+        ]
+        for i in range(start, start + self.menu_lengths[row]):
+            parts += (self.menu_ids[i], self.menu_names[i], self.menu_prices[i])
+        digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def _update_digest(self, row: int):
+        digest = self._place_digest(row)
+        self.fingerprint = (self.fingerprint - self.place_digests[row] + digest) & _FINGERPRINT_MASK
+        self.place_digests[row] = digest
+
+    @property
+    def shared_version(self) -> Optional[str]:
+        """L2 캐시 키로 쓰는 카탈로그 버전 (L2를 끄면 None)"""
+        return f"{self.fingerprint:016x}" if L2_CACHE_ENABLED and self.loaded else None
+
+    def snapshot_state(self) -> dict:
+        """스냅숏용 사본 - 이벤트 루프에서 컨테이너만 복사하고 직렬화는 스레드에서 (배열 복사는 memcpy)"""
+        state = {}
+        for name, value in self.__dict__.items():
+            if name in _SNAPSHOT_SKIPPED:
+                continue
+            if isinstance(value, (array, bytearray, list)):
+                value = value[:]
+            elif isinstance(value, set):
+                value = set(value)
+            elif isinstance(value, dict):
+                value = {key: item[:] if isinstance(item, (array, list)) else item for key, item in value.items()}
+            state[name] = value
+        return state
+
+    def restore(self, state: dict):
+        """스냅숏으로 교체 - 필드 구성이 다르면(배포로 카탈로그 구조가 바뀐 경우) ValueError"""
+        fresh = Catalog().__dict__
+        if set(state) != set(fresh) - set(_SNAPSHOT_SKIPPED):
+            raise ValueError("카탈로그 스냅숏 형식이 다릅니다.")
+        version = self.version + 1
+        generation = self.load_generation + 1
+        self.__dict__.update(state)
+        for name in _SNAPSHOT_SKIPPED:
+            setattr(self, name, fresh[name])
+        self.version = version
+        self.load_generation = generation
+        self.loading = False
+        self.loaded = True
+        logger.info(f"카탈로그 스냅숏 적재 완료: 가게 {len(self.ids)}개, 메뉴 {len(self.menu_ids)}개")
+
+    # 조회
+
+    def _row(self, place_id: int) -> Optional[int]:
+        """place_id -> row (id 배열 이진 탐색)"""
+        row = bisect_left(self.ids, place_id, 0, self._indexed)
+        if row == self._indexed or self.ids[row] != place_id:
+            row = self._appended_rows.get(place_id)
+            if row is None:
+                return None
+        return row if self.alive[row] else None
+
+    def has_place(self, place_id: int) -> bool:
+        return self._row(place_id) is not None
+
+    def category_of(self, place_id: int) -> Optional[str]:
+        row = self._row(place_id)
+        return self.categories[self.category_codes[row]] if row is not None else None
+
+    def within_budget(self, place_id: int, budget: int) -> bool:
+        """가게 가격(가장 싼 메뉴 또는 budget_range)이 예산 이하인지"""
+        row = self._row(place_id)
+        return row is not None and self.place_prices[row] != NO_VALUE and self.place_prices[row] <= budget
+
+    def rating_of(self, place_id: int) -> Tuple[float, int]:
+        """(평균 평점, 리뷰 수)"""
+        row = self._row(place_id)
+        if row is None:
+            return 0.0, 0
+        return average_rating(self.rating_sums[row], self.rating_counts[row]), self.rating_counts[row]
+
+    def _place_fields(self, row: int) -> dict:
+        budget = self.budgets[row]
+        count = self.rating_counts[row]
+        return {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "category": self.categories[self.category_codes[row]],
+            "distance_note": self.distance_notes[row],
+            "address": self.addresses[row],
+            "hero_image_url": self.hero_image_urls[row],
+            "budget_range": None if budget == NO_VALUE else budget,
+            "rating": average_rating(self.rating_sums[row], count),
+            "review_count": count,
+        }
+
+    def _menus(self, row: int) -> List[MenuOut]:
+        place_id = self.ids[row]
+        start = self.menu_offsets[row]
+        return [
+            MenuOut(
+                id=self.menu_ids[i],
+                place_id=place_id,
+                name=self.menu_names[i],
+                price=None if self.menu_prices[i] == NO_VALUE else self.menu_prices[i]
+            )
+            for i in range(start, start + self.menu_lengths[row])
+        ]
+
+    def _menu_dicts(self, row: int) -> List[dict]:
+        place_id = self.ids[row]
+        start = self.menu_offsets[row]
+        return [
+            {
+                "id": self.menu_ids[i],
+                "place_id": place_id,
+                "name": self.menu_names[i],
+                "price": None if self.menu_prices[i] == NO_VALUE else self.menu_prices[i],
+            }
+            for i in range(start, start + self.menu_lengths[row])
+        ]
+
+    def _field_getter(self, field: str) -> Callable[[int], object]:
+        if field == "category":
+            return lambda row: self.categories[self.category_codes[row]]
+        if field == "budget_range":
+            return lambda row: None if self.budgets[row] == NO_VALUE else self.budgets[row]
+        if field == "rating":
+            return lambda row: average_rating(self.rating_sums[row], self.rating_counts[row])
+        if field == "review_count":
+            return self.rating_counts.__getitem__
+        return getattr(self, _FIELD_COLUMNS[field]).__getitem__
+
+    def sparse_rows(self, rows: Iterable[int], fields: Sequence[str], with_menus: bool = False) -> List[dict]:
+        """필드 선택(fields=) 응답 - 요청한 필드만 배열에서 꺼낸 dict (PlaceOut을 만들지 않음)"""
+        getters = [(field, self._field_getter(field)) for field in fields]
+        places = []
+        for row in rows:
+            place = {field: get(row) for field, get in getters}
+            if with_menus:
+                place["menus"] = self._menu_dicts(row)
+            places.append(place)
+        return places
+
+    def sparse_places(
+        self, category: Optional[str], sort: Optional[str], fields: Sequence[str], with_menus: bool = False
+    ) -> List[dict]:
+        rows = self.filter_rows(category)
+        if sort:
+            rows = self.sort_rows(rows, sort)
+        return self.sparse_rows(rows, fields, with_menus)
+
+    def sparse_place(self, place_id: int, fields: Sequence[str], with_menus: bool = False) -> Optional[dict]:
+        row = self._row(place_id)
+        return self.sparse_rows((row,), fields, with_menus)[0] if row is not None else None
+
+    def place_out(self, place_id: int) -> Optional[PlaceOut]:
+        row = self._row(place_id)
+        return PlaceOut(**self._place_fields(row)) if row is not None else None
+
+    def place_detail(self, place_id: int) -> Optional[PlaceDetailOut]:
+        row = self._row(place_id)
+        if row is None:
+            return None
+        return PlaceDetailOut(**self._place_fields(row), menus=self._menus(row))
+
+    def menus_of(self, place_id: int) -> List[MenuOut]:
+        row = self._row(place_id)
+        return self._menus(row) if row is not None else []
+
+    def filter_rows(self, category: Optional[str] = None) -> array:
+        """조건에 맞는 row 목록 (카테고리는 카테고리별 row 배열을 그대로 복사)"""
+        if category:
+            code = self._category_codes.get(category)
+            return array("i", self.by_category[code]) if code is not None else array("i")
+        alive = self.alive
+        return array("i", (row for row in range(len(alive)) if alive[row]))
+
+    def sort_rows(self, rows: array, sort: str) -> List[int]:
+        """응답 값 기준 내림차순, 같으면 id 오름차순 (rating / review_count / budget_range)
+
+        DB 조회 경로(place.py)와 같은 순서가 되도록 평점은 응답에 나가는 반올림 평균으로,
+        budget_range가 없으면 0으로 비교한다.
+        """
+        ids = self.ids
+        if sort == "rating":
+            sums, counts = self.rating_sums, self.rating_counts
+            return sorted(rows, key=lambda row: (-average_rating(sums[row], counts[row]), ids[row]))
+        if sort == "review_count":
+            counts = self.rating_counts
+            return sorted(rows, key=lambda row: (-counts[row], ids[row]))
+        if sort == "budget_range":
+            budgets = self.budgets
+            return sorted(rows, key=lambda row: (-max(budgets[row], 0), ids[row]))
+        raise ValueError(f"지원하지 않는 정렬 기준입니다: {sort}")
+
+    def list_places(self, category: Optional[str] = None, sort: Optional[str] = None) -> List[PlaceOut]:
+        rows = self.filter_rows(category)
+        if sort:
+            rows = self.sort_rows(rows, sort)
+        return [PlaceOut(**self._place_fields(row)) for row in rows]
+
+    def random_place_per_category(self, count: int, budget: Optional[int] = None) -> List[int]:
+        """카테고리 중복 없이 카테고리마다 랜덤 가게 하나씩 (place_id 목록)
+
+        budget이 있으면 카테고리별 가격순 인덱스에서 예산 안에 드는 앞부분만 후보로 쓴다.
+        """
+        if budget is None:
+            codes = [code for code, rows in self.by_category.items() if rows]
+            selected = random.sample(codes, min(count, len(codes)))
+            return [self.ids[random.choice(self.by_category[code])] for code in selected]
+
+        affordable = {
+            code: bisect_right(prices, budget)
+            for code, prices in self._price_index_prices.items()
+        }
+        codes = [code for code, size in affordable.items() if size]
+        selected = random.sample(codes, min(count, len(codes)))
+        return [self.ids[self._price_index_rows[code][random.randrange(affordable[code])]] for code in selected]
+
+    def random_menu(self, place_id: int, budget: Optional[int] = None) -> Optional[MenuOut]:
+        """가게의 랜덤 메뉴 하나 (budget이 있으면 가격순 구간에서 예산 이하만)"""
+        row = self._row(place_id)
+        if row is None or not self.menu_lengths[row]:
+            return None
+        start = self.menu_offsets[row]
+        if budget is None:
+            index = start + random.randrange(self.menu_lengths[row])
+        else:
+            fits = bisect_right(self.menu_sorted_prices, budget, start, start + self.menu_lengths[row]) - start
+            if not fits:
+                return None
+            index = self.menu_price_order[start + random.randrange(fits)]
+        price = self.menu_prices[index]
+        return MenuOut(
+            id=self.menu_ids[index],
+            place_id=place_id,
+            name=self.menu_names[index],
+            price=None if price == NO_VALUE else price
+        )
+
+    # 베이지안 평균 상위 가게
+
+    def _bayesian_score(self, row: int, prior: float) -> float:
+        return (RANKING_PRIOR_WEIGHT * prior + self.rating_sums[row]) / (RANKING_PRIOR_WEIGHT + self.rating_counts[row])
+
+    def _rebuild_top(self, code: int):
+        """카테고리 평균을 다시 구하고 상위 K개를 새로 선택 (카테고리 크기만큼의 비용)"""
+        rows = self.by_category.get(code, ())
+        total = sum(self.rating_sums[row] for row in rows)
+        count = sum(self.rating_counts[row] for row in rows)
+        prior = total / count if count else 0.0
+        self._top_prior[code] = prior
+        self._top[code] = heapq.nlargest(
+            RANKING_TOP_K,
+            ((self._bayesian_score(row, prior), -self.ids[row], row) for row in rows)
+        )
+        self._top_changes[code] = 0
+        self._top_dirty.discard(code)
+
+    def _update_top(self, row: int):
+        """평점이 바뀐 가게 하나만 상위 K개에 반영"""
+        code = self.category_codes[row]
+        top = self._top.get(code)
+        if top is None or code in self._top_dirty:
+            return
+        self._top_changes[code] += 1
+        if self._top_changes[code] >= RANKING_REBUILD_CHANGES:
+            # 사전 평균이 많이 움직였을 수 있으므로 다음 조회 때 다시 계산
+            self._top_dirty.add(code)
+            return
+
+        entry = (self._bayesian_score(row, self._top_prior[code]), -self.ids[row], row)
+        position = next((i for i, item in enumerate(top) if item[2] == row), None)
+        if position is not None:
+            del top[position]
+            if len(self.by_category[code]) <= RANKING_TOP_K or (top and entry >= top[-1]):
+                # 여전히 상위 K개 안이거나, 카테고리 전체가 K개 이하
+                top.insert(bisect_left(top, _descending(entry), key=_descending), entry)
+            else:
+                # 상위 K개 밖으로 밀려났다면 대신 들어올 가게를 찾아야 하므로 다시 계산
+                self._top_dirty.add(code)
+        elif len(top) < RANKING_TOP_K or entry > top[-1]:
+            top.insert(bisect_left(top, _descending(entry), key=_descending), entry)
+            del top[RANKING_TOP_K:]
+
+    def top_places(self, category: Optional[str], n: int) -> List[RankedPlaceOut]:
+        """베이지안 평균 상위 n개 (카테고리를 생략하면 카테고리별 상위 목록을 병합)"""
+        if category:
+            code = self._category_codes.get(category)
+            codes = [code] if code is not None else []
+        else:
+            codes = list(self.by_category)
+        for code in codes:
+            if code not in self._top or code in self._top_dirty:
+                self._rebuild_top(code)
+
+        merged = heapq.merge(*(self._top[code] for code in codes), key=_descending)
+        return [
+            RankedPlaceOut(**self._place_fields(row), score=round(score, 2))
+            for score, _, row in islice(merged, n)
+        ]
+
+
+def _descending(entry: Tuple[float, int, int]) -> Tuple[float, int]:
+    """상위 목록 정렬 키 - 점수 내림차순, 같으면 id 오름차순"""
+    return -entry[0], -entry[1]
+
+
+# 카탈로그 스냅숏 직렬화 (L2 공유 파일에 저장) - 읽을 때 코드가 실행될 수 있는 pickle 대신
+# [헤더 길이 4바이트][JSON 헤더][배열 바이트들] 형식. 배열은 tobytes()로, 나머지는 JSON 값으로 넣는다.
+
+def encode_snapshot(state: dict) -> bytes:
+    """snapshot_state()의 사본을 바이트로 (스레드에서 호출)"""
+    blobs: List[bytes] = []
+    offset = 0
+
+    def blob(data: bytes) -> List[int]:
+        nonlocal offset
+        blobs.append(data)
+        offset += len(data)
+        return [offset - len(data), len(data)]
+
+    def encode(value):
+        if isinstance(value, array):
+            return {"array": value.typecode, "data": blob(value.tobytes())}
+        if isinstance(value, bytearray):
+            return {"bytes": blob(bytes(value))}
+        if isinstance(value, dict):
+            # 키가 정수인 dict도 있어 [키, 값] 목록으로
+            return {"dict": [[key, encode(item)] for key, item in value.items()]}
+        if value is None or isinstance(value, (bool, int, float, str, list)):
+            return {"json": value}
+        raise ValueError(f"스냅숏에 넣을 수 없는 값입니다: {type(value).__name__}")
+
+    fields = {name: encode(value) for name, value in state.items()}
+    header = json.dumps(
+        {"format": _SNAPSHOT_FORMAT, "byteorder": sys.byteorder, "fields": fields},
+        ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return b"".join([len(header).to_bytes(4, "big"), header, *blobs])
+
+
+def decode_snapshot(body: bytes) -> dict:
+    """encode_snapshot의 역 - 형식이 다르면 ValueError (스레드에서 호출)"""
+    size = int.from_bytes(body[:4], "big")
+    header = json.loads(body[4:4 + size])
+    if header.get("format") != _SNAPSHOT_FORMAT or header.get("byteorder") != sys.byteorder:
+        raise ValueError("카탈로그 스냅숏 형식이 다릅니다.")
+    data = memoryview(body)[4 + size:]
+
+    def decode(spec: dict):
+        if "array" in spec:
+            start, length = spec["data"]
+            value = array(spec["array"])
+            value.frombytes(data[start:start + length])
+            return value
+        if "bytes" in spec:
+            start, length = spec["bytes"]
+            return bytearray(data[start:start + length])
+        if "dict" in spec:
+            return {key: decode(item) for key, item in spec["dict"]}
+        return spec["json"]
+
+    return {name: decode(spec) for name, spec in header["fields"].items()}
+
+
+# 워커 프로세스당 하나의 카탈로그
+catalog = Catalog()
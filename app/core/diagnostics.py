@@ -0,0 +1,138 @@
+from typing import List, Optional
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프 진단 설정 (환경 변수)
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+# 하트비트 간격 (ms)
+LOOP_HEARTBEAT_INTERVAL_MS = float(os.getenv("LOOP_HEARTBEAT_INTERVAL_MS", "100"))
+# 이 이상 루프가 멈추면 블로킹으로 보고 스택을 남김 (ms)
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "200"))
+# asyncio 디버그 모드의 느린 콜백 로그 (오버헤드가 있어 기본은 끔)
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "false").lower() == "true"
+LOOP_SLOW_CALLBACK_MS = float(os.getenv("LOOP_SLOW_CALLBACK_MS", "100"))
+
+
+def _blocking_coroutine(frame) -> Optional[str]:
+    """스택에서 가장 안쪽의 코루틴 함수 이름 (블로킹 호출을 한 코루틴)"""
+    while frame is not None:
+        if frame.f_code.co_flags & inspect.CO_COROUTINE:
+            return f"{frame.f_code.co_qualname} ({frame.f_code.co_filename}:{frame.f_lineno})"
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """이벤트 루프 지연 측정과 블로킹 감지
+
+    - 하트비트 태스크: interval마다 깨어나 예정 시각보다 늦은 만큼을 지연(lag)으로 기록
+    - 감시 스레드: 하트비트가 threshold 이상 멈추면 루프 스레드의 현재 스택을 떠서 로그로 남김
+      (루프가 막혀 있는 동안에도 동작해야 하므로 스레드에서 확인)
+    """
+
+    def __init__(self, interval_ms: float, threshold_ms: float):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.blocked_seconds = 0.0
+        self.last_block: Optional[dict] = None
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self):
+        if not LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if LOOP_DEBUG:
+            loop.set_debug(True)
+            loop.slow_callback_duration = LOOP_SLOW_CALLBACK_MS / 1000
+            logging.getLogger("asyncio").setLevel(logging.WARNING)
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_beat = time.monotonic()
+            self.lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self.blocked_seconds += lag
+                logger.warning(
+                    f"이벤트 루프 지연: {lag * 1000:.0f}ms",
+                    extra={"loop_lag_ms": round(lag * 1000, 1)}
+                )
+
+    def _watch(self):
+        reported = False
+        while not self._stop.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            # 블로킹 한 번에 스택 하나만 기록
+            reported = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else None
+            coroutine = _blocking_coroutine(frame)
+            self.blocks += 1
+            self.last_block = {
+                "at": time.time(),
+                "stalled_ms": round(stalled * 1000, 1),
+                "coroutine": coroutine,
+                "stack": stack,
+            }
+            logger.warning(
+                f"이벤트 루프 블로킹 감지: {stalled * 1000:.0f}ms 이상, 코루틴: {coroutine}",
+                extra={"loop_stalled_ms": round(stalled * 1000, 1), "coroutine": coroutine, "stack": stack}
+            )
+
+    def metrics(self) -> List[str]:
+        """Prometheus 텍스트 형식"""
+        return [
+            "# TYPE weeat_event_loop_lag_seconds gauge",
+            f"weeat_event_loop_lag_seconds {self.lag:.6f}",
+            "# TYPE weeat_event_loop_lag_max_seconds gauge",
+            f"weeat_event_loop_lag_max_seconds {self.max_lag:.6f}",
+            "# TYPE weeat_event_loop_blocks_total counter",
+            f"weeat_event_loop_blocks_total {self.blocks}",
+            "# TYPE weeat_event_loop_blocked_seconds_total counter",
+            f"weeat_event_loop_blocked_seconds_total {self.blocked_seconds:.6f}",
+        ]
+
+
+# 워커 프로세스당 하나의 모니터
+loop_monitor = LoopMonitor(LOOP_HEARTBEAT_INTERVAL_MS, LOOP_BLOCK_THRESHOLD_MS)
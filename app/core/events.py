@@ -0,0 +1,196 @@
+from app.core.catalog import catalog
+from app.schemas.review import ReviewOut
+from typing import AsyncIterator, Dict, Hashable, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 실시간 이벤트(SSE) 설정 (환경 변수)
+# 구독자별 대기 이벤트 수 - 넘치면 쌓인 이벤트를 버리고 resync 이벤트 하나로 대신 (클라이언트가 다시 조회)
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "64"))
+# 워커당 최대 구독자 수 - 넘으면 503
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "1000"))
+# 이벤트가 없을 때 연결 유지용 주석을 보내는 간격 (초) - 프록시 유휴 타임아웃 대비
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# 끊긴 뒤 EventSource 재연결 대기 (ms)
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+# 스트림 최대 유지 시간 (초) - 지나면 서버가 끊고 클라이언트가 재연결
+# (배포 시 워커가 열린 스트림 때문에 종료를 기다리지 않도록, 재연결로 워커 간 연결도 고르게)
+SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", "300"))
+
+_KEEPALIVE = b": keepalive\n\n"
+# 큐가 넘친 구독자에게 보내는 이벤트 - 놓친 변경이 있으니 다시 조회하라는 뜻
+_RESYNC = b"event: resync\ndata: {}\n\n"
+# 허브 종료 시 스트림을 끝내는 표시
+_CLOSED = b""
+
+
+def place_topic(place_id: int) -> tuple:
+    return ("place", place_id)
+
+
+def category_topic(category: str) -> tuple:
+    return ("category", category)
+
+
+def encode_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode()
+
+
+class SubscriberLimitError(Exception):
+    """워커의 구독자가 SSE_MAX_SUBSCRIBERS에 도달함 (API에서 503)"""
+
+
+class Subscription:
+    def __init__(self, topics: Set[Hashable]):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.lagged = 0
+        self.closed = False
+
+    def deliver(self, message: bytes):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # 느린 구독자 때문에 발행이 막히거나 메모리가 늘지 않도록 비우고 resync만 남긴다
+            self.lagged += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+
+
+class EventHub:
+    """워커 안의 이벤트 팬아웃 - 토픽(가게, 카테고리)별 구독자 큐에 직렬화된 SSE 메시지를 넣는다
+
+    발행은 이벤트 루프 스레드에서 동기로 하고 기다리지 않는다 (구독자 큐는 크기 제한).
+    메시지는 한 번만 직렬화해서 모든 구독자가 같은 바이트를 보낸다.
+    """
+
+    def __init__(self):
+        self._topics: Dict[Hashable, Set[Subscription]] = {}
+        self._count = 0
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return self._count
+
+    def subscribe(self, topics: Iterable[Hashable]) -> Subscription:
+        """구독 등록 - 구독자가 SSE_MAX_SUBSCRIBERS면 SubscriberLimitError (확인과 등록 사이에 await가 없어 초과하지 않음)"""
+        if self._count >= SSE_MAX_SUBSCRIBERS:
+            raise SubscriberLimitError()
+        subscription = Subscription(set(topics))
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """구독 해제 - 여러 번 불러도 한 번만"""
+        if subscription.closed:
+            return
+        subscription.closed = True
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[topic]
+        self._count -= 1
+        self.dropped += subscription.lagged
+
+    def publish(self, topics: Iterable[Hashable], event: str, data: dict):
+        targets: Set[Subscription] = set()
+        for topic in topics:
+            targets.update(self._topics.get(topic, ()))
+        if not targets:
+            return
+        message = encode_event(event, data)
+        for subscription in targets:
+            subscription.deliver(message)
+        self.published += 1
+
+    def close(self):
+        """종료 시 열린 스트림을 모두 끝낸다"""
+        for subscription in {s for subscribers in self._topics.values() for s in subscribers}:
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(_CLOSED)
+
+    async def stream(self, subscription: Subscription, initial: Optional[bytes] = None) -> AsyncIterator[bytes]:
+        """SSE 응답 본문 - 구독은 호출한 쪽이 subscribe()로 먼저 하고, 응답이 끝나면 unsubscribe()"""
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + SSE_MAX_STREAM_SECONDS
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode() + (initial or b"")
+        while True:
+            remaining = ends_at - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), min(SSE_KEEPALIVE_SECONDS, remaining))
+            except TimeoutError:
+                yield _KEEPALIVE
+                continue
+            if message is _CLOSED:
+                return
+            yield message
+
+    def metrics(self):
+        """Prometheus 텍스트 형식"""
+        return [
+            "# TYPE weeat_sse_subscribers gauge",
+            f"weeat_sse_subscribers {self._count}",
+            "# TYPE weeat_sse_events_published_total counter",
+            f"weeat_sse_events_published_total {self.published}",
+            "# TYPE weeat_sse_lagged_total counter",
+            f"weeat_sse_lagged_total {self.dropped}",
+        ]
+
+
+# 워커 프로세스당 하나
+event_hub = EventHub()
+
+
+def rating_event(place_id: int) -> dict:
+    """현재 평점 집계 (카탈로그에 없는 가게는 place_id만)"""
+    if not catalog.has_place(place_id):
+        return {"place_id": place_id}
+    rating, review_count = catalog.rating_of(place_id)
+    return {"place_id": place_id, "rating": rating, "review_count": review_count}
+
+
+def _topics(place_id: int) -> list:
+    topics = [place_topic(place_id)]
+    category = catalog.category_of(place_id)
+    if category:
+        topics.append(category_topic(category))
+    return topics
+
+
+def publish_review_change(action: str, review: ReviewOut):
+    """리뷰 작성/수정/삭제 커밋 후 (카탈로그 반영 뒤) - 리뷰 요약과 바뀐 평점(평균)/리뷰 수 발행"""
+    if not event_hub.subscribers:
+        return
+    event_hub.publish(_topics(review.place_id), "review", {
+        "action": action,
+        "review": {
+            "id": review.id,
+            "rating": review.rating,
+            # 요약만 - 전체 본문/사진은 리뷰 조회로
+            "content": (review.content or "")[:100] if action != "deleted" else None,
+            "created_at": review.created_at,
+        },
+        **rating_event(review.place_id),
+    })
+
+
+def publish_rating(place_id: int):
+    """다른 워커의 리뷰 변경을 알림으로 반영한 뒤 - 평점 집계만 발행"""
+    if event_hub.subscribers:
+        event_hub.publish(_topics(place_id), "rating", rating_event(place_id))
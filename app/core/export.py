@@ -0,0 +1,63 @@
+from app.core.config import engine
+from app.crud import repository
+from app.crud.repository import EXPORT_TABLES
+from datetime import date, datetime
+from typing import AsyncIterator
+import csv
+import io
+import json
+import os
+
+# 서버 측 커서에서 한 번에 가져올 행 수
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# 서버 측 커서는 트랜잭션 안에서만 열 수 있으므로 autocommit 대신 읽기 전용 스냅샷 트랜잭션 사용
+# (내보내는 동안 들어온 쓰기와 섞이지 않은 일관된 덤프)
+export_engine = engine.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+
+# 형식 -> Content-Type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return "".join(
+        json.dumps(dict(row._mapping), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def export_table(table: str, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """테이블 전체를 NDJSON/CSV 청크로 내보냄 (배치 하나 = 청크 하나)"""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"내보낼 수 없는 테이블입니다: {table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+    if fmt == "csv":
+        columns, _ = EXPORT_TABLES[table]
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        yield ("\ufeff" + ",".join(name.strip() for name in columns.split(",")) + "\r\n").encode()
+
+    encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    async with export_engine.connect() as conn:
+        async for rows in repository.stream_table(conn, table, batch_size):
+            yield encode(rows)
@@ -0,0 +1,66 @@
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from app.schemas.place import PlaceOut
+from app.schemas.menu import MenuOut
+from app.schemas.review import ReviewOut
+from typing import Any, List, Optional, Sequence, Tuple
+import os
+
+# 필드 선택(fields=) / 포함(include=) 설정
+
+# 선택할 수 있는 필드 (응답 필드 순서대로)
+PLACE_FIELDS: Tuple[str, ...] = tuple(PlaceOut.model_fields)
+MENU_FIELDS: Tuple[str, ...] = tuple(MenuOut.model_fields)
+REVIEW_FIELDS: Tuple[str, ...] = tuple(ReviewOut.model_fields)
+# 가게 응답에 함께 넣을 수 있는 것 - 메뉴 목록, 상위 리뷰 (평점 높은 순, 같으면 최신순)
+PLACE_INCLUDES: Tuple[str, ...] = ("menus", "top_reviews")
+# 상위 리뷰로 넣는 필드 (목록 카드용 요약)
+TOP_REVIEW_FIELDS: Tuple[str, ...] = ("id", "rating", "content", "thumbnail_urls", "created_at")
+
+# 가게마다 넣을 상위 리뷰 수
+TOP_REVIEWS_PER_PLACE = int(os.getenv("TOP_REVIEWS_PER_PLACE", "3"))
+# include=top_reviews를 쓸 수 있는 목록 크기 - 넘으면 카테고리로 좁혀야 한다 (리뷰 조회가 목록 크기에 비례)
+TOP_REVIEWS_MAX_PLACES = int(os.getenv("TOP_REVIEWS_MAX_PLACES", "500"))
+
+_sparse_json = TypeAdapter(Any)
+
+
+def _split(raw: str) -> List[str]:
+    return [value.strip() for value in raw.split(",") if value.strip()]
+
+
+def parse_fields(raw: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """"name,rating" → 응답 순서대로 정리한 필드 목록 (id는 항상 포함), 생략하면 None (전체 필드)"""
+    if raw is None:
+        return None
+    requested = set(_split(raw))
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"알 수 없는 필드입니다: {', '.join(sorted(unknown))} (사용 가능: {', '.join(allowed)})"
+        )
+    requested.add("id")
+    return tuple(field for field in allowed if field in requested)
+
+
+def parse_include(raw: Optional[str], allowed: Sequence[str] = PLACE_INCLUDES) -> Tuple[str, ...]:
+    if raw is None:
+        return ()
+    requested = set(_split(raw))
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"포함할 수 없는 항목입니다: {', '.join(sorted(unknown))} (사용 가능: {', '.join(allowed)})"
+        )
+    return tuple(value for value in allowed if value in requested)
+
+
+def pick(data: dict, fields: Sequence[str]) -> dict:
+    return {field: data[field] for field in fields}
+
+
+def dump_json(data) -> bytes:
+    """필드를 고른 dict(목록) 직렬화 (datetime 등은 응답 모델과 같은 형식)"""
+    return _sparse_json.dump_json(data)
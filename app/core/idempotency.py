@@ -0,0 +1,119 @@
+from fastapi import HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import autocommit_engine
+from app.crud import repository
+from typing import List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 멱등성 키(Idempotency-Key 헤더) 설정 (환경 변수)
+# 완료된 응답을 보관하는 시간 (초) - 이 안의 재시도는 저장된 응답을 받는다
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# 처리 중 선점 유지 시간 (초) - 지나면 워커가 죽은 것으로 보고 같은 요청이 다시 선점 (요청 처리 시간보다 넉넉하게)
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+# 같은 키의 요청이 처리 중일 때 기다리는 최대 시간 (초) - 넘으면 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# 기다리는 동안 키를 다시 조회하는 간격 (초)
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", "0.2"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# 저장된 응답을 돌려줄 때 붙이는 헤더
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(*parts) -> str:
+    """같은 키로 다른 요청을 보냈는지 확인하는 요청 해시 (파일은 내용 해시로 - 이름·크기가 같은 다른 사진도 구분)"""
+    payload = json.dumps(parts, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """idempotency_keys 테이블 기반 멱등성 - 워커 간 공유 (sql/005_idempotency_keys.sql)
+
+    begin()으로 키를 선점한 요청만 처리하고, 결과는 complete()로 처리와 같은 트랜잭션에 기록한다.
+    실패하면 release()로 선점을 풀어 같은 키로 다시 시도할 수 있게 한다.
+    """
+
+    def __init__(self):
+        self.replayed = 0
+        self.waited = 0
+        self.conflicts = 0
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Response]:
+        """키 선점 - 선점하면 None (요청을 처리), 완료된 키면 저장된 응답"""
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key는 1-{IDEMPOTENCY_KEY_MAX_LENGTH}자여야 합니다."
+            )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + IDEMPOTENCY_WAIT_SECONDS
+        waited = False
+        while True:
+            async with autocommit_engine.connect() as conn:
+                if await repository.claim_idempotency_key(
+                    conn, key, fingerprint, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL_SECONDS
+                ):
+                    return None
+                row = await repository.get_idempotency_key(conn, key)
+            if row is None:
+                # 조회 사이에 해제/만료됨 - 다시 선점
+                continue
+            if row.request_hash != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="이미 다른 요청에 사용된 Idempotency-Key입니다."
+                )
+            if row.response_status is not None:
+                self.replayed += 1
+                return Response(
+                    content=row.response_body,
+                    status_code=row.response_status,
+                    media_type="application/json",
+                    headers={REPLAYED_HEADER: "true"}
+                )
+            if not waited:
+                waited = True
+                self.waited += 1
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.conflicts += 1
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="같은 Idempotency-Key의 요청이 아직 처리 중입니다. 잠시 후 다시 시도해주세요.",
+                    headers={"Retry-After": "1"}
+                )
+            await asyncio.sleep(min(IDEMPOTENCY_POLL_SECONDS, remaining))
+
+    async def complete(self, conn: AsyncConnection, key: str, body: str, response_status: int = status.HTTP_200_OK):
+        """처리 결과 기록 - 처리(INSERT 등)와 같은 트랜잭션의 conn으로"""
+        await repository.complete_idempotency_key(conn, key, response_status, body)
+
+    async def release(self, key: str):
+        """선점 해제 - 실패해도 선점은 IDEMPOTENCY_LOCK_SECONDS 뒤에 풀리므로 로그만"""
+        try:
+            async with autocommit_engine.connect() as conn:
+                await repository.release_idempotency_key(conn, key)
+        except Exception as e:
+            logger.error(f"멱등성 키 해제 실패: {str(e)}")
+
+    def metrics(self) -> List[str]:
+        """Prometheus 텍스트 형식"""
+        return [
+            "# TYPE weeat_idempotency_replayed_total counter",
+            f"weeat_idempotency_replayed_total {self.replayed}",
+            "# TYPE weeat_idempotency_waited_total counter",
+            f"weeat_idempotency_waited_total {self.waited}",
+            "# TYPE weeat_idempotency_conflicts_total counter",
+            f"weeat_idempotency_conflicts_total {self.conflicts}",
+        ]
+
+
+# 워커 프로세스당 하나
+idempotency_store = IdempotencyStore()
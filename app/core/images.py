@@ -0,0 +1,151 @@
+from app.core.config import autocommit_engine
+from app.core.thumbnails import FORMATS, make_thumbnails
+from app.core import storage
+from app.crud import repository
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 리뷰 사진 후처리 설정 (환경 변수)
+# Pillow가 없으면 사진은 원본만 저장
+IMAGE_PROCESSING_ENABLED = (
+    os.getenv("IMAGE_PROCESSING_ENABLED", "true").lower() == "true"
+    and importlib.util.find_spec("PIL") is not None
+)
+# 축소/인코딩을 맡을 프로세스 수 (CPU 작업이라 이벤트 루프 스레드 밖, GIL 밖에서)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# 대기 작업 수 - 작업마다 원본 사진을 들고 있으므로 작게, 가득 차면 썸네일 없이 넘어간다
+IMAGE_QUEUE_SIZE = int(os.getenv("IMAGE_QUEUE_SIZE", "100"))
+# 썸네일 가로 크기(px) 목록 (쉼표 구분), 형식(webp / jpeg), 품질 - 클라이언트가 화면에 맞는 크기를 고른다
+IMAGE_THUMBNAIL_WIDTHS = tuple(sorted({
+    int(width) for width in os.getenv("IMAGE_THUMBNAIL_WIDTHS", "160,320,640").split(",") if width.strip()
+}))
+IMAGE_THUMBNAIL_FORMAT = os.getenv("IMAGE_THUMBNAIL_FORMAT", "webp").lower()
+IMAGE_THUMBNAIL_QUALITY = int(os.getenv("IMAGE_THUMBNAIL_QUALITY", "80"))
+
+# (내용 해시, 원본 바이트)
+Photo = Tuple[str, bytes]
+
+
+class ImageProcessor:
+    """리뷰 작성 후 사진 썸네일 생성 - asyncio 큐 → 프로세스 풀 → S3 → reviews.thumbnail_urls
+
+    요청은 큐에 넣기만 하고 바로 응답한다. 사진마다 IMAGE_THUMBNAIL_WIDTHS의 크기를 모두 만들고,
+    썸네일 키도 원본 내용 해시와 크기로 정하므로 같은 사진의 썸네일은 한 번만 만든다.
+    thumbnail_urls는 photo_urls와 같은 순서로 사진마다 {"가로 크기": URL} 인 JSON 배열 (실패한 사진은 {}).
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.processed = 0
+        self.dropped = 0
+
+    def start(self):
+        if not IMAGE_PROCESSING_ENABLED or self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, review_id: int, photos: List[Photo]):
+        """썸네일 작업 등록 (기다리지 않음)"""
+        if not IMAGE_PROCESSING_ENABLED or not photos:
+            return
+        try:
+            self._queue.put_nowait((review_id, photos))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"이미지 작업 큐가 가득 차 썸네일 생략 (리뷰 ID: {review_id})")
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # 첫 작업 때 생성 - 이벤트 루프/로그 스레드가 있는 프로세스를 fork하지 않도록 spawn
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def _worker(self):
+        while True:
+            review_id, photos = await self._queue.get()
+            try:
+                await self._process(review_id, photos)
+                self.processed += 1
+            except Exception as e:
+                logger.error(f"썸네일 생성 실패 (리뷰 ID: {review_id}): {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _thumbnails(self, digest: str, body: bytes) -> Dict[str, str]:
+        """사진 하나의 크기별 썸네일 URL {"가로 크기": URL} - 이미 올린 크기는 다시 만들지 않는다"""
+        _, extension, content_type = FORMATS[IMAGE_THUMBNAIL_FORMAT]
+        keys = {
+            width: storage.content_key("reviews/thumbnails", f"{digest}_{width}", extension)
+            for width in IMAGE_THUMBNAIL_WIDTHS
+        }
+        found = await asyncio.gather(*(storage.exists(key) for key in keys.values()))
+        missing = [width for width, exists in zip(keys, found) if not exists]
+        if missing:
+            loop = asyncio.get_running_loop()
+            pool = self._executor()
+            try:
+                thumbnails = await loop.run_in_executor(
+                    pool, make_thumbnails, body, missing, IMAGE_THUMBNAIL_FORMAT, IMAGE_THUMBNAIL_QUALITY
+                )
+            except BrokenProcessPool:
+                # 자식 프로세스가 죽으면 (메모리 부족 등) 풀을 버리고 다음 작업 때 새로 만든다
+                if self._pool is pool:
+                    self._pool = None
+                raise
+            await asyncio.gather(*(
+                storage.upload(keys[width], thumbnail, content_type) for width, thumbnail in zip(missing, thumbnails)
+            ))
+        return {str(width): storage.object_url(key) for width, key in keys.items()}
+
+    async def _process(self, review_id: int, photos: List[Photo]):
+        results = await asyncio.gather(
+            *(self._thumbnails(digest, body) for digest, body in photos), return_exceptions=True
+        )
+        # 실패한 사진(디코드 불가, 업로드 실패 등)만 {} - photo_urls와 순서를 맞추고 나머지 사진의 썸네일은 살린다
+        urls: List[Dict[str, str]] = []
+        for (digest, _), result in zip(photos, results):
+            if isinstance(result, Exception):
+                logger.warning(f"사진 썸네일 생성 실패 (리뷰 ID: {review_id}, 사진: {digest}): {str(result)}")
+                result = {}
+            urls.append(result)
+        if not any(urls):
+            raise RuntimeError("모든 사진의 썸네일 생성에 실패했습니다.")
+        async with autocommit_engine.connect() as conn:
+            await repository.set_review_thumbnails(conn, review_id, json.dumps(urls))
+        logger.info(f"썸네일 생성 완료 (리뷰 ID: {review_id}, 사진 {sum(map(bool, urls))}/{len(urls)}개 x 크기 {len(IMAGE_THUMBNAIL_WIDTHS)}개)")
+
+    def metrics(self):
+        """Prometheus 텍스트 형식"""
+        return [
+            "# TYPE weeat_image_queue_depth gauge",
+            f"weeat_image_queue_depth {self._queue.qsize()}",
+            "# TYPE weeat_image_jobs_processed_total counter",
+            f"weeat_image_jobs_processed_total {self.processed}",
+            "# TYPE weeat_image_jobs_dropped_total counter",
+            f"weeat_image_jobs_dropped_total {self.dropped}",
+        ]
+
+
+# 워커 프로세스당 하나
+image_processor = ImageProcessor(IMAGE_WORKERS, IMAGE_QUEUE_SIZE)
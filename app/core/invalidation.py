@@ -0,0 +1,135 @@
+from app.core.config import engine, read_engine, snapshot_engine
+from app.core.catalog import catalog
+from app.core.events import publish_rating
+from app.core.personalization import similarities
+from typing import Dict, Optional, Set
+import asyncio
+import asyncpg
+import logging
+import os
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# sql/001_catalog_notify.sql 트리거가 보내는 채널 ("<테이블>:<place_id>")
+# build_similarities.py도 유사도를 교체한 뒤 "similarities:0"을 보낸다
+CATALOG_CHANNEL = "catalog_changes"
+# 워커 간 캐시 무효화 사용 여부
+CATALOG_LISTENER_ENABLED = os.getenv("CATALOG_LISTENER_ENABLED", "true").lower() == "true"
+# 알림을 모아서 처리하는 간격 (초) - 일괄 수정 시 같은 가게를 여러 번 다시 읽지 않도록
+DEBOUNCE_SECONDS = 0.05
+# 리스너 연결이 끊겼을 때 재연결 간격 (초)
+RECONNECT_INTERVAL = 5
+
+
+class CatalogListener:
+    """워커마다 전용 asyncpg 연결 하나로 LISTEN 하면서 로컬 카탈로그를 무효화
+
+    알림 콜백은 변경된 place_id만 모아 두고, 실제 재조회는 풀 연결에서 한꺼번에 한다.
+    리스너 연결이 끊긴 동안의 알림은 유실되므로 재연결 후에는 카탈로그 전체를 다시 적재한다.
+    전체 적재 중에 받은 알림은 적재가 끝나 교체된 뒤에 반영한다 (기존 카탈로그에 반영하면 교체로 사라지므로).
+    """
+
+    def __init__(self):
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, Set[int]] = {"places": set(), "menus": set(), "reviews": set(), "similarities": set()}
+        self._wakeup = asyncio.Event()
+        self._disconnected = asyncio.Event()
+
+    async def start(self):
+        if not CATALOG_LISTENER_ENABLED or self._task is not None:
+            return
+        await self._connect()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def _connect(self):
+        # SQLAlchemy URL(postgresql+asyncpg://)을 asyncpg DSN으로 변환
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._conn = await asyncpg.connect(dsn)
+        self._disconnected.clear()
+        self._conn.add_termination_listener(lambda conn: self._disconnected.set())
+        await self._conn.add_listener(CATALOG_CHANNEL, self._on_notify)
+        logger.info(f"카탈로그 변경 알림 수신 시작: {CATALOG_CHANNEL}")
+
+    def _on_notify(self, conn, pid, channel, payload: str):
+        table, _, place_id = payload.partition(":")
+        if table in self._pending and place_id.isdigit():
+            self._pending[table].add(int(place_id))
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            wakeup = asyncio.create_task(self._wakeup.wait())
+            disconnected = asyncio.create_task(self._disconnected.wait())
+            await asyncio.wait({wakeup, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            wakeup.cancel()
+            disconnected.cancel()
+
+            if self._disconnected.is_set():
+                await self._reconnect()
+                continue
+
+            await asyncio.sleep(DEBOUNCE_SECONDS)
+            if catalog.loading:
+                # 적재가 끝날 때까지 모아 둔다 (_wakeup이 그대로라 다음 반복에서 다시 확인)
+                continue
+            self._wakeup.clear()
+            try:
+                await self._apply_pending()
+            except Exception as e:
+                logger.error(f"카탈로그 무효화 처리 실패: {str(e)}")
+
+    async def _apply_pending(self):
+        taken = {table: set(pending) for table, pending in self._pending.items()}
+        for pending in self._pending.values():
+            pending.clear()
+        generation = catalog.load_generation
+        try:
+            await self._apply(taken)
+        finally:
+            if catalog.load_generation != generation:
+                # 반영하는 사이 전체 적재/스냅숏으로 교체됨 - 교체된 카탈로그에 다시 반영
+                for table, ids in taken.items():
+                    self._pending[table] |= ids
+                self._wakeup.set()
+
+    async def _apply(self, taken: Dict[str, Set[int]]):
+        places = taken["places"] | taken["menus"]
+        ratings = taken["reviews"]
+        reload_similarities = bool(taken["similarities"])
+
+        async with read_engine.connect() as conn:
+            for place_id in places:
+                await catalog.reload_place(conn, place_id)
+            for place_id in ratings:
+                # 다른 워커에서 들어온 리뷰 변경만 이 워커의 구독자에게 알림
+                if await catalog.refresh_rating(conn, place_id):
+                    publish_rating(place_id)
+            if reload_similarities:
+                await similarities.load(conn)
+        logger.debug("카탈로그 무효화: 가게 %d개, 평점 %d개", len(places), len(ratings))
+
+    async def _reconnect(self):
+        logger.warning("카탈로그 알림 연결이 끊어졌습니다. 재연결 후 전체 재적재합니다.")
+        while True:
+            try:
+                await self._connect()
+                async with snapshot_engine.begin() as conn:
+                    await catalog.load(conn)
+                return
+            except Exception as e:
+                logger.error(f"카탈로그 알림 재연결 실패, {RECONNECT_INTERVAL}초 후 재시도: {str(e)}")
+                await asyncio.sleep(RECONNECT_INTERVAL)
+
+
+# 워커 프로세스당 하나의 리스너
+listener = CatalogListener()
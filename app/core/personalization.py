@@ -0,0 +1,116 @@
+from app.core.catalog import catalog
+from app.crud import repository
+from app.crud.repository import Connection
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import heapq
+import logging
+import os
+import random
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 이 평점을 기준으로 좋아함(+)/싫어함(-)을 나눈다
+NEUTRAL_RATING = 3
+# 카테고리 가중치 폭 - 평균 5점인 카테고리는 1 + 이 값, 1점인 카테고리는 1 - 이 값
+CATEGORY_BOOST = float(os.getenv("PERSONALIZATION_CATEGORY_BOOST", "0.5"))
+# 추천 개수의 몇 배까지 상위 후보로 두고 그 안에서 점수 비례로 뽑을지
+CANDIDATE_POOL_FACTOR = 5
+
+_NO_NEIGHBORS: Tuple[array, array] = (array("q"), array("f"))
+
+
+class SimilarityIndex:
+    """build_similarities.py가 계산한 가게 간 유사도 (가게마다 유사도 내림차순 이웃 배열)"""
+
+    def __init__(self):
+        self.loaded = False
+        self._neighbors: Dict[int, Tuple[array, array]] = {}
+
+    async def load(self, conn: Connection):
+        neighbors: Dict[int, Tuple[array, array]] = {}
+        for row in await repository.load_similarities(conn):
+            entry = neighbors.get(row.place_id)
+            if entry is None:
+                entry = neighbors[row.place_id] = (array("q"), array("f"))
+            entry[0].append(row.similar_place_id)
+            entry[1].append(row.score)
+        self._neighbors = neighbors
+        self.loaded = True
+        logger.info(f"가게 유사도 적재 완료: 가게 {len(neighbors)}개")
+
+    def neighbors(self, place_id: int) -> Tuple[array, array]:
+        return self._neighbors.get(place_id, _NO_NEIGHBORS)
+
+
+def category_weights(history: List[Tuple[int, int]]) -> Dict[str, float]:
+    """리뷰한 카테고리별 평균 평점 -> 가중치 (리뷰가 없는 카테고리는 1.0)"""
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for place_id, rating in history:
+        category = catalog.category_of(place_id)
+        if category is not None:
+            totals[category][0] += rating
+            totals[category][1] += 1
+    return {
+        category: 1 + CATEGORY_BOOST * (rating_sum / count - NEUTRAL_RATING) / (5 - NEUTRAL_RATING)
+        for category, (rating_sum, count) in totals.items()
+    }
+
+
+def personalized_place_ids(history: List[Tuple[int, int]], count: int, budget: Optional[int] = None) -> List[int]:
+    """리뷰 이력 기반 추천 (카테고리 중복 없이, 이미 리뷰한 가게 제외)
+
+    리뷰한 가게의 유사 가게에 (평점 - NEUTRAL_RATING) × 유사도를 더하고 카테고리 가중치를 곱한 점수로
+    상위 후보를 만든 뒤 점수 비례로 뽑는다. 후보가 모자라면 선호 카테고리 순으로 랜덤 가게를 채운다.
+    """
+    reviewed = {place_id for place_id, _ in history}
+    weights = category_weights(history)
+
+    scores: Dict[int, float] = defaultdict(float)
+    for place_id, rating in history:
+        preference = rating - NEUTRAL_RATING
+        if preference == 0:
+            continue
+        similar_ids, similar_scores = similarities.neighbors(place_id)
+        for other, similarity in zip(similar_ids, similar_scores):
+            if other not in reviewed:
+                scores[other] += similarity * preference
+
+    candidates = []
+    for place_id, score in scores.items():
+        category = catalog.category_of(place_id)
+        if score <= 0 or category is None:
+            continue
+        if budget is not None and not catalog.within_budget(place_id, budget):
+            continue
+        candidates.append((score * weights.get(category, 1.0), place_id, category))
+    pool = heapq.nlargest(count * CANDIDATE_POOL_FACTOR, candidates)
+
+    selected: List[int] = []
+    used_categories = set()
+    while pool and len(selected) < count:
+        index = random.choices(range(len(pool)), weights=[score for score, _, _ in pool])[0]
+        _, place_id, category = pool.pop(index)
+        if category not in used_categories:
+            selected.append(place_id)
+            used_categories.add(category)
+
+    if len(selected) < count:
+        # 유사도가 없는 신규 사용자 등 - 카테고리별 랜덤 가게를 선호 카테고리 순으로
+        fallback = catalog.random_place_per_category(len(catalog.categories), budget)
+        fallback.sort(key=lambda place_id: weights.get(catalog.category_of(place_id), 1.0), reverse=True)
+        for place_id in fallback:
+            category = catalog.category_of(place_id)
+            if place_id in reviewed or category in used_categories:
+                continue
+            selected.append(place_id)
+            used_categories.add(category)
+            if len(selected) == count:
+                break
+    return selected
+
+
+# 워커 프로세스당 하나의 유사도 인덱스
+similarities = SimilarityIndex()
@@ -0,0 +1,141 @@
+from app.core.admin import is_admin_token
+from typing import Optional
+from urllib.parse import parse_qsl
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import random
+import time
+import uuid
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 요청 프로파일링 설정 (환경 변수)
+# 프로파일 파일(.prof) 저장 디렉터리 - snakeviz, python -m pstats 등으로 열어본다
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# 헤더 없이도 프로파일링할 요청 비율 (0.0 ~ 1.0, 기본 끔)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+# PROFILE_DIR에 남길 최대 파일 수 - 넘으면 오래된 것부터 지운다
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+PROFILE_HEADER = "x-profile"
+PROFILE_SUMMARY_HEADER = "x-profile-summary"
+
+
+def _requested(scope) -> bool:
+    """X-Profile 헤더 또는 ?profile=1 + 관리자 토큰"""
+    query = scope.get("query_string", b"")
+    flagged = b"profile" in query and ("profile", "1") in parse_qsl(query.decode("latin-1"))
+    token = None
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER.encode():
+            flagged = True
+        elif name == b"x-admin-token":
+            token = value.decode("latin-1")
+    return flagged and is_admin_token(token)
+
+
+def _summary(profiler: cProfile.Profile, elapsed: float) -> str:
+    """응답 헤더용 한 줄 요약 (총 시간, 호출 수, 누적 시간이 가장 긴 앱 함수)"""
+    stats = pstats.Stats(profiler)
+    top = None
+    for (filename, line, name), (_, _, _, cumulative, _) in stats.stats.items():
+        if "/app/" in filename and (top is None or cumulative > top[1]):
+            top = (f"{os.path.basename(filename)}:{line}({name})", cumulative)
+    summary = f"total={elapsed * 1000:.1f}ms calls={stats.total_calls}"
+    if top:
+        summary += f" top={top[0]} {top[1] * 1000:.1f}ms"
+    return summary
+
+
+class ProfilingMiddleware:
+    """요청 단위 cProfile - 관리자 헤더/쿼리로 요청했거나 샘플링된 요청만
+
+    꺼져 있을 때는 헤더 확인만 하고 그대로 통과시킨다.
+    cProfile은 스레드 단위라 프로파일 중에는 같은 워커의 다른 요청 처리도 함께 기록되므로
+    한 번에 한 요청만 프로파일링한다. 프로파일은 응답 시작까지(핸들러 실행)만이고, 그때 다음 요청에 넘긴다
+    (SSE 같은 긴 스트리밍 본문이 다른 프로파일을 막지 않도록). 스트리밍 응답은 요약 헤더만 주고 파일은 저장하지 않는다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        sampled = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+        if not sampled and not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        summary: Optional[str] = None
+        streaming = False
+        finished = False
+
+        def finish():
+            # 한 번만 - 다음 요청이 이미 프로파일을 시작했을 수 있다
+            nonlocal finished
+            if not finished:
+                finished = True
+                profiler.disable()
+                self._active = False
+
+        async def send_with_summary(message):
+            nonlocal summary, streaming
+            if message["type"] == "http.response.start" and summary is None:
+                # 응답 시작까지 (핸들러 실행 시간)만 프로파일
+                finish()
+                summary = _summary(profiler, time.perf_counter() - started)
+                # 본문 길이가 없는 응답 (StreamingResponse, SSE)
+                streaming = not any(name.lower() == b"content-length" for name, _ in message.get("headers", []))
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_SUMMARY_HEADER.encode(), summary.encode("latin-1")),
+                ]
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            finish()
+
+        if streaming:
+            logger.info(f"요청 프로파일 (스트리밍 응답, 저장 생략): {scope['path']}", extra={"profile_summary": summary})
+            return
+        # 파일 이름은 서버에서 만든 값만 - 요청 ID(클라이언트 X-Request-ID 헤더일 수 있음)는 로그로만 연결
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex}.prof")
+        try:
+            await asyncio.to_thread(self._dump, profiler, path)
+            logger.info(f"요청 프로파일 저장: {scope['path']} -> {path}", extra={"profile_summary": summary})
+        except (OSError, ValueError) as e:
+            logger.error(f"요청 프로파일 저장 실패: {str(e)}")
+
+    @staticmethod
+    def _dump(profiler: cProfile.Profile, path: str):
+        directory = os.path.realpath(PROFILE_DIR)
+        if os.path.dirname(os.path.realpath(path)) != directory:
+            raise ValueError(f"프로파일 경로가 PROFILE_DIR 밖입니다: {path}")
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(path)
+        # 오래된 파일부터 정리 (다른 워커가 같은 디렉터리를 동시에 정리할 수 있음)
+        files = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".prof"):
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        files.sort()
+        for _, old_path in files[:max(0, len(files) - PROFILE_MAX_FILES)]:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,321 @@
+from contextvars import ContextVar
+from fastapi import HTTPException, status
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import List, Optional
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 요청 기한 설정 (환경 변수)
+# 기본 요청 기한 (ms, 0이면 기한 없음)
+REQUEST_TIMEOUT_MS = int(os.getenv("REQUEST_TIMEOUT_MS", "10000"))
+# 클라이언트가 X-Request-Timeout-Ms 헤더로 정할 수 있는 최대 기한 (ms)
+REQUEST_TIMEOUT_MAX_MS = int(os.getenv("REQUEST_TIMEOUT_MAX_MS", "30000"))
+REQUEST_TIMEOUT_HEADER = "x-request-timeout-ms"
+
+# DB 문장 타임아웃 (ms) - 연결 기본값 (기한이 없는 작업: 워밍업, 알림 처리, 배치 저장 등), 0이면 없음
+# 요청 기한은 문장마다 전달한다: autocommit 문장은 기한에 asyncio 취소 → asyncpg가 서버에 취소 요청,
+# 트랜잭션은 첫 문장 앞에서 남은 시간을 SET LOCAL (트랜잭션이 끝나면 기본값으로 돌아감)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# 서킷 브레이커 설정
+# 연속 실패가 이만큼 쌓이면 열림 (호출하지 않고 바로 실패)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# 열린 뒤 이 시간(초)이 지나면 반열림 - 시험 호출 하나만 보내고 그 결과로 닫거나 다시 연다
+# (시험 호출이 결과 없이 이 시간을 넘기면 다른 호출이 다시 시험)
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# 연결 오류가 아닌 DB 오류 중 장애로 보는 SQLSTATE (기본 statement_timeout에 의한 취소)
+_QUERY_CANCELED = "57014"
+
+
+class Deadline:
+    """요청 기한 - 응답이 시작되면 (스트리밍 본문은 기한 없이) 해제"""
+
+    def __init__(self, timeout_ms: int):
+        self.expires_at: Optional[float] = time.monotonic() + timeout_ms / 1000
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def clear(self):
+        self.expires_at = None
+
+
+# 현재 요청의 기한 (DeadlineMiddleware가 설정)
+deadline_var: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def remaining_seconds() -> Optional[float]:
+    """현재 요청 기한까지 남은 시간 (기한이 없으면 None)"""
+    deadline = deadline_var.get()
+    return deadline.remaining() if deadline else None
+
+
+def call_timeout(limit: float) -> float:
+    """외부 호출 타임아웃 - 설정값과 요청 기한 중 짧은 쪽"""
+    remaining = remaining_seconds()
+    return limit if remaining is None else max(0.0, min(limit, remaining))
+
+
+def _request_timeout_ms(scope) -> int:
+    for name, value in scope["headers"]:
+        if name == REQUEST_TIMEOUT_HEADER.encode():
+            try:
+                requested = int(value)
+            except ValueError:
+                break
+            if requested > 0:
+                return min(requested, REQUEST_TIMEOUT_MAX_MS)
+            break
+    return REQUEST_TIMEOUT_MS
+
+
+class DeadlineMiddleware:
+    """요청 기한을 정하고 넘기면 504
+
+    기한은 응답 시작 전(핸들러 실행)까지만 적용된다. 내보내기 같은 스트리밍 본문은
+    응답이 시작되면 기한을 풀어 끝까지 보낸다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout_ms = _request_timeout_ms(scope)
+        if timeout_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(timeout_ms)
+        started = False
+        timeout = asyncio.timeout(timeout_ms / 1000)
+
+        async def send_with_deadline(message):
+            nonlocal started
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                deadline.clear()
+                timeout.reschedule(None)
+            await send(message)
+
+        token = deadline_var.set(deadline)
+        try:
+            async with timeout:
+                await self.app(scope, receive, send_with_deadline)
+        except TimeoutError:
+            if started:
+                raise
+            logger.warning(
+                f"요청 기한 초과: {scope['path']} ({timeout_ms}ms)",
+                extra={"timeout_ms": timeout_ms}
+            )
+            body = json.dumps({"detail": "요청 처리 시간이 초과되었습니다."}, ensure_ascii=False).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            deadline_var.reset(token)
+
+
+class CircuitOpenError(HTTPException):
+    """서킷이 열려 있어 호출하지 않고 실패 (503)"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{name} 서비스를 일시적으로 사용할 수 없습니다.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (닫힘 → 열림 → 반열림)
+
+    반열림에서는 시험 호출 하나만 통과시키고 나머지는 결과가 나올 때까지 거절한다
+    (회복 중인 DB/S3에 밀린 요청이 한꺼번에 몰리지 않도록).
+    이벤트 루프 스레드에서만 호출하므로 잠금 없이 상태를 바꾼다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.rejected = 0
+
+    def check(self):
+        """호출 전 확인 - 열려 있거나 반열림 시험 중이면 CircuitOpenError"""
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            elapsed = now - self.opened_at
+            if elapsed >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_started_at = now
+                logger.info(f"서킷 반열림: {self.name}")
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+        # 반열림 - 시험 호출이 결과 없이(취소 등) 끝난 것으로 보일 만큼 지났으면 이 호출이 다시 시험
+        probing = now - self.probe_started_at
+        if probing >= self.reset_timeout:
+            self.probe_started_at = now
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.name, min(1.0, self.reset_timeout - probing))
+
+    def record_success(self):
+        if self.failures or self.state != self.CLOSED:
+            if self.state != self.CLOSED:
+                logger.info(f"서킷 닫힘: {self.name}")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            logger.error(
+                f"서킷 열림: {self.name} (연속 실패 {self.failures}회, 마지막 오류: {str(error)})",
+                extra={"circuit": self.name, "failures": self.failures}
+            )
+
+    def metrics(self) -> dict:
+        return {
+            "weeat_circuit_open": int(self.state == self.OPEN),
+            "weeat_circuit_consecutive_failures": self.failures,
+            "weeat_circuit_rejected_total": self.rejected,
+        }
+
+
+# 워커 프로세스당 의존성별 브레이커
+db_breaker = CircuitBreaker("database", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+storage_breaker = CircuitBreaker("storage", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+
+
+def circuit_metrics() -> List[str]:
+    """Prometheus 텍스트 형식"""
+    breakers = (db_breaker, storage_breaker)
+    samples = [breaker.metrics() for breaker in breakers]
+    lines = []
+    for metric, kind in (
+        ("weeat_circuit_open", "gauge"),
+        ("weeat_circuit_consecutive_failures", "gauge"),
+        ("weeat_circuit_rejected_total", "counter"),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{name="{breaker.name}"}} {values[metric]}' for breaker, values in zip(breakers, samples))
+    return lines
+
+
+class CircuitBreakerPool(AsyncAdaptedQueuePool):
+    """DB 서킷이 열려 있으면 풀에서 연결을 기다리거나 새로 연결하지 않고 바로 실패"""
+
+    def connect(self):
+        db_breaker.check()
+        try:
+            return super().connect()
+        except exc.TimeoutError as e:
+            # 풀이 고갈될 만큼 연결이 오래 잡혀 있음
+            db_breaker.record_failure(e)
+            raise
+
+
+def _statement_timeout_ms() -> Optional[int]:
+    """현재 요청 기한까지 남은 시간 (ms, DB_STATEMENT_TIMEOUT_MS 이하) - 기한이 없으면 None"""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return None
+    timeout_ms = max(1, math.ceil(remaining * 1000))
+    return min(timeout_ms, DB_STATEMENT_TIMEOUT_MS) if DB_STATEMENT_TIMEOUT_MS else timeout_ms
+
+
+# 트랜잭션 안에서만 유효한 statement_timeout (SET LOCAL과 같음) - 값이 파라미터라 준비된 문장 하나를 재사용
+_SET_LOCAL_TIMEOUT = "SELECT set_config('statement_timeout', $1, true)"
+_PENDING_TIMEOUT = "pending_statement_timeout"
+# 이 트랜잭션의 statement_timeout이 요청 기한으로 기본값보다 짧아졌는지 - 그 취소는 요청 하나의 실패
+_REQUEST_TIMEOUT = "request_statement_timeout"
+
+
+def _is_outage(error: BaseException, is_disconnect: bool, request_timeout: bool) -> bool:
+    """DB 서킷 브레이커에 실패로 셀 오류 - 연결 끊김/네트워크 오류, 기본 statement_timeout에 의한 취소
+
+    클라이언트가 X-Request-Timeout-Ms로 짧게 잡은 기한 때문에 취소된 문장은 DB 장애가 아니므로 세지 않는다
+    (짧은 기한 요청 몇 번으로 워커 전체의 DB 서킷이 열리지 않도록).
+    """
+    if is_disconnect or isinstance(error, (OSError, TimeoutError)):
+        return True
+    return getattr(error, "sqlstate", None) == _QUERY_CANCELED and not request_timeout
+
+
+def install_db_guards(engine):
+    """엔진에 요청 기한 → 트랜잭션 statement_timeout 전달과 DB 서킷 브레이커 기록을 연결
+
+    autocommit 문장은 연결을 체크아웃할 때 아무것도 보내지 않는다 (요청 기한이 지나면 asyncio 취소로
+    asyncpg가 서버에 취소 요청을 보낸다). 트랜잭션은 잠금을 잡을 수 있으므로 서버에서도 기한을 지키도록
+    첫 문장과 같은 트랜잭션 안에서 남은 시간을 설정한다.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(conn):
+        if conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+            return
+        timeout_ms = _statement_timeout_ms()
+        if timeout_ms is not None:
+            # BEGIN은 첫 문장과 함께 나가므로 설정도 첫 문장 직전에
+            conn.info[_PENDING_TIMEOUT] = timeout_ms
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _on_before_execute(conn, cursor, statement, parameters, context, executemany):
+        timeout_ms = conn.info.pop(_PENDING_TIMEOUT, None)
+        if timeout_ms is not None:
+            set_cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                set_cursor.execute(_SET_LOCAL_TIMEOUT, (str(timeout_ms),))
+            finally:
+                set_cursor.close()
+            if not DB_STATEMENT_TIMEOUT_MS or timeout_ms < DB_STATEMENT_TIMEOUT_MS:
+                conn.info[_REQUEST_TIMEOUT] = True
+
+    @event.listens_for(sync_engine, "commit")
+    @event.listens_for(sync_engine, "rollback")
+    def _on_end(conn):
+        conn.info.pop(_PENDING_TIMEOUT, None)
+        conn.info.pop(_REQUEST_TIMEOUT, None)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _on_success(conn, cursor, statement, parameters, context, executemany):
+        db_breaker.record_success()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        error = context.original_exception
+        request_timeout = context.connection is not None and context.connection.info.get(_REQUEST_TIMEOUT, False)
+        if _is_outage(error, context.is_disconnect, request_timeout):
+            db_breaker.record_failure(error)
@@ -0,0 +1,84 @@
+from cachetools import LRUCache
+from fastapi import Request, Response
+from app.core.catalog import catalog
+from app.core.compression import COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, compress, negotiate_encoding
+from app.core.shared_cache import shared_cache
+from typing import Callable, Dict, Hashable, Optional
+import hashlib
+import os
+
+# 카탈로그 버전당 보관할 응답 수
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+
+class CachedBody:
+    """직렬화된 JSON 본문, ETag, 인코딩별 압축본"""
+
+    __slots__ = ("body", "etag", "_encoded")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # 인코딩과 관계없이 같은 내용이므로 약한 ETag
+        self.etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = compress(self.body, encoding)
+        return data
+
+
+class ResponseCache:
+    """카탈로그 응답 캐시 - 카탈로그 버전이 바뀌면 전부 버린다
+
+    같은 버전에서 반복 요청은 직렬화도 압축도 다시 하지 않는다.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._version: Optional[int] = None
+
+    async def get(self, key: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        """L1(이 워커) → L2(호스트 공유, L2를 켰을 때) → build() 순서로 현재 카탈로그 버전의 본문을 찾는다"""
+        version = catalog.version
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        shared_version = catalog.shared_version
+        body = await shared_cache.get(key, shared_version) if shared_version else None
+        if catalog.version != version:
+            # L2를 조회하는 동안 카탈로그가 바뀜 - 어느 캐시에도 저장하지 않고 (요청 시점 내용인 L2 본문이 없으면 지금 내용으로) 응답
+            return CachedBody(body if body is not None else build())
+        if body is None:
+            body = build()
+            if shared_version:
+                shared_cache.put(key, shared_version, body)
+        entry = self._entries[key] = CachedBody(body)
+        return entry
+
+    def respond(self, request: Request, entry: CachedBody) -> Response:
+        """If-None-Match가 맞으면 304, 아니면 협상한 인코딩의 캐시된 본문"""
+        headers = {"ETag": entry.etag, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # 약한 비교 - W/ 접두어 유무는 무시
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if entry.etag.removeprefix("W/") in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+
+        encoding = None
+        if COMPRESSION_ENABLED and len(entry.body) >= COMPRESSION_MIN_SIZE:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=entry.encoded(encoding), media_type="application/json", headers=headers)
+
+
+# 워커 프로세스당 하나의 응답 캐시
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
@@ -0,0 +1,316 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Tuple
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 같은 호스트의 워커들이 공유하는 2차 캐시 설정 (환경 변수)
+L2_CACHE_ENABLED = os.getenv("L2_CACHE_ENABLED", "false").lower() == "true"
+# 기본 파일 위치 - 다른 사용자가 스냅숏을 바꿔치지 못하도록 공용 임시 디렉터리 대신 앱 전용 디렉터리 (0700)
+L2_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "weeat"
+)
+# SQLite 파일 경로 - 한 호스트의 워커가 모두 같은 파일을 써야 한다
+# (tmpfs를 쓰려면 /dev/shm 아래 0700 디렉터리처럼 이 사용자만 쓸 수 있는 곳으로)
+L2_CACHE_PATH = os.getenv("L2_CACHE_PATH", os.path.join(L2_CACHE_DIR, "weeat-l2.sqlite3"))
+# 이보다 큰 응답 본문은 L2에 넣지 않음 (bytes)
+L2_MAX_ENTRY_BYTES = int(os.getenv("L2_MAX_ENTRY_BYTES", str(32 * 1024 * 1024)))
+# 다른 카탈로그 버전의 응답은 이 시간(초)이 지나면 정리 - 변경 알림을 늦게 받은 워커도 잠시 공유
+L2_STALE_GRACE = float(os.getenv("L2_STALE_GRACE", "60"))
+# 쓰기 스레드 큐에 쌓아 둘 최대 응답 저장 수 - 넘으면 저장을 건너뛴다 (캐시라서 버려도 됨)
+L2_MAX_PENDING_WRITES = int(os.getenv("L2_MAX_PENDING_WRITES", "64"))
+# 카탈로그 변경 기록을 모아서 쓰는 간격 (초) - 변경마다 파일에 쓰지 않도록
+L2_CHANGE_FLUSH_INTERVAL = float(os.getenv("L2_CHANGE_FLUSH_INTERVAL", "0.5"))
+# 카탈로그 스냅숏을 다시 쓰는 간격 (초) - 변경이 있었을 때만
+L2_SNAPSHOT_INTERVAL = float(os.getenv("L2_SNAPSHOT_INTERVAL", "60"))
+# 이보다 오래된 스냅숏은 쓰지 않음 (초) - 워커가 하나도 없을 때 DB를 직접 바꾼 경우 대비
+L2_SNAPSHOT_MAX_AGE = float(os.getenv("L2_SNAPSHOT_MAX_AGE", "3600"))
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT NOT NULL,
+        version TEXT NOT NULL,
+        body BLOB NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (key, version)
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        name TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        fingerprint TEXT NOT NULL,
+        taken_at REAL NOT NULL,
+        body BLOB NOT NULL
+    );
+"""
+
+
+def _prepare_path():
+    """캐시 디렉터리를 0700으로 만들고 파일을 0600으로 생성 (WAL/SHM 파일은 SQLite가 같은 권한으로 만든다)"""
+    directory = os.path.dirname(os.path.abspath(L2_CACHE_PATH))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory == os.path.abspath(L2_CACHE_DIR):
+        # 이미 있던 기본 디렉터리도 이 사용자 전용으로
+        os.chmod(directory, 0o700)
+    os.close(os.open(L2_CACHE_PATH, os.O_RDWR | os.O_CREAT, 0o600))
+
+
+def _connect() -> sqlite3.Connection:
+    _prepare_path()
+    conn = sqlite3.connect(L2_CACHE_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+    # 캐시라서 내구성보다 속도 - WAL로 읽기와 쓰기가 서로 막지 않게
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+class SharedCache:
+    """호스트 공유 2차 캐시 (SQLite 파일)
+
+    - entries: 직렬화된 응답 본문 (가게 상세, 목록) - (키, 카탈로그 버전)으로 찾는다
+    - snapshots: 카탈로그 전체 스냅숏 - 새로 뜬 워커는 Postgres 대신 여기서 적재
+    - meta: 마지막 카탈로그 변경 시각 - 이보다 오래된 스냅숏은 쓰지 않는다
+
+    카탈로그 버전은 워커마다 따로 세는 카탈로그 version이 아니라 내용으로 만든 지문이라
+    같은 내용을 가진 워커끼리는 같은 키를 본다.
+    SQLite 호출은 잠금을 최대 5초 기다릴 수 있어 이벤트 루프에서 하지 않는다.
+    워커(프로세스)마다 조회 스레드와 쓰기 스레드를 하나씩 두고 각자 자기 연결을 쓴다 (WAL이라 조회는 쓰기를 기다리지 않음).
+    쓰기(응답 저장, 변경 기록)는 쓰기 스레드의 큐에 넣고 기다리지 않는다.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._pid: Optional[int] = None
+        self._reader: Optional[ThreadPoolExecutor] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        # 스레드별 연결 (각 스레드에서만 사용)
+        self._local = threading.local()
+        self._pruned_version: Optional[str] = None
+        # 쓰기 큐에 쌓인 작업 수 - L2_MAX_PENDING_WRITES를 넘으면 응답 저장은 건너뛴다
+        self._pending_writes = 0
+        self._pending_lock = threading.Lock()
+        # 아직 파일에 기록하지 않은 카탈로그 변경이 있는지 - L2_CHANGE_FLUSH_INTERVAL마다 한 번 기록
+        self._change_pending = False
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def _executors(self) -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        # fork된 워커는 부모의 스레드/연결을 쓰지 않고 새로 만든다
+        if self._reader is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._pending_writes = 0
+            self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="l2-read")
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="l2-write")
+        return self._reader, self._writer
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """이 스레드의 연결 (조회/쓰기 스레드에서 호출)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None and self.enabled:
+            try:
+                conn = self._local.conn = _connect()
+                conn.executescript(_SCHEMA)
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"L2 캐시 열기 실패, 비활성화: {str(e)}")
+                self.enabled = False
+                conn = self._local.conn = None
+        return conn
+
+    async def _read(self, function: Callable, *args):
+        reader, _ = self._executors()
+        return await asyncio.get_running_loop().run_in_executor(reader, function, *args)
+
+    def _write(self, function: Callable, *args) -> bool:
+        """쓰기 스레드 큐에 넣고 바로 반환 - 큐가 가득 차면 False"""
+        _, writer = self._executors()
+        with self._pending_lock:
+            if self._pending_writes >= L2_MAX_PENDING_WRITES:
+                self.dropped += 1
+                return False
+            self._pending_writes += 1
+        writer.submit(self._run_write, function, *args)
+        return True
+
+    def _run_write(self, function: Callable, *args):
+        try:
+            function(*args)
+        finally:
+            with self._pending_lock:
+                self._pending_writes -= 1
+
+    # 응답 본문
+
+    async def get(self, key: Hashable, version: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        body = await self._read(self._get, repr(key), version)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def _get(self, key: str, version: str) -> Optional[bytes]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT body FROM entries WHERE key = ? AND version = ?", (key, version)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"L2 캐시 조회 실패: {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def put(self, key: Hashable, version: str, body: bytes):
+        """응답 본문 저장 - 기다리지 않음"""
+        if not self.enabled or len(body) > L2_MAX_ENTRY_BYTES:
+            return
+        # 버전이 바뀐 뒤 첫 쓰기에서 지난 버전 응답 정리
+        prune = version != self._pruned_version
+        if self._write(self._put, repr(key), version, body, prune) and prune:
+            self._pruned_version = version
+
+    def _put(self, key: str, version: str, body: bytes, prune: bool):
+        conn = self._connection()
+        if conn is None:
+            return
+        now = time.time()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, version, body, created_at) VALUES (?, ?, ?, ?)",
+                (key, version, body, now)
+            )
+            if prune:
+                conn.execute(
+                    "DELETE FROM entries WHERE version != ? AND created_at < ?", (version, now - L2_STALE_GRACE)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"L2 캐시 저장 실패: {str(e)}")
+
+    # 카탈로그 스냅숏
+
+    def note_change(self):
+        """카탈로그가 바뀌었음을 표시 - L2_CHANGE_FLUSH_INTERVAL 안의 변경은 모아서 한 번 기록"""
+        if not self.enabled or self._change_pending:
+            return
+        self._change_pending = True
+        try:
+            asyncio.get_running_loop().call_later(L2_CHANGE_FLUSH_INTERVAL, self.flush_changes)
+        except RuntimeError:
+            # 이벤트 루프 밖 (스크립트 등) - 바로 기록
+            self.flush_changes()
+
+    def flush_changes(self):
+        """표시된 변경을 쓰기 스레드로 기록 - 기록 시각보다 먼저 찍은 스냅숏은 무효"""
+        if not self._change_pending:
+            return
+        self._change_pending = False
+        _, writer = self._executors()
+        # 변경 기록은 빠뜨리면 지난 스냅숏이 쓰일 수 있어 큐 한도와 관계없이 넣는다
+        writer.submit(self._write_changed_at)
+
+    def _write_changed_at(self):
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('changed_at', ?)", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning(f"L2 캐시 변경 기록 실패: {str(e)}")
+
+    def load_snapshot(self) -> Optional[Tuple[str, bytes]]:
+        """마지막 변경 이후에 찍은, 너무 오래되지 않은 스냅숏 (fingerprint, body) - 없으면 None (스레드에서 호출)"""
+        if not self.enabled:
+            return None
+        conn = _connect()
+        try:
+            conn.executescript(_SCHEMA)
+            row = conn.execute(
+                """
+                SELECT s.fingerprint, s.body FROM snapshots s
+                LEFT JOIN meta m ON m.name = 'changed_at'
+                WHERE s.taken_at >= COALESCE(m.value, 0) AND s.taken_at >= ?
+                """,
+                (time.time() - L2_SNAPSHOT_MAX_AGE,)
+            ).fetchone()
+            return (row[0], row[1]) if row else None
+        finally:
+            conn.close()
+
+    def save_snapshot(self, fingerprint: str, taken_at: float, body: bytes) -> bool:
+        """스냅숏 교체 - 이미 같은 지문이거나 더 최신 스냅숏이 있으면 쓰지 않음 (스레드에서 호출)"""
+        if not self.enabled:
+            return False
+        conn = _connect()
+        try:
+            conn.executescript(_SCHEMA)
+            # 워커 여러 개가 동시에 쓰지 않도록 쓰기 잠금을 잡고 확인
+            conn.execute("BEGIN IMMEDIATE")
+            current = conn.execute("SELECT fingerprint, taken_at FROM snapshots WHERE id = 1").fetchone()
+            if current and (current[0] == fingerprint or current[1] >= taken_at):
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (id, fingerprint, taken_at, body) VALUES (1, ?, ?, ?)",
+                (fingerprint, taken_at, body)
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    async def snapshot_is_current(self, fingerprint: str) -> bool:
+        """저장된 스냅숏이 이 지문이고 그 뒤로 변경 기록이 없는지"""
+        if not self.enabled:
+            return False
+        return await self._read(self._snapshot_is_current, fingerprint)
+
+    def _snapshot_is_current(self, fingerprint: str) -> bool:
+        conn = self._connection()
+        if conn is None:
+            return False
+        try:
+            row = conn.execute(
+                """
+                SELECT s.fingerprint = ? AND s.taken_at >= COALESCE(m.value, 0) FROM snapshots s
+                LEFT JOIN meta m ON m.name = 'changed_at'
+                """,
+                (fingerprint,)
+            ).fetchone()
+        except sqlite3.Error:
+            return False
+        return bool(row and row[0])
+
+    def close(self):
+        """남은 변경 기록과 쓰기를 마치고 스레드 종료 (종료 시)"""
+        if self._reader is None or self._pid != os.getpid():
+            return
+        self.flush_changes()
+        self._reader.shutdown(wait=False)
+        self._writer.shutdown(wait=True)
+        self._reader = self._writer = None
+
+    def metrics(self):
+        """Prometheus 텍스트 형식"""
+        return [
+            "# TYPE weeat_l2_cache_hits_total counter",
+            f"weeat_l2_cache_hits_total {self.hits}",
+            "# TYPE weeat_l2_cache_misses_total counter",
+            f"weeat_l2_cache_misses_total {self.misses}",
+            "# TYPE weeat_l2_cache_dropped_writes_total counter",
+            f"weeat_l2_cache_dropped_writes_total {self.dropped}",
+        ]
+
+
+# 워커 프로세스당 하나 (같은 파일을 여는 다른 워커와 공유)
+shared_cache = SharedCache(L2_CACHE_ENABLED)
@@ -0,0 +1,149 @@
+from cachetools import LRUCache
+from app.core.resilience import storage_breaker, call_timeout
+from typing import Optional
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# S3 설정 (.env는 app.core.config에서 프로세스 시작 시 한 번 로드)
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
+AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
+# 워밍업 때 boto3 import와 클라이언트 생성을 미리 할지 (끄면 첫 업로드 때)
+STORAGE_PRELOAD = os.getenv("STORAGE_PRELOAD", "true").lower() == "true"
+# S3 호출 타임아웃 (초) - 연결/응답 대기, 그리고 업로드 한 번 전체 (요청 기한이 더 짧으면 기한까지)
+STORAGE_CONNECT_TIMEOUT = float(os.getenv("STORAGE_CONNECT_TIMEOUT", "2"))
+STORAGE_READ_TIMEOUT = float(os.getenv("STORAGE_READ_TIMEOUT", "5"))
+STORAGE_UPLOAD_TIMEOUT = float(os.getenv("STORAGE_UPLOAD_TIMEOUT", "10"))
+# 있는 것으로 확인한 객체 키를 기억할 개수 (워커별) - 같은 사진이 다시 오면 HEAD 요청도 생략
+STORAGE_KNOWN_KEYS_SIZE = int(os.getenv("STORAGE_KNOWN_KEYS_SIZE", "4096"))
+
+# boto3/botocore는 import만 수백 ms 걸리므로 첫 사용 시점까지 미룬다
+_client = None
+_client_lock = threading.Lock()
+_known_keys: LRUCache = LRUCache(maxsize=STORAGE_KNOWN_KEYS_SIZE)
+# HEAD가 403이었으면 True - s3:ListBucket 권한이 없는 것이므로 이후로는 확인 없이 바로 업로드
+_head_forbidden = False
+
+
+def get_s3_client():
+    """프로세스 공용 S3 클라이언트 (boto3 클라이언트는 스레드 간 공유 가능)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+                from botocore.config import Config
+
+                _client = boto3.client(
+                    "s3",
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    region_name=AWS_REGION,
+                    # 스레드가 무한정 붙잡히지 않도록 소켓 타임아웃, 재시도는 서킷 브레이커에 맡기고 한 번만
+                    config=Config(
+                        connect_timeout=STORAGE_CONNECT_TIMEOUT,
+                        read_timeout=STORAGE_READ_TIMEOUT,
+                        retries={"max_attempts": 2, "mode": "standard"}
+                    )
+                )
+    return _client
+
+
+async def preload():
+    """워밍업 - SDK import와 클라이언트 생성을 스레드에서 미리"""
+    if STORAGE_PRELOAD:
+        await asyncio.to_thread(get_s3_client)
+
+
+def object_url(key: str) -> str:
+    return f"https://{AWS_S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{key}"
+
+
+async def _call(method: str, **kwargs):
+    """S3 호출 하나 - 서킷이 열려 있으면 CircuitOpenError로 바로 실패하고, 요청 기한까지만 기다린다
+
+    동기 SDK 호출은 이벤트 루프를 막지 않도록 스레드에서 (첫 호출이라면 SDK import도).
+    """
+    storage_breaker.check()
+    client = _client or await asyncio.to_thread(get_s3_client)
+    try:
+        async with asyncio.timeout(call_timeout(STORAGE_UPLOAD_TIMEOUT)):
+            result = await asyncio.to_thread(getattr(client, method), Bucket=AWS_S3_BUCKET_NAME, **kwargs)
+    except Exception as e:
+        if _is_not_found(e) or (method == "head_object" and _is_forbidden(e)):
+            # S3가 정상 응답한 것 - 반열림 시험 호출이면 이것으로 닫는다
+            storage_breaker.record_success()
+        else:
+            storage_breaker.record_failure(e)
+        raise
+    storage_breaker.record_success()
+    return result
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    response = getattr(error, "response", None)
+    return response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+
+
+def _is_not_found(error: Exception) -> bool:
+    """HEAD 404 - S3는 정상 응답한 것이므로 장애로 세지 않는다"""
+    return _error_code(error) in ("404", "NoSuchKey", "NotFound")
+
+
+def _is_forbidden(error: Exception) -> bool:
+    """HEAD 403 - s3:ListBucket 권한이 없으면 없는 객체에도 404 대신 403"""
+    return _error_code(error) in ("403", "Forbidden", "AccessDenied")
+
+
+async def upload(key: str, body: bytes, content_type: Optional[str] = None) -> str:
+    """S3 업로드 후 URL 반환"""
+    logger.debug("S3 업로드 시작 - 버킷: %s, 키: %s, 크기: %d bytes", AWS_S3_BUCKET_NAME, key, len(body))
+    await _call("put_object", Key=key, Body=body, ContentType=content_type or "image/jpeg")
+    _known_keys[key] = True
+    url = object_url(key)
+    logger.debug("S3 업로드 완료: %s", url)
+    return url
+
+
+async def exists(key: str) -> bool:
+    """객체가 있는지 (HEAD) - 권한 때문에 확인할 수 없으면 없는 것으로 (키가 내용 주소라 다시 올려도 같은 객체)"""
+    global _head_forbidden
+    if key in _known_keys:
+        return True
+    if _head_forbidden:
+        return False
+    try:
+        await _call("head_object", Key=key)
+    except Exception as e:
+        if _is_not_found(e):
+            return False
+        if _is_forbidden(e):
+            _head_forbidden = True
+            logger.warning("S3 HEAD 403 - s3:ListBucket 권한이 없어 이후 존재 확인 없이 업로드합니다.")
+            return False
+        raise
+    _known_keys[key] = True
+    return True
+
+
+async def content_hash(body: bytes) -> str:
+    """SHA-256 (hex) - 스레드에서 계산 (hashlib은 GIL을 풀어서 여러 파일을 동시에 해시할 수 있음)"""
+    return await asyncio.to_thread(lambda: hashlib.sha256(body).hexdigest())
+
+
+def content_key(prefix: str, digest: str, extension: str) -> str:
+    """내용 주소 키 - 같은 바이트는 같은 키"""
+    return f"{prefix}/{digest}.{extension.lower()}"
+
+
+async def upload_if_absent(key: str, body: bytes, content_type: Optional[str] = None) -> str:
+    """내용 주소 키로 업로드 - 이미 있으면 업로드하지 않고 URL만 반환"""
+    if await exists(key):
+        logger.debug("S3 업로드 생략 (이미 있음): %s", key)
+        return object_url(key)
+    return await upload(key, body, content_type)
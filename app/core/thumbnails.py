@@ -0,0 +1,33 @@
+from io import BytesIO
+from typing import List, Sequence
+
+# 프로세스 풀 자식 프로세스에서 실행되는 순수 함수 - 가벼운 import만 (Pillow는 함수 안에서)
+
+# 출력 형식별 (Pillow 형식 이름, 확장자, Content-Type)
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+
+
+def make_thumbnails(body: bytes, widths: Sequence[int], fmt: str, quality: int) -> List[bytes]:
+    """가로 width 이하로 축소해 다시 인코딩 (widths와 같은 순서) - 원본은 한 번만 디코드
+
+    EXIF 회전은 픽셀에 반영하고 메타데이터(EXIF, GPS 등)는 버린다.
+    """
+    from PIL import Image, ImageOps
+
+    thumbnails = []
+    with Image.open(BytesIO(body)) as image:
+        image = ImageOps.exif_transpose(image)
+        if fmt == "jpeg" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB" if fmt == "jpeg" or "A" not in image.getbands() else "RGBA")
+        for width in widths:
+            resized = image.copy()
+            # 세로로 긴 사진도 가로 기준으로 맞춤 (세로는 충분히 크게)
+            resized.thumbnail((width, width * 4))
+            out = BytesIO()
+            # exif를 넘기지 않으면 메타데이터 없이 저장된다
+            resized.save(out, format=FORMATS[fmt][0], quality=quality, optimize=fmt == "jpeg")
+            thumbnails.append(out.getvalue())
+    return thumbnails
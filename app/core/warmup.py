@@ -0,0 +1,127 @@
+from app.core.config import read_engine, snapshot_engine, DB_POOL_SIZE, DB_POOL_MIN_CONNECTIONS
+from app.core.catalog import catalog, encode_snapshot, decode_snapshot
+from app.core.invalidation import listener
+from app.core.personalization import similarities
+from app.core import storage
+from app.core.shared_cache import shared_cache, L2_CACHE_ENABLED, L2_SNAPSHOT_INTERVAL
+from app.crud.repository import QUERIES, HOT_QUERIES
+from typing import Optional
+import asyncio
+import logging
+import time
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 워밍업 실패 시 재시도 간격 (초)
+RETRY_INTERVAL = 5
+
+
+class WarmupState:
+    """워밍업 진행 상태 - /ready 응답에 사용"""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self.snapshot_task: Optional[asyncio.Task] = None
+
+
+state = WarmupState()
+
+
+async def _prepare_connection():
+    """연결 하나를 열고 주요 SQL을 미리 준비"""
+    async with read_engine.connect() as conn:
+        for name, params in HOT_QUERIES:
+            await conn.execute(QUERIES[name], params)
+
+
+async def warm_up():
+    """연결 풀 사전 연결(+ S3 클라이언트) → 주요 SQL 준비 → 변경 알림 구독 → 카탈로그 적재"""
+    started = time.perf_counter()
+
+    # 동시에 체크아웃해야 서로 다른 연결이 열린다
+    connections = max(1, min(DB_POOL_MIN_CONNECTIONS, DB_POOL_SIZE))
+    # S3 SDK import/클라이언트 생성도 스레드에서 함께 (첫 업로드 요청이 기다리지 않도록)
+    await asyncio.gather(storage.preload(), *(_prepare_connection() for _ in range(connections)))
+
+    # 적재 도중의 변경도 놓치지 않도록 LISTEN을 먼저 시작
+    await listener.start()
+    if not await restore_catalog_snapshot():
+        async with snapshot_engine.begin() as conn:
+            await catalog.load(conn)
+        await save_catalog_snapshot()
+    await load_similarities()
+    if L2_CACHE_ENABLED and state.snapshot_task is None:
+        state.snapshot_task = asyncio.create_task(_snapshot_loop())
+
+    state.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    state.error = None
+    state.ready = True
+    logger.info(f"워밍업 완료: 연결 {connections}개, {state.duration_ms}ms")
+
+
+async def restore_catalog_snapshot() -> bool:
+    """L2에 최신 카탈로그 스냅숏이 있으면 Postgres 대신 그것으로 적재"""
+    if not L2_CACHE_ENABLED:
+        return False
+    try:
+        snapshot = await asyncio.to_thread(_read_snapshot)
+        if snapshot is None:
+            return False
+        catalog.restore(snapshot)
+        return True
+    except Exception as e:
+        logger.warning(f"카탈로그 스냅숏 적재 실패, DB에서 적재: {str(e)}")
+        return False
+
+
+def _read_snapshot() -> Optional[dict]:
+    stored = shared_cache.load_snapshot()
+    return decode_snapshot(stored[1]) if stored else None
+
+
+async def save_catalog_snapshot():
+    """카탈로그 스냅숏을 L2에 저장 (이미 같은 내용이 있으면 생략) - 직렬화는 스레드에서"""
+    if not L2_CACHE_ENABLED or not catalog.loaded:
+        return
+    snapshot = catalog.snapshot_state()
+    fingerprint = catalog.shared_version
+    taken_at = time.time()
+    try:
+        saved = await asyncio.to_thread(
+            lambda: shared_cache.save_snapshot(fingerprint, taken_at, encode_snapshot(snapshot))
+        )
+        if saved:
+            logger.info(f"카탈로그 스냅숏 저장: {fingerprint}")
+    except Exception as e:
+        logger.warning(f"카탈로그 스냅숏 저장 실패: {str(e)}")
+
+
+async def _snapshot_loop():
+    """변경이 있었으면 주기적으로 스냅숏 갱신 - 새로 뜨는 워커가 DB 대신 쓸 수 있도록"""
+    while True:
+        await asyncio.sleep(L2_SNAPSHOT_INTERVAL)
+        if catalog.loaded and not await shared_cache.snapshot_is_current(catalog.shared_version):
+            await save_catalog_snapshot()
+
+
+async def load_similarities():
+    """개인화 추천용 유사도 적재 - 실패해도(sql/002 미적용 등) 워밍업은 계속, 개인화는 대체 추천으로 동작"""
+    try:
+        async with read_engine.connect() as conn:
+            await similarities.load(conn)
+    except Exception as e:
+        logger.warning(f"가게 유사도 적재 실패: {str(e)}")
+
+
+async def warm_up_until_ready():
+    """워밍업이 성공할 때까지 재시도 (시작 시 실패한 경우 백그라운드로 실행)"""
+    while not state.ready:
+        try:
+            await warm_up()
+        except Exception as e:
+            state.error = str(e)
+            logger.error(f"워밍업 실패, {RETRY_INTERVAL}초 후 재시도: {str(e)}")
+            await asyncio.sleep(RETRY_INTERVAL)
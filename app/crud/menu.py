@@ -1,15 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from app.crud import repository
 from app.models.menu import Menu
 from app.schemas.menu import MenuCreate
 
 async def get_menus_by_place(db: AsyncSession, place_id: int):
-    result = await db.execute(select(Menu).where(Menu.place_id == place_id))
-    return result.scalars().all()
+    return await repository.list_menus(db, place_id)
 
 async def get_menu(db: AsyncSession, menu_id: int):
-    result = await db.execute(select(Menu).where(Menu.id == menu_id))
-    return result.scalar_one_or_none()
+    return await repository.get_menu(db, menu_id)
 
 async def create_menu(db: AsyncSession, menu: Menu):
     db.add(menu)
@@ -18,23 +16,22 @@ async def create_menu(db: AsyncSession, menu: Menu):
     return menu
 
 async def update_menu(db: AsyncSession, menu_id: int, menu_data: dict):
-    result = await db.execute(select(Menu).where(Menu.id == menu_id))
-    menu = result.scalar_one_or_none()
-    if menu:
-        for key, value in menu_data.items():
-            setattr(menu, key, value)
-        await db.commit()
-        await db.refresh(menu)
+    # UPDATE ... RETURNING 한 번으로 수정 (없으면 None)
+    menu = await repository.update_row(db, "menus", menu_id, menu_data)
+    await db.commit()
     return menu
 
 async def delete_menu(db: AsyncSession, menu_id: int):
-    result = await db.execute(select(Menu).where(Menu.id == menu_id))
-    menu = result.scalar_one_or_none()
-    if menu:
-        await db.delete(menu)
-        await db.commit()
+    # DELETE ... RETURNING 한 번으로 삭제 (없으면 None)
+    menu = await repository.delete_row(db, "menus", menu_id)
+    await db.commit()
     return menu
 
+async def bulk_update_menus(db: AsyncSession, updates: list):
+    # [{"id": ..., 수정할 컬럼...}, ...]를 한 문장으로 일괄 수정
+    menus = await repository.bulk_update(db, "menus", updates)
+    await db.commit()
+    return menus
+
 async def get_all_menus(db: AsyncSession):
-    result = await db.execute(select(Menu))
-    return result.scalars().all()
+    return await repository.list_all_menus(db)
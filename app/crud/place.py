@@ -1,18 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from app.crud import repository
 from app.models.place import Place
 from app.schemas.place import PlaceCreate
 
 async def get_places(db: AsyncSession, category: str = None):
-    stmt = select(Place)
-    if category:
-        stmt = stmt.where(Place.category == category)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return await repository.list_places(db, category)
 
 async def get_place(db: AsyncSession, place_id: int):
-    result = await db.execute(select(Place).where(Place.id == place_id))
-    return result.scalar_one_or_none()
+    return await repository.get_place(db, place_id)
 
 async def create_place(db: AsyncSession, place: Place):
     db.add(place)
@@ -21,23 +16,22 @@ async def create_place(db: AsyncSession, place: Place):
     return place
 
 async def update_place(db: AsyncSession, place_id: int, place_data: dict):
-    result = await db.execute(select(Place).where(Place.id == place_id))
-    place = result.scalar_one_or_none()
-    if place:
-        for key, value in place_data.items():
-            setattr(place, key, value)
-        await db.commit()
-        await db.refresh(place)
+    # UPDATE ... RETURNING 한 번으로 수정 (없으면 None)
+    place = await repository.update_row(db, "places", place_id, place_data)
+    await db.commit()
     return place
 
 async def delete_place(db: AsyncSession, place_id: int):
-    result = await db.execute(select(Place).where(Place.id == place_id))
-    place = result.scalar_one_or_none()
-    if place:
-        await db.delete(place)
-        await db.commit()
+    # DELETE ... RETURNING 한 번으로 삭제 (없으면 None)
+    place = await repository.delete_row(db, "places", place_id)
+    await db.commit()
     return place
 
+async def bulk_update_places(db: AsyncSession, updates: list):
+    # [{"id": ..., 수정할 컬럼...}, ...]를 한 문장으로 일괄 수정
+    places = await repository.bulk_update(db, "places", updates)
+    await db.commit()
+    return places
+
 async def get_places_by_category(db: AsyncSession, category: str):
-    result = await db.execute(select(Place).where(Place.category == category))
-    return result.scalars().all()
+    return await repository.list_places(db, category)
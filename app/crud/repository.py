@@ -0,0 +1,688 @@
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.schemas.place import PlaceOut, PlaceDetailOut, RankedPlaceOut
+from app.schemas.menu import MenuOut
+from app.schemas.review import ReviewOut
+from app.schemas.changes import CatalogChangesOut, PlaceChangeOut, MenuChangeOut, RatingChangeOut, DeletedOut
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from datetime import datetime
+
+# 엔드포인트, crud, 카탈로그가 공유하는 명명된 쿼리 모음
+# 같은 SQL 문자열은 연결별 prepared statement 캐시(DB_STATEMENT_CACHE_SIZE)에서 재사용된다
+
+Connection = Union[AsyncConnection, AsyncSession]
+
+PLACE_COLUMNS = "id, name, category, distance_note, address, hero_image_url, budget_range"
+MENU_COLUMNS = "id, place_id, name, price"
+REVIEW_COLUMNS = "id, place_id, phone_number, rating, content, photo_urls, thumbnail_urls, created_at"
+
+# 가게 + 평점 집계 (N+1 조회 없이 한 번에)
+_PLACES_WITH_RATING = f"""
+    SELECT p.id, p.name, p.category, p.distance_note, p.address, p.hero_image_url, p.budget_range,
+           COALESCE(r.rating_sum, 0) AS rating_sum, COALESCE(r.review_count, 0) AS review_count
+    FROM places p
+    LEFT JOIN (
+        SELECT place_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+        FROM reviews GROUP BY place_id
+    ) r ON r.place_id = p.id
+"""
+
+# 베이지안 평균 상위 가게 - 카테고리 평균을 사전 평균으로 사용 (카탈로그가 없을 때만 사용)
+_TOP_PLACES = f"""
+    WITH p AS ({_PLACES_WITH_RATING}),
+    prior AS (
+        SELECT category, SUM(rating_sum)::float8 / NULLIF(SUM(review_count), 0) AS mean
+        FROM p GROUP BY category
+    )
+    SELECT p.*,
+           (CAST(:prior_weight AS float8) * COALESCE(prior.mean, 0) + p.rating_sum)
+               / (CAST(:prior_weight AS float8) + p.review_count) AS score
+    FROM p JOIN prior USING (category)
+    {{where}}
+    ORDER BY score DESC, p.id
+    LIMIT :n
+"""
+
+QUERIES = {
+    "place_exists": text("SELECT id FROM places WHERE id = :place_id"),
+    "all_places": text(f"SELECT {PLACE_COLUMNS} FROM places ORDER BY id"),
+    "place": text(f"SELECT {PLACE_COLUMNS} FROM places WHERE id = :place_id"),
+    "places_with_rating": text(_PLACES_WITH_RATING),
+    "places_with_rating_by_category": text(_PLACES_WITH_RATING + " WHERE p.category = :category"),
+    # 가게 가격 = 가장 싼 메뉴 가격 (가격 있는 메뉴가 없으면 budget_range)
+    "places_within_budget": text(_PLACES_WITH_RATING + """
+        WHERE COALESCE((SELECT MIN(m.price) FROM menus m WHERE m.place_id = p.id), p.budget_range) <= :budget
+    """),
+    "top_places": text(_TOP_PLACES.format(where="")),
+    "top_places_by_category": text(_TOP_PLACES.format(where="WHERE p.category = :category")),
+    "place_with_rating": text(f"""
+        SELECT {PLACE_COLUMNS},
+               (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE place_id = :place_id) AS rating_sum,
+               (SELECT COUNT(*) FROM reviews WHERE place_id = :place_id) AS review_count
+        FROM places WHERE id = :place_id
+    """),
+    "place_rating": text(
+        "SELECT COALESCE(SUM(rating), 0) AS rating_sum, COUNT(*) AS review_count "
+        "FROM reviews WHERE place_id = :place_id"
+    ),
+    "all_ratings": text(
+        "SELECT place_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count FROM reviews GROUP BY place_id"
+    ),
+    "all_menus": text(f"SELECT {MENU_COLUMNS} FROM menus ORDER BY id"),
+    # 카탈로그용 - 가게별로 연속된 구간이 되도록 정렬
+    "catalog_menus": text(f"SELECT {MENU_COLUMNS} FROM menus ORDER BY place_id, id"),
+    "menus_by_place": text(f"SELECT {MENU_COLUMNS} FROM menus WHERE place_id = :place_id ORDER BY id"),
+    "menu": text(f"SELECT {MENU_COLUMNS} FROM menus WHERE id = :menu_id"),
+    "review": text(f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE id = :review_id"),
+    "reviews_by_place": text(f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE place_id = :place_id ORDER BY id"),
+    "all_reviews": text(f"SELECT {REVIEW_COLUMNS} FROM reviews ORDER BY id"),
+    "reviews_by_phone": text(f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE phone_number = :phone_number ORDER BY id"),
+    "ratings_by_phone": text("SELECT place_id, rating FROM reviews WHERE phone_number = :phone_number"),
+    # 개인화 추천 (sql/002_place_similarities.sql)
+    "rating_matrix": text("SELECT place_id, phone_number, rating FROM reviews"),
+    "all_similarities": text(
+        "SELECT place_id, similar_place_id, score FROM place_similarities ORDER BY place_id, score DESC"
+    ),
+    "clear_similarities": text("DELETE FROM place_similarities"),
+    "notify": text("SELECT pg_notify(:channel, :payload)"),
+    "insert_similarities": text("""
+        INSERT INTO place_similarities (place_id, similar_place_id, score)
+        SELECT * FROM unnest(CAST(:place_ids AS bigint[]), CAST(:similar_place_ids AS bigint[]), CAST(:scores AS real[]))
+    """),
+    # 증분 동기화 (sql/004_catalog_change_log.sql)
+    # 토큰 = 지금 진행 중인 가장 오래된 트랜잭션 ID - 이보다 작은 트랜잭션은 모두 끝났으므로 다음에는 이 이상만 읽는다
+    "change_token": text("""
+        SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS token,
+               (SELECT tx FROM catalog_change_log_horizon WHERE id = 1) AS horizon
+    """),
+    "changes_since": text("""
+        SELECT entity, entity_id, MAX(changed_at) AS changed_at
+        FROM catalog_change_log WHERE tx >= :since
+        GROUP BY entity, entity_id
+    """),
+    "changed_places": text(f"""
+        SELECT {", ".join(f"p.{column}" for column in PLACE_COLUMNS.split(", "))}, p.updated_at,
+               (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE place_id = p.id) AS rating_sum,
+               (SELECT COUNT(*) FROM reviews WHERE place_id = p.id) AS review_count
+        FROM places p WHERE p.id = ANY(CAST(:ids AS BIGINT[]))
+    """),
+    "changed_menus": text(f"SELECT {MENU_COLUMNS}, updated_at FROM menus WHERE id = ANY(CAST(:ids AS BIGINT[]))"),
+    "changed_ratings": text("""
+        SELECT p.id AS place_id, COALESCE(SUM(r.rating), 0) AS rating_sum, COUNT(r.id) AS review_count
+        FROM places p LEFT JOIN reviews r ON r.place_id = p.id
+        WHERE p.id = ANY(CAST(:ids AS BIGINT[]))
+        GROUP BY p.id
+    """),
+    # 멱등성 키 선점 - 새 키이거나, 만료된 키 / 같은 요청의 처리가 멈춘 키(locked_until 경과)면 선점
+    "claim_idempotency_key": text("""
+        INSERT INTO idempotency_keys (key, request_hash, locked_until, expires_at)
+        VALUES (
+            :key, :request_hash,
+            NOW() + CAST(:lock_seconds AS INTEGER) * INTERVAL '1 second',
+            NOW() + CAST(:ttl_seconds AS INTEGER) * INTERVAL '1 second'
+        )
+        ON CONFLICT (key) DO UPDATE SET
+            request_hash = EXCLUDED.request_hash, response_status = NULL, response_body = NULL,
+            created_at = NOW(), locked_until = EXCLUDED.locked_until, expires_at = EXCLUDED.expires_at
+        WHERE idempotency_keys.expires_at < NOW()
+           OR (idempotency_keys.response_status IS NULL
+               AND idempotency_keys.locked_until < NOW()
+               AND idempotency_keys.request_hash = EXCLUDED.request_hash)
+        RETURNING key
+    """),
+    "get_idempotency_key": text("""
+        SELECT request_hash, response_status, response_body FROM idempotency_keys
+        WHERE key = :key AND expires_at >= NOW()
+    """),
+    "complete_idempotency_key": text("""
+        UPDATE idempotency_keys SET response_status = :response_status, response_body = :response_body
+        WHERE key = :key AND response_status IS NULL
+    """),
+    "release_idempotency_key": text("DELETE FROM idempotency_keys WHERE key = :key AND response_status IS NULL"),
+    "set_review_thumbnails": text("UPDATE reviews SET thumbnail_urls = :thumbnail_urls WHERE id = :review_id"),
+    "insert_review": text(f"""
+        INSERT INTO reviews (place_id, phone_number, rating, content, photo_urls, created_at)
+        VALUES (:place_id, :phone_number, :rating, :content, :photo_urls, NOW())
+        RETURNING {REVIEW_COLUMNS}
+    """),
+    # 여러 리뷰를 한 문장으로 - id는 ord 순서대로 발급되므로 id 순 정렬이 입력 순서와 같다
+    "insert_reviews": text(f"""
+        INSERT INTO reviews (place_id, phone_number, rating, content, photo_urls, created_at)
+        SELECT u.place_id, u.phone_number, u.rating, u.content, u.photo_urls, NOW()
+        FROM unnest(
+            CAST(:place_id AS BIGINT[]), CAST(:phone_number AS VARCHAR(20)[]), CAST(:rating AS INTEGER[]),
+            CAST(:content AS TEXT[]), CAST(:photo_urls AS TEXT[])
+        ) WITH ORDINALITY AS u(place_id, phone_number, rating, content, photo_urls, ord)
+        ORDER BY u.ord
+        RETURNING {REVIEW_COLUMNS}
+    """),
+}
+
+# 부분 수정이 허용되는 컬럼과 PostgreSQL 타입 (일괄 수정 시 배열 캐스팅에 사용)
+UPDATABLE_COLUMNS = {
+    "places": {
+        "name": "TEXT", "category": "TEXT", "distance_note": "TEXT",
+        "address": "TEXT", "hero_image_url": "TEXT", "budget_range": "INTEGER",
+    },
+    "menus": {"name": "TEXT", "price": "INTEGER"},
+    "reviews": {"phone_number": "VARCHAR(20)", "rating": "INTEGER", "content": "TEXT", "photo_urls": "TEXT"},
+}
+
+# UPDATE/DELETE ... RETURNING 결과 컬럼 (t = 수정 대상 테이블)
+_RETURNING = {
+    "places": ", ".join(f"t.{column}" for column in PLACE_COLUMNS.split(", ")) + """,
+        (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE place_id = t.id) AS rating_sum,
+        (SELECT COUNT(*) FROM reviews WHERE place_id = t.id) AS review_count""",
+    "menus": ", ".join(f"t.{column}" for column in MENU_COLUMNS.split(", ")),
+    "reviews": ", ".join(f"t.{column}" for column in REVIEW_COLUMNS.split(", ")),
+}
+
+_DELETE_QUERIES = {
+    table: text(f"DELETE FROM {table} AS t WHERE t.id = :id RETURNING {returning}")
+    for table, returning in _RETURNING.items()
+}
+
+# 컬럼 조합별 UPDATE 문 - 조합마다 한 번만 만들어 같은 SQL 문자열(= 같은 prepared statement)을 재사용
+_update_statements: Dict[Tuple[str, Tuple[str, ...]], TextClause] = {}
+_bulk_update_statements: Dict[str, TextClause] = {}
+
+# 필드 선택(fields=) 조회 - {columns}에 요청한 컬럼만 넣는다 (컬럼 조합별로 한 번만 만들어 재사용)
+_RATING_JOIN = """
+    LEFT JOIN (
+        SELECT place_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+        FROM reviews GROUP BY place_id
+    ) r ON r.place_id = p.id
+"""
+SPARSE_QUERIES = {
+    "places": "SELECT {columns} FROM places p {join}",
+    "places_by_category": "SELECT {columns} FROM places p {join} WHERE p.category = :category",
+    "place": "SELECT {columns} FROM places p {join} WHERE p.id = :place_id",
+    "menus_by_place": "SELECT {columns} FROM menus WHERE place_id = :place_id ORDER BY id",
+    "menus_by_places": "SELECT {columns} FROM menus WHERE place_id = ANY(CAST(:place_ids AS BIGINT[])) ORDER BY place_id, id",
+    "reviews_by_place": "SELECT {columns} FROM reviews WHERE place_id = :place_id ORDER BY id",
+    "reviews_by_phone": "SELECT {columns} FROM reviews WHERE phone_number = :phone_number ORDER BY id",
+    # 가게별 상위 리뷰 (평점 높은 순, 같으면 최신순)
+    "top_reviews": """
+        SELECT {columns} FROM (
+            SELECT {columns}, ROW_NUMBER() OVER (PARTITION BY place_id ORDER BY rating DESC, id DESC) AS rank
+            FROM reviews WHERE place_id = ANY(CAST(:place_ids AS BIGINT[]))
+        ) t WHERE rank <= :n ORDER BY place_id, rank
+    """,
+}
+_sparse_statements: Dict[Tuple[str, Tuple[str, ...]], TextClause] = {}
+
+# 전체 내보내기 쿼리 (테이블 -> 컬럼 목록, 쿼리 이름)
+EXPORT_TABLES = {
+    "places": (PLACE_COLUMNS, "all_places"),
+    "menus": (MENU_COLUMNS, "all_menus"),
+    "reviews": (REVIEW_COLUMNS, "all_reviews"),
+}
+
+# 워밍업 시 연결마다 미리 준비할 쿼리와 더미 파라미터
+HOT_QUERIES = [
+    ("place_exists", {"place_id": 0}),
+    ("place_with_rating", {"place_id": 0}),
+    ("place_rating", {"place_id": 0}),
+    ("menus_by_place", {"place_id": 0}),
+    ("reviews_by_place", {"place_id": 0}),
+]
+
+
+def average_rating(rating_sum: int, review_count: int) -> float:
+    """평점이 없으면 0.0, 있으면 소수점 1자리로 반올림"""
+    return round(rating_sum / review_count, 1) if review_count else 0.0
+
+
+def _update_statement(table: str, columns: Tuple[str, ...]) -> TextClause:
+    key = (table, columns)
+    if key not in _update_statements:
+        assignments = ", ".join(f"{column} = :{column}" for column in columns)
+        if table == "reviews":
+            # 평점 변경분을 카탈로그에 반영할 수 있도록 수정 전 평점을 같은 문장에서 반환
+            sql = f"""
+                UPDATE reviews AS t SET {assignments}
+                FROM (SELECT id, rating FROM reviews WHERE id = :id FOR UPDATE) AS old
+                WHERE t.id = old.id
+                RETURNING {_RETURNING[table]}, old.rating AS old_rating
+            """
+        else:
+            sql = f"UPDATE {table} AS t SET {assignments} WHERE t.id = :id RETURNING {_RETURNING[table]}"
+        _update_statements[key] = text(sql)
+    return _update_statements[key]
+
+
+def _bulk_update_statement(table: str) -> TextClause:
+    """행마다 다른 컬럼을 수정할 수 있는 일괄 UPDATE (컬럼별 set_ 플래그가 참인 값만 반영)"""
+    if table not in _bulk_update_statements:
+        columns = UPDATABLE_COLUMNS[table]
+        assignments = ", ".join(
+            f"{column} = CASE WHEN u.set_{column} THEN u.{column} ELSE t.{column} END"
+            for column in columns
+        )
+        arrays = ", ".join(
+            ["CAST(:id AS BIGINT[])"]
+            + [f"CAST(:{column} AS {column_type}[])" for column, column_type in columns.items()]
+            + [f"CAST(:set_{column} AS BOOLEAN[])" for column in columns]
+        )
+        names = ", ".join(["id", *columns, *(f"set_{column}" for column in columns)])
+        _bulk_update_statements[table] = text(f"""
+            UPDATE {table} AS t SET {assignments}
+            FROM unnest({arrays}) AS u({names})
+            WHERE t.id = u.id
+            RETURNING {_RETURNING[table]}
+        """)
+    return _bulk_update_statements[table]
+
+
+def _checked_columns(table: str, data: dict) -> Tuple[str, ...]:
+    unknown = set(data) - set(UPDATABLE_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"수정할 수 없는 컬럼입니다: {', '.join(sorted(unknown))}")
+    return tuple(sorted(data))
+
+
+def _output(table: str, row):
+    if table == "places":
+        return _place_out(row)
+    if table == "menus":
+        return MenuOut(**row._mapping)
+    return ReviewOut(**{key: value for key, value in row._mapping.items() if key != "old_rating"})
+
+
+def _place_out_fields(data: dict) -> dict:
+    rating_sum = data.pop("rating_sum")
+    return {**data, "rating": average_rating(rating_sum, data["review_count"])}
+
+
+def _place_out(row) -> PlaceOut:
+    return PlaceOut(**_place_out_fields(dict(row._mapping)))
+
+
+async def place_exists(conn: Connection, place_id: int) -> bool:
+    result = await conn.execute(QUERIES["place_exists"], {"place_id": place_id})
+    return result.first() is not None
+
+
+async def list_places(conn: Connection, category: Optional[str] = None, budget: Optional[int] = None) -> List[PlaceOut]:
+    if budget is not None:
+        result = await conn.execute(QUERIES["places_within_budget"], {"budget": budget})
+        places = [_place_out(row) for row in result]
+        return [place for place in places if place.category == category] if category else places
+    if category:
+        result = await conn.execute(QUERIES["places_with_rating_by_category"], {"category": category})
+    else:
+        result = await conn.execute(QUERIES["places_with_rating"])
+    return [_place_out(row) for row in result]
+
+
+async def list_top_places(conn: Connection, category: Optional[str], n: int, prior_weight: float) -> List[RankedPlaceOut]:
+    params = {"n": n, "prior_weight": prior_weight}
+    if category:
+        result = await conn.execute(QUERIES["top_places_by_category"], {**params, "category": category})
+    else:
+        result = await conn.execute(QUERIES["top_places"], params)
+    ranked = []
+    for row in result:
+        data = dict(row._mapping)
+        score = data.pop("score")
+        ranked.append(RankedPlaceOut(**_place_out_fields(data), score=round(score, 2)))
+    return ranked
+
+
+async def get_place(conn: Connection, place_id: int) -> Optional[PlaceOut]:
+    result = await conn.execute(QUERIES["place_with_rating"], {"place_id": place_id})
+    row = result.first()
+    return _place_out(row) if row else None
+
+
+async def get_place_detail(conn: Connection, place_id: int) -> Optional[PlaceDetailOut]:
+    place = await get_place(conn, place_id)
+    if place is None:
+        return None
+    menus = await list_menus(conn, place_id)
+    return PlaceDetailOut(**place.model_dump(), menus=menus)
+
+
+async def get_place_rating(conn: Connection, place_id: int) -> Tuple[int, int]:
+    """(평점 합계, 리뷰 수)"""
+    result = await conn.execute(QUERIES["place_rating"], {"place_id": place_id})
+    row = result.one()
+    return int(row.rating_sum), row.review_count
+
+
+async def get_place_row(conn: Connection, place_id: int) -> Optional[dict]:
+    """평점 집계 없이 가게 컬럼만 (카탈로그 갱신용)"""
+    result = await conn.execute(QUERIES["place"], {"place_id": place_id})
+    row = result.first()
+    return dict(row._mapping) if row else None
+
+
+async def load_catalog_rows(conn: Connection):
+    """카탈로그 적재용 원본 행 (가게 id순, 메뉴 place_id·id순, 가게별 평점 집계)
+
+    행마다 스키마 객체를 만들지 않도록 Row를 그대로 반환한다.
+    conn이 REPEATABLE READ 트랜잭션이어야 세 조회가 같은 스냅숏을 본다.
+    """
+    places = await conn.execute(QUERIES["all_places"])
+    menus = await conn.execute(QUERIES["catalog_menus"])
+    ratings = await conn.execute(QUERIES["all_ratings"])
+    return places, menus, ratings
+
+
+async def get_change_token(conn: Connection) -> Tuple[int, Optional[int]]:
+    """(새 동기화 토큰, 정리된 기록의 경계 - 이보다 작은 토큰은 쓸 수 없음)
+
+    변경 조회보다 먼저 실행해야 한다 - 토큰 이후에 커밋된 변경은 다음 동기화에 다시 포함된다.
+    """
+    row = (await conn.execute(QUERIES["change_token"])).one()
+    return row.token, row.horizon
+
+
+async def list_changes_since(conn: Connection, since: int) -> Dict[Tuple[str, int], datetime]:
+    """since 이후 바뀐 (entity, entity_id) -> 마지막 변경 시각"""
+    result = await conn.execute(QUERIES["changes_since"], {"since": since})
+    return {(row.entity, row.entity_id): row.changed_at for row in result}
+
+
+async def list_catalog_changes(conn: Connection, changes: Dict[Tuple[str, int], datetime], token: int) -> CatalogChangesOut:
+    """바뀐 대상의 현재 행 - 지금 없는 가게/메뉴는 삭제(tombstone)"""
+    ids = {"place": [], "menu": [], "rating": []}
+    for entity, entity_id in changes:
+        ids[entity].append(entity_id)
+
+    places = [
+        PlaceChangeOut(**_place_out_fields(dict(row._mapping)))
+        for row in await conn.execute(QUERIES["changed_places"], {"ids": ids["place"]})
+    ] if ids["place"] else []
+    menus = [
+        MenuChangeOut(**row._mapping)
+        for row in await conn.execute(QUERIES["changed_menus"], {"ids": ids["menu"]})
+    ] if ids["menu"] else []
+
+    # 가게 전체를 보내는 경우 평점은 가게에 포함
+    rating_ids = sorted(set(ids["rating"]) - {place.id for place in places})
+    ratings = [
+        RatingChangeOut(
+            place_id=row.place_id,
+            rating=average_rating(row.rating_sum, row.review_count),
+            review_count=row.review_count,
+            updated_at=changes[("rating", row.place_id)]
+        )
+        for row in await conn.execute(QUERIES["changed_ratings"], {"ids": rating_ids})
+    ] if rating_ids else []
+
+    return CatalogChangesOut(
+        token=str(token),
+        places=sorted(places, key=lambda place: place.id),
+        menus=sorted(menus, key=lambda menu: menu.id),
+        ratings=sorted(ratings, key=lambda rating: rating.place_id),
+        deleted=DeletedOut(
+            places=sorted(set(ids["place"]) - {place.id for place in places}),
+            menus=sorted(set(ids["menu"]) - {menu.id for menu in menus}),
+        ),
+    )
+
+
+def _sparse_column(query_name: str, column: str) -> str:
+    if not query_name.startswith("place"):
+        return column
+    if column in ("rating_sum", "review_count"):
+        return f"COALESCE(r.{column}, 0) AS {column}"
+    return f"p.{column}"
+
+
+def _sparse_statement(query_name: str, columns: Tuple[str, ...]) -> TextClause:
+    key = (query_name, columns)
+    if key not in _sparse_statements:
+        _sparse_statements[key] = text(SPARSE_QUERIES[query_name].format(
+            columns=", ".join(_sparse_column(query_name, column) for column in columns),
+            join=_RATING_JOIN if "rating_sum" in columns else ""
+        ))
+    return _sparse_statements[key]
+
+
+def _place_columns(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """가게 필드 → SQL 컬럼 (평점/리뷰 수를 요청했을 때만 리뷰 집계를 조인)"""
+    columns = tuple(column for column in PLACE_COLUMNS.split(", ") if column in fields)
+    if "rating" in fields or "review_count" in fields:
+        columns += ("rating_sum", "review_count")
+    return columns
+
+
+def _sparse_place(row, fields: Tuple[str, ...]) -> dict:
+    data = dict(row._mapping)
+    if "rating_sum" in data:
+        data = _place_out_fields(data)
+    return {field: data[field] for field in fields}
+
+
+async def list_places_sparse(conn: Connection, fields: Tuple[str, ...], category: Optional[str] = None) -> List[dict]:
+    """요청한 필드만 조회한 가게 목록 (fields에는 id 포함)"""
+    columns = _place_columns(fields)
+    if category:
+        result = await conn.execute(_sparse_statement("places_by_category", columns), {"category": category})
+    else:
+        result = await conn.execute(_sparse_statement("places", columns))
+    return [_sparse_place(row, fields) for row in result]
+
+
+async def get_place_sparse(conn: Connection, place_id: int, fields: Tuple[str, ...]) -> Optional[dict]:
+    result = await conn.execute(_sparse_statement("place", _place_columns(fields)), {"place_id": place_id})
+    row = result.first()
+    return _sparse_place(row, fields) if row else None
+
+
+async def list_rows_sparse(conn: Connection, query_name: str, fields: Tuple[str, ...], params: dict) -> List[dict]:
+    """메뉴/리뷰를 요청한 필드(= 컬럼)만 조회 - query_name은 SPARSE_QUERIES의 이름"""
+    result = await conn.execute(_sparse_statement(query_name, fields), params)
+    return [dict(row._mapping) for row in result]
+
+
+async def list_menus_by_places(conn: Connection, place_ids: List[int]) -> Dict[int, List[dict]]:
+    """여러 가게의 메뉴를 한 번에 (place_id -> 메뉴 목록)"""
+    columns = tuple(MENU_COLUMNS.split(", "))
+    result = await conn.execute(_sparse_statement("menus_by_places", columns), {"place_ids": place_ids})
+    menus: Dict[int, List[dict]] = {place_id: [] for place_id in place_ids}
+    for row in result:
+        menus[row.place_id].append(dict(row._mapping))
+    return menus
+
+
+async def list_top_reviews(conn: Connection, place_ids: List[int], n: int, fields: Tuple[str, ...]) -> Dict[int, List[dict]]:
+    """가게별 상위 리뷰 n개 (place_id -> 리뷰 목록)"""
+    columns = tuple(dict.fromkeys(fields + ("place_id", "rating", "id")))
+    result = await conn.execute(_sparse_statement("top_reviews", columns), {"place_ids": place_ids, "n": n})
+    reviews: Dict[int, List[dict]] = {place_id: [] for place_id in place_ids}
+    for row in result:
+        data = row._mapping
+        reviews[data["place_id"]].append({field: data[field] for field in fields})
+    return reviews
+
+
+async def list_menus(conn: Connection, place_id: int) -> List[MenuOut]:
+    result = await conn.execute(QUERIES["menus_by_place"], {"place_id": place_id})
+    return [MenuOut(**row._mapping) for row in result]
+
+
+async def get_menu(conn: Connection, menu_id: int) -> Optional[MenuOut]:
+    result = await conn.execute(QUERIES["menu"], {"menu_id": menu_id})
+    row = result.first()
+    return MenuOut(**row._mapping) if row else None
+
+
+async def list_all_menus(conn: Connection) -> List[MenuOut]:
+    result = await conn.execute(QUERIES["all_menus"])
+    return [MenuOut(**row._mapping) for row in result]
+
+
+async def get_review(conn: Connection, review_id: int) -> Optional[ReviewOut]:
+    result = await conn.execute(QUERIES["review"], {"review_id": review_id})
+    row = result.first()
+    return ReviewOut(**row._mapping) if row else None
+
+
+async def list_reviews(conn: Connection, place_id: int) -> List[ReviewOut]:
+    result = await conn.execute(QUERIES["reviews_by_place"], {"place_id": place_id})
+    return [ReviewOut(**row._mapping) for row in result]
+
+
+async def list_all_reviews(conn: Connection) -> List[ReviewOut]:
+    result = await conn.execute(QUERIES["all_reviews"])
+    return [ReviewOut(**row._mapping) for row in result]
+
+
+async def stream_table(conn: AsyncConnection, table: str, batch_size: int) -> AsyncIterator[list]:
+    """테이블 전체를 서버 측 커서로 batch_size 행씩 읽음 (트랜잭션 안의 연결 필요)
+
+    결과를 한꺼번에 메모리에 올리지 않으므로 테이블 크기와 관계없이 메모리 사용량이 일정하다.
+    """
+    _, query_name = EXPORT_TABLES[table]
+    async for rows in stream_query(conn, query_name, batch_size):
+        yield rows
+
+
+async def stream_query(conn: AsyncConnection, name: str, batch_size: int) -> AsyncIterator[list]:
+    """명명된 쿼리 결과를 서버 측 커서로 batch_size 행씩 읽음"""
+    result = await conn.stream(QUERIES[name], execution_options={"yield_per": batch_size})
+    async for rows in result.partitions(batch_size):
+        yield rows
+
+
+async def list_reviews_by_phone(conn: Connection, phone_number: str) -> List[ReviewOut]:
+    result = await conn.execute(QUERIES["reviews_by_phone"], {"phone_number": phone_number})
+    return [ReviewOut(**row._mapping) for row in result]
+
+
+async def get_ratings_by_phone(conn: Connection, phone_number: str) -> List[Tuple[int, int]]:
+    """사용자의 리뷰 이력 (place_id, rating)"""
+    result = await conn.execute(QUERIES["ratings_by_phone"], {"phone_number": phone_number})
+    return [(row.place_id, row.rating) for row in result]
+
+
+async def load_similarities(conn: Connection):
+    """가게 간 유사도 원본 행 (place_id별, 유사도 내림차순)"""
+    return await conn.execute(QUERIES["all_similarities"])
+
+
+async def clear_similarities(conn: Connection):
+    await conn.execute(QUERIES["clear_similarities"])
+
+
+async def insert_similarities(conn: Connection, place_ids: List[int], similar_place_ids: List[int], scores: List[float]):
+    await conn.execute(QUERIES["insert_similarities"], {
+        "place_ids": place_ids,
+        "similar_place_ids": similar_place_ids,
+        "scores": scores,
+    })
+
+
+async def notify(conn: Connection, channel: str, payload: str):
+    """NOTIFY - 트랜잭션 안이면 커밋 시점에 전달된다"""
+    await conn.execute(QUERIES["notify"], {"channel": channel, "payload": payload})
+
+
+async def claim_idempotency_key(conn: Connection, key: str, request_hash: str, lock_seconds: int, ttl_seconds: int) -> bool:
+    """키를 선점하면 True (이 요청이 처리), 이미 있는 키면 False"""
+    result = await conn.execute(QUERIES["claim_idempotency_key"], {
+        "key": key, "request_hash": request_hash, "lock_seconds": lock_seconds, "ttl_seconds": ttl_seconds
+    })
+    return result.first() is not None
+
+
+async def get_idempotency_key(conn: Connection, key: str):
+    """(request_hash, response_status, response_body) - 처리 중이면 response_status가 None, 없거나 만료되면 None"""
+    result = await conn.execute(QUERIES["get_idempotency_key"], {"key": key})
+    return result.first()
+
+
+async def complete_idempotency_key(conn: Connection, key: str, response_status: int, response_body: str):
+    await conn.execute(QUERIES["complete_idempotency_key"], {
+        "key": key, "response_status": response_status, "response_body": response_body
+    })
+
+
+async def release_idempotency_key(conn: Connection, key: str):
+    """처리 중 선점 해제 (실패한 요청 - 같은 키로 다시 시도할 수 있게)"""
+    await conn.execute(QUERIES["release_idempotency_key"], {"key": key})
+
+
+async def set_review_thumbnails(conn: Connection, review_id: int, thumbnail_urls: str):
+    """thumbnail_urls: photo_urls와 같은 순서로 사진마다 {"가로 크기": URL} 인 JSON 배열"""
+    await conn.execute(QUERIES["set_review_thumbnails"], {"review_id": review_id, "thumbnail_urls": thumbnail_urls})
+
+
+async def insert_review(conn: Connection, review: dict) -> ReviewOut:
+    """review: place_id, phone_number, rating, content, photo_urls"""
+    result = await conn.execute(QUERIES["insert_review"], review)
+    return ReviewOut(**result.one()._mapping)
+
+
+async def insert_reviews(conn: Connection, reviews: List[dict]) -> List[ReviewOut]:
+    """multi-row INSERT ... RETURNING - 입력과 같은 순서로 반환"""
+    params = {
+        column: [review[column] for review in reviews]
+        for column in ("place_id", "phone_number", "rating", "content", "photo_urls")
+    }
+    result = await conn.execute(QUERIES["insert_reviews"], params)
+    rows = sorted(result, key=lambda row: row.id)
+    return [ReviewOut(**row._mapping) for row in rows]
+
+
+async def update_row(conn: Connection, table: str, row_id: int, data: dict):
+    """부분 수정을 UPDATE ... RETURNING 한 번으로 실행 - 대상이 없으면 None"""
+    columns = _checked_columns(table, data)
+    if not columns:
+        return await _get_row(conn, table, row_id)
+    result = await conn.execute(_update_statement(table, columns), {**data, "id": row_id})
+    row = result.first()
+    return _output(table, row) if row else None
+
+
+async def update_review(conn: Connection, review_id: int, data: dict) -> Optional[Tuple[ReviewOut, int]]:
+    """(수정된 리뷰, 수정 전 평점) - 대상이 없으면 None"""
+    columns = _checked_columns("reviews", data)
+    if not columns:
+        review = await get_review(conn, review_id)
+        return (review, review.rating) if review else None
+    result = await conn.execute(_update_statement("reviews", columns), {**data, "id": review_id})
+    row = result.first()
+    return (_output("reviews", row), row.old_rating) if row else None
+
+
+async def bulk_update(conn: Connection, table: str, updates: List[dict]) -> list:
+    """[{"id": ..., 수정할 컬럼...}, ...]를 한 문장으로 수정 - 수정된 행만 반환 (id 중복 불가)"""
+    if not updates:
+        return []
+    if len({update["id"] for update in updates}) != len(updates):
+        # unnest 조인은 같은 id의 여러 행 중 하나만 반영하고 나머지는 오류 없이 버리므로 미리 거부
+        raise ValueError("같은 id를 여러 번 수정할 수 없습니다.")
+    columns = UPDATABLE_COLUMNS[table]
+    params: Dict[str, list] = {"id": []}
+    for column in columns:
+        params[column] = []
+        params[f"set_{column}"] = []
+    for update in updates:
+        data = {key: value for key, value in update.items() if key != "id"}
+        _checked_columns(table, data)
+        params["id"].append(update["id"])
+        for column in columns:
+            params[column].append(data.get(column))
+            params[f"set_{column}"].append(column in data)
+    result = await conn.execute(_bulk_update_statement(table), params)
+    return [_output(table, row) for row in result]
+
+
+async def delete_row(conn: Connection, table: str, row_id: int):
+    """DELETE ... RETURNING 한 번으로 삭제 - 삭제된 행(없으면 None)"""
+    result = await conn.execute(_DELETE_QUERIES[table], {"id": row_id})
+    row = result.first()
+    return _output(table, row) if row else None
+
+
+async def _get_row(conn: Connection, table: str, row_id: int):
+    if table == "places":
+        return await get_place(conn, row_id)
+    if table == "menus":
+        return await get_menu(conn, row_id)
+    return await get_review(conn, row_id)
@@ -1,15 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from app.crud import repository
 from app.models.review import Review
 from app.schemas.review import ReviewCreate
 
 async def get_reviews_by_place(db: AsyncSession, place_id: int):
-    result = await db.execute(select(Review).where(Review.place_id == place_id))
-    return result.scalars().all()
+    return await repository.list_reviews(db, place_id)
 
 async def get_review(db: AsyncSession, review_id: int):
-    result = await db.execute(select(Review).where(Review.id == review_id))
-    return result.scalar_one_or_none()
+    return await repository.get_review(db, review_id)
 
 async def create_review(db: AsyncSession, review: Review):
     db.add(review)
@@ -18,27 +16,25 @@ async def create_review(db: AsyncSession, review: Review):
     return review
 
 async def update_review(db: AsyncSession, review_id: int, review_data: dict):
-    result = await db.execute(select(Review).where(Review.id == review_id))
-    review = result.scalar_one_or_none()
-    if review:
-        for key, value in review_data.items():
-            setattr(review, key, value)
-        await db.commit()
-        await db.refresh(review)
+    # UPDATE ... RETURNING 한 번으로 수정 (없으면 None)
+    review = await repository.update_row(db, "reviews", review_id, review_data)
+    await db.commit()
     return review
 
 async def delete_review(db: AsyncSession, review_id: int):
-    result = await db.execute(select(Review).where(Review.id == review_id))
-    review = result.scalar_one_or_none()
-    if review:
-        await db.delete(review)
-        await db.commit()
+    # DELETE ... RETURNING 한 번으로 삭제 (없으면 None)
+    review = await repository.delete_row(db, "reviews", review_id)
+    await db.commit()
     return review
 
+async def bulk_update_reviews(db: AsyncSession, updates: list):
+    # [{"id": ..., 수정할 컬럼...}, ...]를 한 문장으로 일괄 수정
+    reviews = await repository.bulk_update(db, "reviews", updates)
+    await db.commit()
+    return reviews
+
 async def get_reviews_by_phone(db: AsyncSession, phone_number: str):
-    result = await db.execute(select(Review).where(Review.phone_number == phone_number))
-    return result.scalars().all()
+    return await repository.list_reviews_by_phone(db, phone_number)
 
 async def get_all_reviews(db: AsyncSession):
-    result = await db.execute(select(Review))
-    return result.scalars().all()
+    return await repository.list_all_reviews(db)
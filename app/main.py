@@ -1,9 +1,28 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routers import api_router
-from app.core.config import get_database
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.config import get_database, engine
+from app.core import warmup
+from app.core.invalidation import listener
+from app.core.batching import review_batcher
+from app.core.images import image_processor
+from app.core.events import event_hub
+from app.core.idempotency import idempotency_store
+from app.core.logging_config import setup_logging, stop_logging, RequestIdMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.diagnostics import loop_monitor
+from app.core.profiling import ProfilingMiddleware
+from app.core.resilience import DeadlineMiddleware, circuit_metrics
+from app.core.shared_cache import shared_cache
 from app.models import Base
 from sqlalchemy.ext.asyncio import AsyncEngine
+import asyncio
+import logging
+
+# 로깅 설정 - 로그 출력은 QueueListener 스레드에서 처리
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="WeEat API",
@@ -27,6 +46,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 기한 (X-Request-Timeout-Ms 헤더 또는 REQUEST_TIMEOUT_MS) - 넘기면 504
+app.add_middleware(DeadlineMiddleware)
+
+# 요청 프로파일링 (관리자 X-Profile 헤더 / ?profile=1, 또는 PROFILE_SAMPLE_RATE 샘플링)
+app.add_middleware(ProfilingMiddleware)
+
+# 응답 압축 (Accept-Encoding 협상: br, gzip)
+app.add_middleware(CompressionMiddleware)
+
+# 요청 ID 부여 (로그 상관관계용)
+app.add_middleware(RequestIdMiddleware)
+
 # Static 파일 서빙 설정 제거 (S3 사용으로 변경)
 
 # API 라우터 등록
@@ -40,13 +71,51 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
-# 데이터베이스 초기화 (선택사항)
+@app.get("/ready")
+async def readiness_check():
+    """워밍업이 끝난 워커만 트래픽을 받도록 준비 상태 보고"""
+    if not warmup.state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "error": warmup.state.error}
+        )
+    return {"status": "ready", "warmup_ms": warmup.state.duration_ms}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """워커 진단 지표 (Prometheus 텍스트 형식)"""
+    return "\n".join([*loop_monitor.metrics(), *circuit_metrics(), *shared_cache.metrics(), *image_processor.metrics(), *event_hub.metrics(), *idempotency_store.metrics()]) + "\n"
+
+# 워밍업: 연결 풀 사전 연결, 카탈로그 적재, 주요 SQL 준비
 @app.on_event("startup")
 async def startup_event():
-    # 데이터베이스 연결 확인
-    pass
+    # 이벤트 루프 지연/블로킹 감시는 워밍업보다 먼저 시작
+    await loop_monitor.start()
+    # 리뷰 사진 썸네일 작업자 (프로세스 풀은 첫 작업 때 생성)
+    image_processor.start()
+    try:
+        await warmup.warm_up()
+    except Exception as e:
+        # DB가 아직 준비되지 않았어도 워커는 뜨고, /ready가 503을 반환하는 동안 재시도
+        warmup.state.error = str(e)
+        logger.error(f"시작 시 워밍업 실패: {str(e)}")
+        app.state.warmup_task = asyncio.create_task(warmup.warm_up_until_ready())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     # 데이터베이스 연결 종료
-    pass
+    # 열린 SSE 스트림 종료
+    event_hub.close()
+    task = getattr(app.state, "warmup_task", None)
+    if task:
+        task.cancel()
+    if warmup.state.snapshot_task:
+        warmup.state.snapshot_task.cancel()
+    await review_batcher.close()
+    await image_processor.stop()
+    await listener.stop()
+    # 모아 둔 L2 변경 기록과 쓰기 마무리
+    await asyncio.to_thread(shared_cache.close)
+    await engine.dispose()
+    await loop_monitor.stop()
+    stop_logging()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, BigInteger, Text, Integer, ForeignKey, CheckConstraint, Index
+from sqlalchemy import Column, BigInteger, Text, Integer, ForeignKey, TIMESTAMP, CheckConstraint, Index
+from sqlalchemy.sql import func
 from . import Base
 
 class Menu(Base):
@@ -7,6 +8,7 @@ class Menu(Base):
     place_id = Column(BigInteger, ForeignKey("places.id", ondelete="CASCADE"), nullable=False)
     name = Column(Text, nullable=False)
     price = Column(Integer)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)  # 수정 시 트리거가 갱신 (sql/004)
 
     __table_args__ = (
         CheckConstraint("price >= 0", name="menus_price_check"),
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, BigInteger, Text, Integer, CheckConstraint, Index
+from sqlalchemy import Column, BigInteger, Text, Integer, TIMESTAMP, CheckConstraint, Index
+from sqlalchemy.sql import func
 from . import Base
 
 class Place(Base):
@@ -10,6 +11,7 @@ class Place(Base):
     address = Column(Text)
     hero_image_url = Column(Text)
     budget_range = Column(Integer)  # 예산 범위 (원 단위)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)  # 수정 시 트리거가 갱신 (sql/004)
 
     __table_args__ = (
         CheckConstraint(
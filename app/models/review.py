@@ -10,6 +10,7 @@ class Review(Base):
     rating = Column(Integer, nullable=False)
     content = Column(Text)
     photo_urls = Column(Text)  # JSON 배열 형태로 여러 장 저장
+    thumbnail_urls = Column(Text)  # photo_urls와 같은 순서로 사진마다 {"가로 크기": URL} (JSON 배열, 이미지 처리 후 기록)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
     __table_args__ = (
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None  # 응답에서 요청을 구분하기 위한 클라이언트 지정 값
+    method: str = "GET"
+    path: str  # 예: /api/v1/places/1 (쿼리 문자열 포함 가능)
+    params: Optional[Dict[str, Any]] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1)
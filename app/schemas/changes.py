@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from .place import PlaceOut
+from .menu import MenuOut
+
+class PlaceChangeOut(PlaceOut):
+    updated_at: datetime
+
+class MenuChangeOut(MenuOut):
+    updated_at: datetime
+
+class RatingChangeOut(BaseModel):
+    place_id: int
+    rating: float
+    review_count: int
+    updated_at: datetime  # 평점 집계가 마지막으로 바뀐 시각
+
+class DeletedOut(BaseModel):
+    places: List[int] = []
+    menus: List[int] = []
+
+class CatalogChangesOut(BaseModel):
+    token: str  # 다음 동기화에 since로 보낼 토큰
+    places: List[PlaceChangeOut] = []  # 추가/수정된 가게 (평점 포함)
+    menus: List[MenuChangeOut] = []  # 추가/수정된 메뉴
+    ratings: List[RatingChangeOut] = []  # 평점 집계만 바뀐 가게
+    deleted: DeletedOut = DeletedOut()  # 삭제된 가게/메뉴 id (tombstone)
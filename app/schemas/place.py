@@ -29,6 +29,9 @@ class PlaceOut(PlaceBase):
     class Config:
         from_attributes = True
 
+class RankedPlaceOut(PlaceOut):
+    score: float = 0.0  # 베이지안 평균 (카테고리 평균을 사전 평균으로 사용)
+
 class PlaceDetailOut(PlaceOut):
     menus: List[MenuOut] = []  # 해당 가게의 메뉴 목록
 
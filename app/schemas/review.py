@@ -6,7 +6,7 @@ class ReviewBase(BaseModel):
     phone_number: str
     rating: int
     content: Optional[str] = None
-    photo_urls: Optional[str] = None  # JSON 배열 형태
+    photo_urls: Optional[str] = None  # URL의 JSON 배열 (예전 리뷰는 Python 리스트 표기일 수 있음)
     
     class Config:
         # 추가 필드 허용 (프론트엔드에서 예상치 못한 필드가 와도 무시)
@@ -24,6 +24,7 @@ class ReviewUpdate(BaseModel):
 class ReviewOut(ReviewBase):
     id: int
     place_id: int
+    thumbnail_urls: Optional[str] = None  # photo_urls 순서대로 사진마다 {"가로 크기": URL} 인 JSON 배열, 실패한 사진은 {} (사진 처리 전이면 None)
     created_at: datetime
 
     class Config:
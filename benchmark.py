@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+import httpx
+from sqlalchemy import text
+from app.core.config import engine, read_engine
+from app.crud import repository
+
+# 결과 기록 파일 (실행마다 한 줄씩 추가해서 시간에 따른 변화를 추적)
+RESULTS_PATH = os.path.join("benchmarks", "results.jsonl")
+# 케이스별 반복 횟수 / 측정 전 버리는 횟수
+DEFAULT_ITERATIONS = 200
+WARMUP_ITERATIONS = 10
+# 이 비율 이상 느려진 케이스는 표시
+REGRESSION_THRESHOLD = 0.2
+
+
+def percentile(samples, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summarize(samples) -> dict:
+    """초 단위 측정값 → ms 통계"""
+    return {
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "n": len(samples),
+    }
+
+
+async def measure(call, args_for, iterations: int) -> dict:
+    """call(*args_for(i))를 반복 실행해 지연 시간 통계"""
+    for i in range(WARMUP_ITERATIONS):
+        await call(*args_for(i))
+    samples = []
+    for i in range(iterations):
+        args = args_for(i)
+        started = time.perf_counter()
+        await call(*args)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def sample_inputs(seed: int, count: int) -> dict:
+    """시드 고정 표본 (가게 id, 리뷰 많은 전화번호, 카테고리)"""
+    rng = random.Random(seed)
+    async with read_engine.connect() as conn:
+        place_count, max_id = (await conn.execute(text("SELECT COUNT(*), MAX(id) FROM places"))).one()
+        if not place_count:
+            raise SystemExit("❌ places가 비어 있습니다. generate_dataset.py로 데이터를 먼저 만드세요.")
+        place_ids = [
+            row[0] for row in await conn.execute(
+                text("SELECT id FROM places WHERE id = ANY(:ids)"),
+                {"ids": [rng.randint(1, max_id) for _ in range(count * 2)]}
+            )
+        ][:count] or [1]
+        phones = [
+            row[0] for row in await conn.execute(
+                text("SELECT phone_number FROM reviews GROUP BY phone_number ORDER BY COUNT(*) DESC LIMIT :n"),
+                {"n": count}
+            )
+        ] or ["01000000000"]
+        categories = [row[0] for row in await conn.execute(text("SELECT DISTINCT category FROM places"))]
+    rng.shuffle(phones)
+    return {"place_count": place_count, "place_ids": place_ids, "phones": phones, "categories": categories}
+
+
+async def bench_queries(inputs: dict, iterations: int, include_writes: bool) -> dict:
+    """repository 함수별 지연 시간 (카탈로그 없이 DB 경로)"""
+    place_ids, phones, categories = inputs["place_ids"], inputs["phones"], inputs["categories"]
+    pick = lambda values: (lambda i: values[i % len(values)])
+    place, phone, category = pick(place_ids), pick(phones), pick(categories)
+    # 전체 목록/카탈로그 적재는 규모에 비례하므로 반복 횟수를 줄임
+    full_scan = max(3, iterations // 20)
+
+    results = {}
+    async with read_engine.connect() as conn:
+        cases = [
+            ("place_exists", repository.place_exists, lambda i: (conn, place(i)), iterations),
+            ("get_place_detail", repository.get_place_detail, lambda i: (conn, place(i)), iterations),
+            ("get_place_rating", repository.get_place_rating, lambda i: (conn, place(i)), iterations),
+            ("list_menus", repository.list_menus, lambda i: (conn, place(i)), iterations),
+            ("list_reviews", repository.list_reviews, lambda i: (conn, place(i)), iterations),
+            ("list_reviews_by_phone", repository.list_reviews_by_phone, lambda i: (conn, phone(i)), iterations),
+            ("list_places_by_category", repository.list_places, lambda i: (conn, category(i)), full_scan),
+            ("list_places", repository.list_places, lambda i: (conn,), full_scan),
+            ("list_top_places", repository.list_top_places, lambda i: (conn, None, 20, 10.0), full_scan),
+            ("load_catalog_rows", repository.load_catalog_rows, lambda i: (conn,), full_scan),
+        ]
+        for name, call, args_for, n in cases:
+            results[f"crud.{name}"] = await measure(call, args_for, n)
+            print(f"  crud.{name}: {results[f'crud.{name}']}")
+
+    if include_writes:
+        # 쓰기는 트랜잭션 안에서 재고 롤백 (데이터는 그대로)
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                review_ids = [
+                    row[0] for row in await conn.execute(
+                        text("SELECT id FROM reviews WHERE place_id = ANY(:ids)"), {"ids": place_ids}
+                    )
+                ] or [1]
+                review_id = pick(review_ids)
+                new_review = lambda i: (conn, {
+                    "place_id": place(i), "phone_number": phone(i), "rating": 1 + i % 5,
+                    "content": "벤치마크", "photo_urls": None,
+                })
+                cases = [
+                    ("insert_review", repository.insert_review, new_review),
+                    ("update_review", repository.update_review, lambda i: (conn, review_id(i), {"rating": 1 + i % 5})),
+                    ("update_row", repository.update_row, lambda i: (conn, "places", place(i), {"distance_note": f"도보 {i % 20}분"})),
+                ]
+                for name, call, args_for in cases:
+                    results[f"crud.{name}"] = await measure(call, args_for, iterations)
+                    print(f"  crud.{name}: {results[f'crud.{name}']}")
+            finally:
+                await transaction.rollback()
+    return results
+
+
+async def bench_endpoints(inputs: dict, iterations: int) -> dict:
+    """앱을 프로세스 안에서 띄워 (워밍업 + 카탈로그) 엔드포인트별 지연 시간"""
+    from app.main import app
+    from app.core import warmup
+
+    await warmup.warm_up()
+    place_ids, phones, categories = inputs["place_ids"], inputs["phones"], inputs["categories"]
+    pick = lambda values: (lambda i: values[i % len(values)])
+    place, phone, category = pick(place_ids), pick(phones), pick(categories)
+    cases = [
+        ("places", lambda i: ("/api/v1/places/", {})),
+        ("places_by_category", lambda i: ("/api/v1/places/", {"category": category(i)})),
+        ("places_top", lambda i: ("/api/v1/places/top", {})),
+        ("place_detail", lambda i: (f"/api/v1/places/{place(i)}", {})),
+        ("place_reviews", lambda i: (f"/api/v1/places/{place(i)}/reviews", {})),
+        ("place_menus", lambda i: (f"/api/v1/places/{place(i)}/menus", {})),
+        ("reviews_by_phone", lambda i: (f"/api/v1/places/reviews/phone/{phone(i)}", {})),
+        ("recommendations", lambda i: ("/api/v1/recommendations/", {})),
+        ("recommendations_budget", lambda i: ("/api/v1/recommendations/", {"budget": 10000})),
+    ]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get(path, params):
+            response = await client.get(path, params=params)
+            response.raise_for_status()
+
+        for name, args_for in cases:
+            results[f"api.{name}"] = await measure(get, args_for, iterations)
+            print(f"  api.{name}: {results[f'api.{name}']}")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_run(place_count: int) -> dict:
+    """같은 규모의 직전 실행 결과"""
+    if not os.path.exists(RESULTS_PATH):
+        return {}
+    previous = {}
+    with open(RESULTS_PATH, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get("place_count") == place_count:
+                previous = run
+    return previous
+
+
+def print_comparison(results: dict, previous: dict):
+    if not previous:
+        print("ℹ️ 비교할 이전 실행이 없습니다.")
+        return
+    print(f"\n📊 이전 실행 대비 p50 ({previous['commit']}, {previous['timestamp']})")
+    for name, stats in results.items():
+        before = previous["results"].get(name)
+        if not before or not before["p50_ms"]:
+            continue
+        change = stats["p50_ms"] / before["p50_ms"] - 1
+        mark = "⚠️" if change >= REGRESSION_THRESHOLD else "  "
+        print(f"{mark} {name:<32} {before['p50_ms']:>9.3f}ms → {stats['p50_ms']:>9.3f}ms ({change:+.1%})")
+
+
+async def run_benchmark(seed: int, iterations: int, include_writes: bool, skip_endpoints: bool, record: bool):
+    try:
+        inputs = await sample_inputs(seed, 50)
+        print(f"🔍 가게 {inputs['place_count']:,}개 기준 측정 (반복 {iterations}회)")
+        results = await bench_queries(inputs, iterations, include_writes)
+        if not skip_endpoints:
+            results.update(await bench_endpoints(inputs, iterations))
+    finally:
+        await engine.dispose()
+
+    previous = previous_run(inputs["place_count"])
+    print_comparison(results, previous)
+    if record:
+        run = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "place_count": inputs["place_count"],
+            "seed": seed,
+            "iterations": iterations,
+            "results": results,
+        }
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+        print(f"✅ 결과 기록: {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="crud 쿼리 / 엔드포인트 지연 시간 측정 (generate_dataset.py 데이터 기준)")
+    parser.add_argument("--seed", type=int, default=42, help="표본 가게/전화번호 선택 시드")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--writes", action="store_true", help="쓰기 쿼리도 측정 (트랜잭션 롤백)")
+    parser.add_argument("--skip-endpoints", action="store_true", help="crud 쿼리만 측정")
+    parser.add_argument("--no-record", action="store_true", help=f"{RESULTS_PATH}에 기록하지 않음")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.seed, args.iterations, args.writes, args.skip_endpoints, not args.no_record))
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from scipy import sparse
+from app.core.config import engine
+from app.core.export import export_engine, EXPORT_BATCH_SIZE
+from app.core.invalidation import CATALOG_CHANNEL
+from app.crud import repository
+
+# 한 번에 INSERT할 유사도 행 수
+INSERT_CHUNK_SIZE = 10000
+
+
+async def load_ratings(batch_size: int):
+    """리뷰 전체를 (place_id, phone_number, rating) 배열로 읽음 (서버 측 커서)"""
+    place_ids, phone_numbers, ratings = [], [], []
+    async with export_engine.connect() as conn:
+        async for rows in repository.stream_query(conn, "rating_matrix", batch_size):
+            for row in rows:
+                place_ids.append(row.place_id)
+                phone_numbers.append(row.phone_number)
+                ratings.append(row.rating)
+    return (
+        np.array(place_ids, dtype=np.int64),
+        np.array(phone_numbers, dtype=object),
+        np.array(ratings, dtype=np.float32),
+    )
+
+
+def compute_similarities(place_ids, phone_numbers, ratings, top_n: int, min_score: float):
+    """가게 × 전화번호 평점 희소 행렬로 가게 간 adjusted cosine 유사도를 구하고 가게마다 상위 top_n개만 남김"""
+    places, place_index = np.unique(place_ids, return_inverse=True)
+    users, user_index = np.unique(phone_numbers, return_inverse=True)
+    shape = (len(places), len(users))
+
+    # 같은 사용자가 같은 가게에 여러 번 리뷰했으면 평균 (중복 좌표는 tocsr에서 합산됨)
+    sums = sparse.coo_matrix((ratings, (place_index, user_index)), shape=shape).tocsr()
+    counts = sparse.coo_matrix((np.ones_like(ratings), (place_index, user_index)), shape=shape).tocsr()
+    matrix = sums.copy()
+    matrix.data = sums.data / counts.data
+
+    # 사용자 평균을 빼서 후하게/박하게 주는 사용자 차이를 없앰
+    user_counts = np.bincount(matrix.indices, minlength=len(users))
+    user_sums = np.bincount(matrix.indices, weights=matrix.data, minlength=len(users))
+    user_means = user_sums / np.maximum(user_counts, 1)
+    matrix.data = matrix.data - user_means[matrix.indices]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    normalized = sparse.diags(1 / norms) @ matrix
+    similarity = (normalized @ normalized.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    sources, targets, scores = [], [], []
+    for i in range(len(places)):
+        start, end = similarity.indptr[i], similarity.indptr[i + 1]
+        row_scores = similarity.data[start:end]
+        row_targets = similarity.indices[start:end]
+        keep = row_scores >= min_score
+        row_scores, row_targets = row_scores[keep], row_targets[keep]
+        if len(row_scores) > top_n:
+            top = np.argpartition(-row_scores, top_n)[:top_n]
+            row_scores, row_targets = row_scores[top], row_targets[top]
+        sources.extend([int(places[i])] * len(row_scores))
+        targets.extend(int(place) for place in places[row_targets])
+        scores.extend(float(score) for score in row_scores)
+    return sources, targets, scores
+
+
+async def build_similarities(top_n: int, min_score: float, batch_size: int):
+    """유사도 계산 후 place_similarities 전체 교체 → 워커들에게 다시 읽도록 알림"""
+    started = time.perf_counter()
+    try:
+        place_ids, phone_numbers, ratings = await load_ratings(batch_size)
+        print(f"🔍 리뷰 {len(ratings):,}건 읽음")
+
+        sources, targets, scores = compute_similarities(place_ids, phone_numbers, ratings, top_n, min_score)
+        print(f"🔍 유사도 {len(scores):,}쌍 계산")
+
+        # 한 트랜잭션으로 교체 - 워커는 커밋 후 알림을 받고 새 유사도를 읽는다
+        async with engine.begin() as conn:
+            await repository.clear_similarities(conn)
+            for start in range(0, len(scores), INSERT_CHUNK_SIZE):
+                end = start + INSERT_CHUNK_SIZE
+                await repository.insert_similarities(conn, sources[start:end], targets[start:end], scores[start:end])
+            await repository.notify(conn, CATALOG_CHANNEL, "similarities:0")
+    finally:
+        await engine.dispose()
+
+    print(f"✅ 가게 유사도 갱신 완료 ({time.perf_counter() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="리뷰 기반 가게 간 유사도 계산 (개인화 추천용 배치 작업)")
+    parser.add_argument("--top-n", type=int, default=50, help="가게마다 저장할 유사 가게 수")
+    parser.add_argument("--min-score", type=float, default=0.05, help="이보다 낮은 유사도는 버림")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(build_similarities(args.top_n, args.min_score, args.batch_size))
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import sys
+from app.core.config import engine
+from app.core.export import export_table, EXPORT_FORMATS, EXPORT_BATCH_SIZE
+from app.crud.repository import EXPORT_TABLES
+
+
+async def export_data(table: str, fmt: str, output: str, batch_size: int):
+    """테이블 전체를 파일(또는 표준 출력)로 내보내기 - 배치 단위로 써서 메모리 사용량 일정"""
+    out = sys.stdout.buffer if output == "-" else open(output, "wb")
+    written = 0
+    try:
+        async for chunk in export_table(table, fmt, batch_size):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        await engine.dispose()
+
+    if output != "-":
+        print(f"✅ {table} 내보내기 완료: {output} ({written:,} bytes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="places / menus / reviews 전체 내보내기")
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--output", "-o", default="-", help="출력 파일 (기본: 표준 출력)")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(export_data(args.table, args.format, args.output, args.batch_size))
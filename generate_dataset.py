@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+import asyncpg
+from app.core.config import engine
+
+# 규모별 가게 수
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+# COPY 한 번에 보내는 행 수
+COPY_BATCH_SIZE = 10_000
+
+# places_category_check의 9개 카테고리와 비중 (한식/카페가 많은 실제 분포를 흉내)
+CATEGORY_WEIGHTS = {
+    "한식": 30, "카페": 18, "중식": 10, "일식": 10, "양식": 9,
+    "패스트푸드": 8, "동남아": 5, "지중해식": 2, "그외": 8,
+}
+
+# 카테고리별 상호 단어, 메뉴, 가격대(원)
+CATEGORY_DATA = {
+    "한식": (["할매", "고향", "옛날", "시골", "본가", "명가"], ["김치찌개", "된장찌개", "제육볶음", "비빔밥", "불고기", "순두부찌개", "갈비탕", "냉면"], (7000, 15000)),
+    "카페": (["커피", "로스터리", "브루", "테라스", "숲속", "모닝"], ["아메리카노", "카페라떼", "바닐라라떼", "콜드브루", "치즈케이크", "크로플", "스콘"], (3000, 8000)),
+    "중식": (["홍콩", "북경", "만리장성", "차이나", "향미", "진짜루"], ["짜장면", "짬뽕", "탕수육", "볶음밥", "마파두부", "깐풍기", "군만두"], (6000, 25000)),
+    "일식": (["스시", "이자카야", "오마카세", "라멘", "카츠", "우동"], ["초밥 세트", "돈카츠", "라멘", "우동", "사케동", "규동", "연어덮밥"], (9000, 30000)),
+    "양식": (["비스트로", "트라토리아", "키친", "그릴", "다이닝", "파스타"], ["까르보나라", "토마토 파스타", "스테이크", "리조또", "피자", "샐러드"], (12000, 35000)),
+    "패스트푸드": (["버거", "치킨", "핫도그", "샌드위치", "토스트", "분식"], ["치즈버거", "후라이드치킨", "감자튀김", "핫도그", "떡볶이", "김밥"], (3000, 12000)),
+    "동남아": (["방콕", "하노이", "사이공", "발리", "쌀국수", "타이"], ["쌀국수", "팟타이", "분짜", "나시고렝", "똠얌꿍", "반미"], (8000, 16000)),
+    "지중해식": (["올리브", "산토리니", "아테네", "지중해", "그릭", "팔라펠"], ["후무스 플레이트", "팔라펠 랩", "기로스", "그릭 샐러드", "케밥"], (10000, 22000)),
+    "그외": (["포차", "주점", "뷔페", "델리", "식당", "야식"], ["모둠전", "닭강정", "족발", "보쌈", "오뎅탕", "샤브샤브"], (8000, 30000)),
+}
+DISTRICTS = ["강남구", "서초구", "마포구", "종로구", "중구", "성동구", "광진구", "송파구", "영등포구", "용산구"]
+NEIGHBORHOODS = ["역삼동", "서교동", "연남동", "성수동", "을지로", "신사동", "합정동", "망원동", "이태원동", "잠실동"]
+REVIEW_PHRASES = ["맛있어요", "양이 많아요", "친절해요", "다시 올게요", "가성비 좋아요", "조금 짜요", "웨이팅이 길어요", "분위기 좋아요"]
+
+# 리뷰 작성 기간
+REVIEW_PERIOD_DAYS = 730
+
+
+def review_count(rng: random.Random) -> int:
+    """가게별 리뷰 수 - 대부분은 몇 개, 소수의 인기 가게는 수백 개 (파레토 분포)"""
+    return min(int(rng.paretovariate(1.3)) - 1, 2000)
+
+
+def place_records(rng: random.Random, count: int):
+    categories = list(CATEGORY_WEIGHTS)
+    weights = list(CATEGORY_WEIGHTS.values())
+    for place_id in range(1, count + 1):
+        category = rng.choices(categories, weights)[0]
+        words, _, (low, high) = CATEGORY_DATA[category]
+        neighborhood = rng.choice(NEIGHBORHOODS)
+        name = f"{neighborhood[:-1] if neighborhood.endswith('동') else neighborhood} {rng.choice(words)} {place_id}호점"
+        address = f"서울 {rng.choice(DISTRICTS)} {neighborhood} {rng.randint(1, 999)}-{rng.randint(1, 50)}"
+        distance_note = f"도보 {rng.randint(1, 20)}분"
+        budget = rng.randrange(low, high + 1, 1000) if rng.random() < 0.8 else None
+        yield (place_id, name, category, distance_note, address, None, budget)
+
+
+def menu_records(rng: random.Random, categories: List[str]):
+    menu_id = 0
+    for place_id, category in enumerate(categories, 1):
+        _, menus, (low, high) = CATEGORY_DATA[category]
+        for name in rng.sample(menus, rng.randint(2, min(6, len(menus)))):
+            menu_id += 1
+            price = rng.randrange(low, high + 1, 500) if rng.random() < 0.95 else None
+            yield (menu_id, place_id, name, price)
+
+
+def review_records(rng: random.Random, place_count: int, user_count: int, now: datetime):
+    review_id = 0
+    for place_id in range(1, place_count + 1):
+        # 가게마다 평균 품질이 다르고 평점은 그 주변에 분포
+        quality = rng.gauss(3.8, 0.6)
+        for _ in range(review_count(rng)):
+            review_id += 1
+            # 리뷰를 많이 쓰는 사용자가 일부 있도록 사용자 번호도 치우치게
+            user = min(int(rng.paretovariate(1.1)), user_count)
+            phone_number = f"010{(user * 7919) % 100_000_000:08d}"
+            rating = max(1, min(5, round(rng.gauss(quality, 0.9))))
+            content = " ".join(rng.sample(REVIEW_PHRASES, rng.randint(1, 3)))
+            created_at = now - timedelta(seconds=rng.randrange(REVIEW_PERIOD_DAYS * 86400))
+            yield (review_id, place_id, phone_number, rating, content, None, created_at)
+
+
+async def copy_batches(conn: asyncpg.Connection, table: str, columns, records) -> int:
+    """COPY로 COPY_BATCH_SIZE 행씩 적재 (전체를 메모리에 만들지 않음)"""
+    total = 0
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= COPY_BATCH_SIZE:
+            await conn.copy_records_to_table(table, records=batch, columns=columns)
+            total += len(batch)
+            batch = []
+    if batch:
+        await conn.copy_records_to_table(table, records=batch, columns=columns)
+        total += len(batch)
+    return total
+
+
+async def generate_dataset(place_count: int, seed: int, reset: bool):
+    """시드가 같으면 항상 같은 데이터 (가게 → 메뉴 → 리뷰 순서로 같은 난수열 사용)"""
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = await asyncpg.connect(dsn)
+    started = time.perf_counter()
+    try:
+        existing = await conn.fetchval("SELECT COUNT(*) FROM places")
+        if existing and not reset:
+            print(f"❌ places에 이미 {existing:,}개 행이 있습니다. 비우고 생성하려면 --reset을 지정하세요.")
+            return
+
+        async with conn.transaction():
+            # 대량 적재 중에는 카탈로그 알림/변경 기록 트리거(sql/001, sql/004)를 끈다 - 끝난 뒤 워커는 재시작/재적재
+            for table in ("places", "menus", "reviews"):
+                await conn.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+            if reset:
+                await conn.execute("TRUNCATE places, menus, reviews RESTART IDENTITY CASCADE")
+
+            rng = random.Random(seed)
+            # 메뉴 생성에 필요한 카테고리만 남기고 가게 행은 보내는 즉시 버린다
+            categories: List[str] = []
+
+            def places_with_category():
+                for record in place_records(rng, place_count):
+                    categories.append(record[2])
+                    yield record
+
+            places = await copy_batches(
+                conn, "places",
+                ["id", "name", "category", "distance_note", "address", "hero_image_url", "budget_range"],
+                places_with_category()
+            )
+            print(f"✅ 가게 {places:,}개")
+
+            menus = await copy_batches(conn, "menus", ["id", "place_id", "name", "price"], menu_records(rng, categories))
+            print(f"✅ 메뉴 {menus:,}개")
+
+            now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+            reviews = await copy_batches(
+                conn, "reviews",
+                ["id", "place_id", "phone_number", "rating", "content", "photo_urls", "created_at"],
+                review_records(rng, place_count, place_count * 3, now)
+            )
+            print(f"✅ 리뷰 {reviews:,}개")
+
+            # id를 직접 넣었으므로 시퀀스를 맞춤
+            for table in ("places", "menus", "reviews"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                )
+                await conn.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+
+            # 변경 기록 없이 적재했으므로 이전 증분 동기화 토큰은 모두 만료 (sql/004를 적용한 경우)
+            if await conn.fetchval("SELECT to_regclass('catalog_change_log_horizon') IS NOT NULL"):
+                await conn.execute("""
+                    INSERT INTO catalog_change_log_horizon (id, tx) VALUES (1, pg_current_xact_id()::text::bigint + 1)
+                    ON CONFLICT (id) DO UPDATE SET tx = EXCLUDED.tx
+                """)
+
+        await conn.execute("ANALYZE places, menus, reviews")
+        print(f"✅ 데이터 생성 완료 ({time.perf_counter() - started:.1f}초)")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 Postgres용 합성 데이터 생성 (시드 고정)")
+    parser.add_argument("--scale", choices=list(SCALES), default="1k", help="가게 수 (1k / 100k / 1m)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="places/menus/reviews를 비우고 생성")
+    args = parser.parse_args()
+
+    asyncio.run(generate_dataset(SCALES[args.scale], args.seed, args.reset))
@@ -0,0 +1,39 @@
+-- 카탈로그 캐시 무효화 알림
+-- places/menus/reviews가 바뀌면 커밋 시점에 'catalog_changes' 채널로 "<테이블>:<place_id>"를 보낸다.
+-- 같은 트랜잭션 안의 동일한 payload는 PostgreSQL이 하나로 합치므로 일괄 수정도 가게당 한 번만 전달된다.
+
+CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'places' THEN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('catalog_changes', 'places:' || OLD.id);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify('catalog_changes', 'places:' || NEW.id);
+        END IF;
+    ELSE
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('catalog_changes', TG_TABLE_NAME || ':' || OLD.place_id);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify('catalog_changes', TG_TABLE_NAME || ':' || NEW.place_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS places_notify_catalog_change ON places;
+CREATE TRIGGER places_notify_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON places
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+DROP TRIGGER IF EXISTS menus_notify_catalog_change ON menus;
+CREATE TRIGGER menus_notify_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON menus
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+DROP TRIGGER IF EXISTS reviews_notify_catalog_change ON reviews;
+CREATE TRIGGER reviews_notify_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON reviews
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
@@ -0,0 +1,13 @@
+-- 개인화 추천용 가게 간 유사도
+-- build_similarities.py 배치 작업이 리뷰(가게 × 전화번호 평점 행렬)로 계산해 통째로 교체하고,
+-- 끝나면 'catalog_changes' 채널로 'similarities:0'을 보내 워커들이 메모리로 다시 읽게 한다.
+
+CREATE TABLE IF NOT EXISTS place_similarities (
+    place_id BIGINT NOT NULL REFERENCES places(id) ON DELETE CASCADE,
+    similar_place_id BIGINT NOT NULL REFERENCES places(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    PRIMARY KEY (place_id, similar_place_id)
+);
+
+-- 요청마다 사용자의 리뷰 이력(place_id, rating)을 조회
+CREATE INDEX IF NOT EXISTS reviews_phone_idx ON reviews (phone_number);
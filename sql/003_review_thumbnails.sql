@@ -0,0 +1,6 @@
+-- 리뷰 사진 썸네일
+-- 리뷰 작성 후 이미지 처리 워커(app/core/images.py)가 사진마다 축소·재인코딩(EXIF 제거)한 썸네일을 올리고
+-- 그 URL을 photo_urls와 같은 순서로 사진마다 {"가로 크기": URL} 인 JSON 배열로 기록한다 (IMAGE_THUMBNAIL_WIDTHS).
+-- 썸네일을 만들지 못한 사진은 {}, 처리 전이거나 모든 사진이 실패한 리뷰는 NULL.
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS thumbnail_urls TEXT;
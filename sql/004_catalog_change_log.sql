@@ -0,0 +1,92 @@
+-- 카탈로그 증분 동기화 (GET /api/v1/places/changes)
+-- places/menus에 updated_at을 두고, places/menus/reviews가 바뀔 때마다 바뀐 대상을 catalog_change_log에 남긴다.
+-- 리뷰 변경은 가게 평점 집계의 변경('rating')으로 기록한다.
+-- 동기화 토큰은 트랜잭션 ID 기준: 토큰을 발급할 때 진행 중인 트랜잭션 중 가장 오래된 것(스냅숏 xmin) 이상의
+-- 기록만 다시 읽으므로, 늦게 커밋된 트랜잭션의 변경도 빠지지 않는다. (PostgreSQL 13 이상)
+
+ALTER TABLE places ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE menus ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE TABLE IF NOT EXISTS catalog_change_log (
+    id BIGSERIAL PRIMARY KEY,
+    tx BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+    entity TEXT NOT NULL CHECK (entity IN ('place', 'menu', 'rating')),
+    entity_id BIGINT NOT NULL,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS catalog_change_log_tx_idx ON catalog_change_log (tx);
+
+-- 정리된 기록의 경계 - 이보다 오래된 토큰은 빠진 변경이 있을 수 있으므로 전체 동기화(410)
+CREATE TABLE IF NOT EXISTS catalog_change_log_horizon (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tx BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION log_catalog_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'places' THEN
+        INSERT INTO catalog_change_log (entity, entity_id) VALUES ('place', COALESCE(NEW.id, OLD.id));
+    ELSIF TG_TABLE_NAME = 'menus' THEN
+        INSERT INTO catalog_change_log (entity, entity_id) VALUES ('menu', COALESCE(NEW.id, OLD.id));
+    ELSE
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO catalog_change_log (entity, entity_id) VALUES ('rating', OLD.place_id);
+        END IF;
+        IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.place_id <> OLD.place_id) THEN
+            INSERT INTO catalog_change_log (entity, entity_id) VALUES ('rating', NEW.place_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS places_touch_updated_at ON places;
+CREATE TRIGGER places_touch_updated_at
+    BEFORE UPDATE ON places
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS menus_touch_updated_at ON menus;
+CREATE TRIGGER menus_touch_updated_at
+    BEFORE UPDATE ON menus
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS places_log_catalog_change ON places;
+CREATE TRIGGER places_log_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON places
+    FOR EACH ROW EXECUTE FUNCTION log_catalog_change();
+
+DROP TRIGGER IF EXISTS menus_log_catalog_change ON menus;
+CREATE TRIGGER menus_log_catalog_change
+    AFTER INSERT OR UPDATE OR DELETE ON menus
+    FOR EACH ROW EXECUTE FUNCTION log_catalog_change();
+
+-- 리뷰 내용만 바뀐 수정은 평점 집계와 무관하므로 rating/place_id가 바뀔 때만
+DROP TRIGGER IF EXISTS reviews_log_catalog_change ON reviews;
+CREATE TRIGGER reviews_log_catalog_change
+    AFTER INSERT OR DELETE OR UPDATE OF rating, place_id ON reviews
+    FOR EACH ROW EXECUTE FUNCTION log_catalog_change();
+
+-- 오래된 기록 정리 (cron 등에서 주기적으로): SELECT prune_catalog_change_log(INTERVAL '30 days');
+CREATE OR REPLACE FUNCTION prune_catalog_change_log(retention INTERVAL) RETURNS BIGINT AS $$
+DECLARE
+    pruned_tx BIGINT;
+    pruned BIGINT;
+BEGIN
+    WITH deleted AS (
+        DELETE FROM catalog_change_log WHERE changed_at < NOW() - retention RETURNING tx
+    )
+    SELECT MAX(tx), COUNT(*) INTO pruned_tx, pruned FROM deleted;
+    IF pruned_tx IS NOT NULL THEN
+        INSERT INTO catalog_change_log_horizon (id, tx) VALUES (1, pruned_tx + 1)
+        ON CONFLICT (id) DO UPDATE SET tx = GREATEST(catalog_change_log_horizon.tx, EXCLUDED.tx);
+    END IF;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
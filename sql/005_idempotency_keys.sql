@@ -0,0 +1,26 @@
+-- 리뷰 작성 멱등성 키 (POST /api/v1/places/{place_id}/reviews의 Idempotency-Key 헤더)
+-- 키를 먼저 선점(response_status가 NULL인 처리 중 행)한 뒤 처리하고, 리뷰 INSERT와 같은 트랜잭션에서 응답을 기록한다.
+-- 같은 키로 다시 오면 기록된 응답을 그대로 돌려주고, 처리 중이면 끝날 때까지 기다린다.
+-- locked_until이 지난 처리 중 행(워커가 죽은 경우)과 expires_at이 지난 행은 다음 요청이 다시 선점한다.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    request_hash TEXT NOT NULL,
+    response_status INTEGER,
+    response_body TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_keys_expires_at_idx ON idempotency_keys (expires_at);
+
+-- 만료된 키 정리 (cron 등에서 주기적으로): SELECT prune_idempotency_keys();
+CREATE OR REPLACE FUNCTION prune_idempotency_keys() RETURNS BIGINT AS $$
+DECLARE
+    pruned BIGINT;
+BEGIN
+    DELETE FROM idempotency_keys WHERE expires_at < NOW();
+    GET DIAGNOSTICS pruned = ROW_COUNT;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,115 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.core import batching
+from app.core.batching import ReviewWriteBatcher
+from app.schemas.review import ReviewOut
+
+
+class FakeConnection:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeEngine:
+    def connect(self):
+        return FakeConnection()
+
+
+def _review(review_id: int, review: dict) -> ReviewOut:
+    return ReviewOut(id=review_id, created_at=datetime.now(timezone.utc), **review)
+
+
+def _values(place_id: int) -> dict:
+    return {"place_id": place_id, "phone_number": "01012345678", "rating": 4, "content": None, "photo_urls": None}
+
+
+def install_fake_inserts(monkeypatch, bad_place_id=None):
+    """place_id가 bad_place_id인 행이 있으면 일괄 INSERT 전체가, 개별 INSERT는 그 행만 실패"""
+    calls = {"batch": [], "single": []}
+    next_id = iter(range(1, 1000))
+
+    async def insert_reviews(conn, reviews):
+        calls["batch"].append(len(reviews))
+        if any(review["place_id"] == bad_place_id for review in reviews):
+            raise RuntimeError("foreign key violation")
+        return [_review(next(next_id), review) for review in reviews]
+
+    async def insert_review(conn, review):
+        calls["single"].append(review["place_id"])
+        if review["place_id"] == bad_place_id:
+            raise RuntimeError("foreign key violation")
+        return _review(next(next_id), review)
+
+    monkeypatch.setattr(batching, "autocommit_engine", FakeEngine())
+    monkeypatch.setattr(batching.repository, "insert_reviews", insert_reviews)
+    monkeypatch.setattr(batching.repository, "insert_review", insert_review)
+    return calls
+
+
+def test_batch_inserts_once_and_returns_rows_in_order(monkeypatch):
+    calls = install_fake_inserts(monkeypatch)
+
+    async def run():
+        batcher = ReviewWriteBatcher(window_ms=20, max_size=100)
+        return await asyncio.gather(*(batcher.submit(_values(place_id)) for place_id in (1, 2, 3)))
+
+    reviews = asyncio.run(run())
+    assert calls == {"batch": [3], "single": []}
+    assert [review.place_id for review in reviews] == [1, 2, 3]
+
+
+def test_batch_flushes_at_max_size(monkeypatch):
+    calls = install_fake_inserts(monkeypatch)
+
+    async def run():
+        # 창이 길어도 max_size가 차면 바로 저장
+        batcher = ReviewWriteBatcher(window_ms=60_000, max_size=2)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(_values(place_id)) for place_id in (1, 2))), 1)
+
+    asyncio.run(run())
+    assert calls["batch"] == [2]
+
+
+def test_one_failing_row_falls_back_to_single_inserts(monkeypatch):
+    calls = install_fake_inserts(monkeypatch, bad_place_id=2)
+
+    async def run():
+        batcher = ReviewWriteBatcher(window_ms=20, max_size=100)
+        return await asyncio.gather(
+            *(batcher.submit(_values(place_id)) for place_id in (1, 2, 3)), return_exceptions=True
+        )
+
+    first, failed, third = asyncio.run(run())
+    assert calls == {"batch": [3], "single": [1, 2, 3]}
+    assert first.place_id == 1 and third.place_id == 3
+    assert isinstance(failed, RuntimeError)
+
+
+def test_single_row_batch_failure_is_not_retried(monkeypatch):
+    calls = install_fake_inserts(monkeypatch, bad_place_id=1)
+
+    async def run():
+        batcher = ReviewWriteBatcher(window_ms=5, max_size=100)
+        return await asyncio.gather(batcher.submit(_values(1)), return_exceptions=True)
+
+    (failed,) = asyncio.run(run())
+    assert isinstance(failed, RuntimeError)
+    assert calls == {"batch": [1], "single": []}
+
+
+def test_close_flushes_pending_rows(monkeypatch):
+    calls = install_fake_inserts(monkeypatch)
+
+    async def run():
+        batcher = ReviewWriteBatcher(window_ms=60_000, max_size=100)
+        pending = asyncio.ensure_future(batcher.submit(_values(1)))
+        await asyncio.sleep(0)
+        await batcher.close()
+        return await pending
+
+    assert asyncio.run(run()).place_id == 1
+    assert calls["batch"] == [1]
@@ -0,0 +1,277 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import catalog as catalog_module
+from app.core.catalog import Catalog
+
+
+def _place(place_id: int, category: str, budget_range=None) -> SimpleNamespace:
+    return SimpleNamespace(_mapping={
+        "id": place_id, "name": f"가게{place_id}", "category": category, "distance_note": None,
+        "address": None, "hero_image_url": None, "budget_range": budget_range,
+    })
+
+
+def _menu(menu_id: int, place_id: int, price) -> SimpleNamespace:
+    return SimpleNamespace(id=menu_id, place_id=place_id, name=f"메뉴{menu_id}", price=price)
+
+
+def _rating(place_id: int, rating_sum: int, review_count: int) -> SimpleNamespace:
+    return SimpleNamespace(place_id=place_id, rating_sum=rating_sum, review_count=review_count)
+
+
+def build_catalog(monkeypatch, places, menus=(), ratings=()) -> Catalog:
+    """DB 대신 주어진 행으로 Catalog.load를 그대로 실행"""
+    async def load_catalog_rows(conn):
+        return places, sorted(menus, key=lambda menu: (menu.place_id, menu.id)), ratings
+
+    monkeypatch.setattr(catalog_module.repository, "load_catalog_rows", load_catalog_rows)
+    catalog = Catalog()
+    asyncio.run(catalog.load(None))
+    return catalog
+
+
+def expected_top(catalog: Catalog, category: str, n: int):
+    """카탈로그가 쓰는 사전 평균으로 카테고리 전체를 정렬한 상위 n개 (점수 내림차순, 같으면 id 오름차순)"""
+    code = catalog._category_codes[category]
+    prior = catalog._top_prior[code]
+    rows = sorted(catalog.by_category[code], key=lambda row: (-catalog._bayesian_score(row, prior), catalog.ids[row]))
+    return [catalog.ids[row] for row in rows[:n]]
+
+
+# 베이지안 상위 K개
+
+@pytest.mark.parametrize("seed", range(5))
+def test_top_places_match_full_sort_after_random_rating_changes(monkeypatch, seed):
+    monkeypatch.setattr(catalog_module, "RANKING_TOP_K", 10)
+    monkeypatch.setattr(catalog_module, "RANKING_REBUILD_CHANGES", 40)
+    rng = random.Random(seed)
+    places = [_place(place_id, "한식" if place_id % 3 else "일식") for place_id in range(1, 61)]
+    ratings = [_rating(place_id, rng.randint(0, 50), rng.randint(0, 10)) for place_id in range(1, 61)]
+    ratings = [rating for rating in ratings if rating.review_count]
+    catalog = build_catalog(monkeypatch, places, ratings=ratings)
+
+    for category in ("한식", "일식"):
+        assert [place.id for place in catalog.top_places(category, 10)] == expected_top(catalog, category, 10)
+
+    for _ in range(300):
+        place_id = rng.randint(1, 60)
+        if rng.random() < 0.5:
+            # 리뷰 작성 (평점 1-5)
+            catalog.apply_rating_change(place_id, rng.randint(1, 5), 1)
+        else:
+            # 리뷰 수정 - 리뷰 수는 그대로, 합계만 변경 (0 미만이 되지 않게)
+            row = catalog._row(place_id)
+            delta = rng.randint(-4, 4)
+            if catalog.rating_counts[row] and catalog.rating_sums[row] + delta >= 0:
+                catalog.apply_rating_change(place_id, delta, 0)
+        category = catalog.category_of(place_id)
+        n = rng.randint(1, 10)
+        assert [place.id for place in catalog.top_places(category, n)] == expected_top(catalog, category, n)
+
+
+def test_top_places_category_smaller_than_k(monkeypatch):
+    monkeypatch.setattr(catalog_module, "RANKING_TOP_K", 10)
+    places = [_place(place_id, "한식") for place_id in range(1, 4)]
+    catalog = build_catalog(monkeypatch, places, ratings=[_rating(1, 5, 1), _rating(2, 20, 5)])
+    catalog.top_places("한식", 10)
+
+    catalog.apply_rating_change(3, 5, 1)
+    catalog.apply_rating_change(2, -15, 0)
+    assert [place.id for place in catalog.top_places("한식", 10)] == expected_top(catalog, "한식", 10)
+
+
+def test_top_places_without_category_merges_categories(monkeypatch):
+    places = [_place(1, "한식"), _place(2, "일식"), _place(3, "중식")]
+    catalog = build_catalog(monkeypatch, places, ratings=[_rating(1, 4, 1), _rating(2, 50, 10), _rating(3, 1, 1)])
+    ranked = catalog.top_places(None, 3)
+    assert [place.score for place in ranked] == sorted((place.score for place in ranked), reverse=True)
+    assert {place.id for place in ranked} == {1, 2, 3}
+
+
+# 예산 (가게 가격 = 가장 싼 메뉴, 가격 있는 메뉴가 없으면 budget_range)
+
+def budget_catalog(monkeypatch) -> Catalog:
+    places = [
+        _place(1, "한식", budget_range=9000),   # 메뉴 가격 8000, 12000 → 가게 가격 8000
+        _place(2, "한식", budget_range=7000),   # 가격 없는 메뉴만 → budget_range 7000
+        _place(3, "한식"),                      # 메뉴도 budget_range도 없음 → 예산 필터에서 제외
+        _place(4, "일식", budget_range=15000),  # 메뉴 없음 → 15000
+        _place(5, "일식", budget_range=20000),  # 메뉴 가격 8000
+        _place(6, "일식"),                      # 메뉴 가격 15000 (4번과 같은 가격)
+    ]
+    menus = [
+        _menu(10, 1, 12000), _menu(11, 1, 8000), _menu(12, 1, None),
+        _menu(20, 2, None),
+        _menu(50, 5, 8000),
+        _menu(60, 6, 15000),
+    ]
+    return build_catalog(monkeypatch, places, menus)
+
+
+def test_within_budget_edges(monkeypatch):
+    catalog = budget_catalog(monkeypatch)
+    assert catalog.within_budget(1, 8000)
+    assert not catalog.within_budget(1, 7999)
+    assert catalog.within_budget(2, 7000)
+    assert not catalog.within_budget(2, 6999)
+    assert not catalog.within_budget(3, 10 ** 9)
+    assert catalog.within_budget(4, 15000)
+    assert not catalog.within_budget(999, 10 ** 9)
+
+
+def test_random_place_per_category_respects_budget(monkeypatch):
+    catalog = budget_catalog(monkeypatch)
+    for _ in range(50):
+        assert catalog.random_place_per_category(5, budget=6999) == []
+        assert catalog.random_place_per_category(5, budget=7000) == [2]
+        picked = catalog.random_place_per_category(5, budget=8000)
+        assert sorted(map(catalog.category_of, picked)) == ["일식", "한식"]
+        assert set(picked) <= {1, 2, 5}
+    assert set().union(*(catalog.random_place_per_category(5, budget=10 ** 9) for _ in range(200))) == {1, 2, 4, 5, 6}
+
+
+def test_random_menu_respects_budget(monkeypatch):
+    catalog = budget_catalog(monkeypatch)
+    assert catalog.random_menu(1, budget=7999) is None
+    for _ in range(50):
+        assert catalog.random_menu(1, budget=8000).id == 11
+        # 가격 없는 메뉴는 예산이 있으면 고르지 않는다
+        assert catalog.random_menu(1, budget=10 ** 9).id in (10, 11)
+    assert catalog.random_menu(2, budget=10 ** 9) is None
+    assert catalog.random_menu(4, budget=10 ** 9) is None
+    assert {catalog.random_menu(1).id for _ in range(200)} == {10, 11, 12}
+
+
+def test_price_index_after_reload_with_equal_prices(monkeypatch):
+    """같은 가격의 가게가 여럿일 때 가격이 바뀐 가게만 인덱스에서 옮겨진다"""
+    catalog = budget_catalog(monkeypatch)
+    place_row = {"id": 6, "name": "가게6", "category": "일식", "distance_note": None,
+                 "address": None, "hero_image_url": None, "budget_range": None}
+
+    async def get_place_row(conn, place_id):
+        return place_row
+
+    async def list_menus(conn, place_id):
+        return [_menu(61, 6, 30000)]
+
+    monkeypatch.setattr(catalog_module.repository, "get_place_row", get_place_row)
+    monkeypatch.setattr(catalog_module.repository, "list_menus", list_menus)
+    asyncio.run(catalog.reload_place(None, 6))
+
+    assert not catalog.within_budget(6, 29999)
+    assert catalog.within_budget(6, 30000)
+    assert catalog.within_budget(4, 15000)
+    code = catalog._category_codes["일식"]
+    assert list(catalog._price_index_prices[code]) == [8000, 15000, 30000]
+    assert [catalog.ids[row] for row in catalog._price_index_rows[code]] == [5, 4, 6]
+    for _ in range(50):
+        assert set(catalog.random_place_per_category(5, budget=15000)) in ({1, 4}, {1, 5}, {2, 4}, {2, 5})
+
+
+# 증분 동기화 토큰
+
+class FakeSavepointConnection:
+    def begin_nested(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_load_captures_change_token_from_load_snapshot(monkeypatch):
+    async def get_change_token(conn):
+        return 42, None
+
+    monkeypatch.setattr(catalog_module.repository, "get_change_token", get_change_token)
+    monkeypatch.setattr(catalog_module.repository, "load_catalog_rows", lambda conn: _rows())
+    catalog = Catalog()
+    asyncio.run(catalog.load(FakeSavepointConnection()))
+    assert catalog.change_token == 42
+
+
+def test_load_without_change_log_keeps_loading(monkeypatch):
+    async def get_change_token(conn):
+        raise RuntimeError('relation "catalog_change_log_horizon" does not exist')
+
+    monkeypatch.setattr(catalog_module.repository, "get_change_token", get_change_token)
+    monkeypatch.setattr(catalog_module.repository, "load_catalog_rows", lambda conn: _rows())
+    catalog = Catalog()
+    asyncio.run(catalog.load(FakeSavepointConnection()))
+    assert catalog.loaded and catalog.change_token is None
+    assert catalog.has_place(1)
+
+
+async def _rows():
+    return [_place(1, "한식")], [], []
+
+
+# 평점 집계 반영 (변경 알림과 이 워커의 쓰기)
+
+def test_refresh_before_local_write_does_not_double_count(monkeypatch):
+    catalog = build_catalog(monkeypatch, [_place(1, "한식")], ratings=[_rating(1, 8, 2)])
+    db = {"rating": (13, 3)}
+
+    async def get_place_rating(conn, place_id):
+        return db["rating"]
+
+    monkeypatch.setattr(catalog_module.repository, "get_place_rating", get_place_rating)
+
+    async def run():
+        # 리뷰(평점 5) 커밋 뒤 변경 알림이 먼저 반영하고, 그다음 쓰기 경로가 반영
+        assert await catalog.refresh_rating(None, 1)
+        assert not await catalog.refresh_rating(None, 1)
+
+    asyncio.run(run())
+    row = catalog._row(1)
+    assert (catalog.rating_sums[row], catalog.rating_counts[row]) == (13, 3)
+
+
+def test_older_rating_read_does_not_overwrite_newer(monkeypatch):
+    catalog = build_catalog(monkeypatch, [_place(1, "한식")], ratings=[_rating(1, 8, 2)])
+    results = iter([(13, 3), (17, 4)])
+
+    async def run():
+        release = asyncio.Event()
+
+        async def get_place_rating(conn, place_id):
+            value = next(results)
+            if value == (13, 3):
+                # 먼저 시작한 조회가 나중에 끝난다
+                await release.wait()
+            return value
+
+        monkeypatch.setattr(catalog_module.repository, "get_place_rating", get_place_rating)
+        slow = asyncio.ensure_future(catalog.refresh_rating(None, 1))
+        await asyncio.sleep(0)
+        assert await catalog.refresh_rating(None, 1)
+        release.set()
+        assert not await slow
+
+    asyncio.run(run())
+    row = catalog._row(1)
+    assert (catalog.rating_sums[row], catalog.rating_counts[row]) == (17, 4)
+
+
+# 정렬 (카탈로그와 DB 조회 경로가 같은 순서)
+
+@pytest.mark.parametrize("sort", ["rating", "review_count", "budget_range"])
+def test_sort_matches_db_fallback_order(monkeypatch, sort):
+    places = [_place(place_id, "한식", budget_range=[None, 9000, 12000][place_id % 3]) for place_id in range(1, 13)]
+    # 4.27과 4.3처럼 반올림하면 같은 평점이 섞이도록
+    ratings = [_rating(1, 47, 11), _rating(2, 43, 10), _rating(3, 9, 2), _rating(4, 21, 5), _rating(5, 5, 1),
+               _rating(6, 30, 7), _rating(7, 43, 10), _rating(8, 8, 2)]
+    catalog = build_catalog(monkeypatch, places, ratings=ratings)
+    # 평점이 나중에 바뀐 가게도 같은 평점끼리는 id 순서로
+    catalog.apply_rating_change(12, 43, 10)
+
+    served = [place.id for place in catalog.list_places(None, sort)]
+    # place.py의 DB 조회 경로와 같은 정렬 (응답 값 내림차순, id 오름차순)
+    fallback = sorted(catalog.list_places(), key=lambda place: (-(getattr(place, sort) or 0), place.id))
+    assert served == [place.id for place in fallback]
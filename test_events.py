@@ -0,0 +1,59 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import events as events_endpoint
+from app.core import events
+from app.core.events import EventHub, SubscriberLimitError, place_topic
+from app.schemas.review import ReviewOut
+
+
+def test_subscribe_enforces_the_limit(monkeypatch):
+    monkeypatch.setattr(events, "SSE_MAX_SUBSCRIBERS", 2)
+    hub = EventHub()
+    first = hub.subscribe([place_topic(1)])
+    hub.subscribe([place_topic(1)])
+    with pytest.raises(SubscriberLimitError):
+        hub.subscribe([place_topic(2)])
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)
+    assert hub.subscribers == 1
+    hub.subscribe([place_topic(2)])
+
+
+def test_endpoint_maps_limit_to_503_and_releases_on_disconnect(monkeypatch):
+    monkeypatch.setattr(events, "SSE_MAX_SUBSCRIBERS", 1)
+    hub = EventHub()
+    monkeypatch.setattr(events_endpoint, "event_hub", hub)
+    response = events_endpoint._subscribe([place_topic(1)])
+    with pytest.raises(HTTPException) as error:
+        events_endpoint._subscribe([place_topic(1)])
+    assert error.value.status_code == 503
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client gone")
+
+    # 보내기 실패는 Starlette가 ClientDisconnect로 바꿔 올린다
+    with pytest.raises(Exception):
+        asyncio.run(response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send))
+    assert hub.subscribers == 0
+
+
+def test_review_event_carries_new_rating_not_delta(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr(events, "event_hub", hub)
+    monkeypatch.setattr(events, "rating_event", lambda place_id: {"place_id": place_id, "rating": 4.5, "review_count": 2})
+    monkeypatch.setattr(events.catalog, "category_of", lambda place_id: None)
+    subscription = hub.subscribe([place_topic(1)])
+    review = ReviewOut(id=7, place_id=1, phone_number="01012345678", rating=5, created_at=datetime.now(timezone.utc))
+
+    events.publish_review_change("created", review)
+    data = json.loads(subscription.queue.get_nowait().decode().split("data: ", 1)[1])
+    assert data["rating"] == 4.5 and data["review_count"] == 2
+    assert "rating_delta" not in data and "count_delta" not in data
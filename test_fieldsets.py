@@ -0,0 +1,49 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.fieldsets import PLACE_FIELDS, MENU_FIELDS, parse_fields, parse_include, pick, dump_json
+from app.main import app
+
+
+def test_parse_fields_keeps_response_order_and_always_includes_id():
+    assert parse_fields("rating, name,,name", PLACE_FIELDS) == ("name", "id", "rating")
+    assert parse_fields("price", MENU_FIELDS) == ("price", "id")
+    assert parse_fields(None, PLACE_FIELDS) is None
+
+
+@pytest.mark.parametrize("raw", ["nam", "name,password", "menus"])
+def test_parse_fields_rejects_unknown_names(raw):
+    with pytest.raises(HTTPException) as error:
+        parse_fields(raw, PLACE_FIELDS)
+    assert error.value.status_code == 400
+
+
+def test_parse_include():
+    assert parse_include("top_reviews,menus") == ("menus", "top_reviews")
+    assert parse_include(None) == ()
+    with pytest.raises(HTTPException) as error:
+        parse_include("menus,reviews")
+    assert error.value.status_code == 400
+    assert "reviews" in error.value.detail
+
+
+def test_pick_and_dump_json():
+    data = pick({"id": 1, "name": "가게", "rating": 4.5}, ("id", "rating"))
+    assert dump_json([data]) == b'[{"id":1,"rating":4.5}]'
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/places/?fields=bogus",
+    "/api/v1/places/?include=reviews",
+    "/api/v1/places/1?fields=name,bogus",
+    "/api/v1/places/1?include=bogus",
+    "/api/v1/places/1/menus?fields=rating",
+    "/api/v1/places/1/reviews?fields=menus",
+    "/api/v1/places/reviews/phone/01012345678?fields=bogus",
+])
+def test_endpoints_reject_unknown_fields_and_includes(path):
+    # 이름 검증은 DB 조회 전에 끝나므로 DB 없이 400
+    response = TestClient(app).get(path)
+    assert response.status_code == 400
+    assert "사용 가능" in response.json()["detail"]
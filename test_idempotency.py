@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import idempotency
+from app.core.idempotency import IdempotencyStore, REPLAYED_HEADER, request_fingerprint
+
+
+class FakeConnection:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeEngine:
+    def connect(self):
+        return FakeConnection()
+
+
+def install_fake_keys(monkeypatch) -> dict:
+    """idempotency_keys 테이블 대신 dict (키 -> 행)"""
+    keys = {}
+
+    async def claim_idempotency_key(conn, key, request_hash, lock_seconds, ttl_seconds):
+        if key in keys:
+            return False
+        keys[key] = SimpleNamespace(request_hash=request_hash, response_status=None, response_body=None)
+        return True
+
+    async def get_idempotency_key(conn, key):
+        return keys.get(key)
+
+    async def complete_idempotency_key(conn, key, response_status, response_body):
+        keys[key].response_status = response_status
+        keys[key].response_body = response_body
+
+    async def release_idempotency_key(conn, key):
+        if key in keys and keys[key].response_status is None:
+            del keys[key]
+
+    monkeypatch.setattr(idempotency, "autocommit_engine", FakeEngine())
+    monkeypatch.setattr(idempotency.repository, "claim_idempotency_key", claim_idempotency_key)
+    monkeypatch.setattr(idempotency.repository, "get_idempotency_key", get_idempotency_key)
+    monkeypatch.setattr(idempotency.repository, "complete_idempotency_key", complete_idempotency_key)
+    monkeypatch.setattr(idempotency.repository, "release_idempotency_key", release_idempotency_key)
+    return keys
+
+
+def test_fingerprint_uses_photo_contents():
+    first = request_fingerprint(1, "01012345678", 5, None, ["a" * 64])
+    assert first == request_fingerprint(1, "01012345678", 5, None, ["a" * 64])
+    # 이름·크기가 같아도 내용이 다르면 다른 요청
+    assert first != request_fingerprint(1, "01012345678", 5, None, ["b" * 64])
+
+
+def test_claim_then_replay_completed_response(monkeypatch):
+    install_fake_keys(monkeypatch)
+    store = IdempotencyStore()
+
+    async def run():
+        assert await store.begin("key-1", "hash") is None
+        await store.complete(FakeConnection(), "key-1", '{"id":1}')
+        return await store.begin("key-1", "hash")
+
+    replay = asyncio.run(run())
+    assert replay.status_code == 200
+    assert replay.body == b'{"id":1}'
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert store.replayed == 1
+
+
+def test_retry_waits_for_in_flight_request_then_replays(monkeypatch):
+    install_fake_keys(monkeypatch)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_POLL_SECONDS", 0.01)
+    store = IdempotencyStore()
+
+    async def run():
+        assert await store.begin("key-1", "hash") is None
+        retry = asyncio.ensure_future(store.begin("key-1", "hash"))
+        await asyncio.sleep(0.05)
+        assert not retry.done()
+        await store.complete(FakeConnection(), "key-1", '{"id":1}')
+        return await asyncio.wait_for(retry, 1)
+
+    assert asyncio.run(run()).body == b'{"id":1}'
+    assert store.waited == 1
+
+
+def test_retry_gets_409_when_first_request_is_still_running(monkeypatch):
+    install_fake_keys(monkeypatch)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_POLL_SECONDS", 0.01)
+    store = IdempotencyStore()
+
+    async def run():
+        assert await store.begin("key-1", "hash") is None
+        await store.begin("key-1", "hash")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 409
+    assert error.value.headers["Retry-After"] == "1"
+    assert store.conflicts == 1
+
+
+def test_same_key_with_different_request_is_422(monkeypatch):
+    install_fake_keys(monkeypatch)
+    store = IdempotencyStore()
+
+    async def run():
+        assert await store.begin("key-1", "hash") is None
+        await store.begin("key-1", "other-hash")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 422
+
+
+def test_release_lets_the_same_key_be_claimed_again(monkeypatch):
+    keys = install_fake_keys(monkeypatch)
+    store = IdempotencyStore()
+
+    async def run():
+        assert await store.begin("key-1", "hash") is None
+        await store.release("key-1")
+        assert "key-1" not in keys
+        return await store.begin("key-1", "hash")
+
+    assert asyncio.run(run()) is None
+
+
+@pytest.mark.parametrize("key", ["", "k" * 256])
+def test_invalid_key_is_400(monkeypatch, key):
+    install_fake_keys(monkeypatch)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(IdempotencyStore().begin(key, "hash"))
+    assert error.value.status_code == 400
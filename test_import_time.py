@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+# app.main import 시간 예산 (ms) - 워커/레플리카 콜드 스타트 비용
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+# 측정 편차를 줄이기 위해 여러 번 재서 가장 빠른 값 사용
+RUNS = 3
+# app.main import 시점에 불러오면 안 되는 무거운 모듈 (업로드/배치 작업에서만 지연 import)
+LAZY_MODULES = ("boto3", "botocore", "numpy", "scipy")
+
+
+def measure_import_time():
+    """python -X importtime으로 app.main import를 재고 (누적 ms, import된 모듈 목록) 반환"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total_us = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name)
+        if name == "app.main":
+            total_us = int(cumulative)
+    return total_us / 1000, modules
+
+
+def check_import_time() -> float:
+    """app.main import가 예산 안에 끝나고, 무거운 SDK는 import하지 않는지 확인 (가장 빠른 측정값 반환)"""
+    timings = []
+    modules = set()
+    for _ in range(RUNS):
+        elapsed_ms, modules = measure_import_time()
+        timings.append(elapsed_ms)
+    best = min(timings)
+
+    eager = sorted(name for name in modules if name.split(".")[0] in LAZY_MODULES)
+    assert not eager, f"app.main import 시 지연 로딩 대상 모듈이 import됨: {eager[:5]}"
+    assert best <= IMPORT_TIME_BUDGET_MS, f"app.main import {best:.0f}ms > 예산 {IMPORT_TIME_BUDGET_MS:.0f}ms"
+    return best
+
+
+def test_import_time_budget():
+    check_import_time()
+
+
+if __name__ == "__main__":
+    print("🔍 app.main import 시간 측정...")
+    try:
+        best = check_import_time()
+        print(f"✅ {best:.0f}ms (예산 {IMPORT_TIME_BUDGET_MS:.0f}ms)")
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core import resilience
+from app.core.resilience import CircuitBreaker, Deadline, deadline_var, install_db_guards
+
+
+class QueryCanceled(Exception):
+    sqlstate = "57014"
+
+
+@pytest.fixture
+def guarded_engine(monkeypatch):
+    """SQLite에 set_config만 흉내 낸 엔진 + 테스트용 DB 브레이커"""
+    monkeypatch.setattr(resilience, "DB_STATEMENT_TIMEOUT_MS", 30000)
+    breaker = CircuitBreaker("database", failure_threshold=2, reset_timeout=30)
+    monkeypatch.setattr(resilience, "db_breaker", breaker)
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _add_set_config(dbapi_connection, record):
+        dbapi_connection.create_function("set_config", 3, lambda name, value, local: value)
+
+    # asyncpg의 $1 대신 SQLite의 ?
+    monkeypatch.setattr(resilience, "_SET_LOCAL_TIMEOUT", "SELECT set_config('statement_timeout', ?, 1)")
+    install_db_guards(SimpleNamespace(sync_engine=engine))
+    return engine, breaker
+
+
+def _fail(engine, conn, error):
+    """handle_error 리스너를 실제 오류 대신 직접 호출"""
+    context = SimpleNamespace(original_exception=error, is_disconnect=False, connection=conn)
+    engine.dialect.dispatch.handle_error(context)
+
+
+def test_cancel_by_short_request_deadline_is_not_a_breaker_failure(guarded_engine):
+    engine, breaker = guarded_engine
+    token = deadline_var.set(Deadline(5))
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT 1"))
+            for _ in range(3):
+                _fail(engine, conn, QueryCanceled())
+    finally:
+        deadline_var.reset(token)
+    assert breaker.failures == 0 and breaker.state == breaker.CLOSED
+
+
+def test_cancel_by_default_statement_timeout_counts(guarded_engine):
+    engine, breaker = guarded_engine
+    with engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        _fail(engine, conn, QueryCanceled())
+        _fail(engine, conn, QueryCanceled())
+    assert breaker.state == breaker.OPEN
+
+
+def test_request_timeout_flag_ends_with_the_transaction(guarded_engine):
+    engine, breaker = guarded_engine
+    token = deadline_var.set(Deadline(5))
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        deadline_var.reset(token)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        _fail(engine, conn, QueryCanceled())
+    assert breaker.failures == 1
+
+
+@pytest.mark.parametrize("error, is_disconnect", [(OSError("reset"), False), (TimeoutError(), False), (Exception(), True)])
+def test_connection_errors_count_even_with_request_deadline(error, is_disconnect):
+    assert resilience._is_outage(error, is_disconnect, request_timeout=True)